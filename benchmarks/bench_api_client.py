@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Benchmark DndApiClient against the fake compendium server
+
+Fetches one entity type end to end in each mode and reports wall time,
+entities per second and requests the server actually handled:
+
+  sequential   one page at a time (max_concurrency=1)
+  concurrent   pages after the first fetched in parallel
+  projected    concurrent, with fields projection (stream-parsed pages)
+  cached       warm on-disk cache within its TTL (no requests)
+  revalidated  expired cache entries revalidated with If-None-Match (304s)
+
+Example:
+  python benchmarks/bench_api_client.py --count 2000 --latency-ms 25
+"""
+
+import sys
+from pathlib import Path
+
+# Add project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import argparse
+import tempfile
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from benchmarks.fake_compendium import FakeCompendium, base_url, create_server
+from src.generator.api_cache import ApiCache
+from src.generator.api_client import DndApiClient
+from src.generator.circuit_breaker import CircuitBreaker
+
+MODES = ["sequential", "concurrent", "projected", "cached", "revalidated"]
+
+
+def run_mode(
+    mode: str,
+    url: str,
+    compendium: FakeCompendium,
+    args: argparse.Namespace,
+    cache_dir: Path
+) -> Dict[str, Any]:
+    """Time fetching every entity of args.entity_type once in the given mode"""
+    cache = None
+    if mode in ("cached", "revalidated"):
+        # ttl=0 makes every entry stale, forcing a conditional request
+        cache = ApiCache(cache_dir / mode, ttl=0 if mode == "revalidated" else 3600)
+        _fetch_all(_client(url, args, cache=cache), args)  # warm up
+
+    client = _client(url, args, cache=cache, max_concurrency=1 if mode == "sequential" else args.concurrency)
+    fields = ["description", "category.name"] if mode == "projected" else None
+
+    requests_before = compendium.counters["requests"]
+    start = time.perf_counter()
+    count = _fetch_all(client, args, fields)
+    elapsed = time.perf_counter() - start
+    client.close()
+
+    return {
+        "entities": count,
+        "seconds": elapsed,
+        "requests": compendium.counters["requests"] - requests_before,
+    }
+
+
+def _client(url: str, args: argparse.Namespace, **kwargs) -> DndApiClient:
+    # A private breaker per client so injected errors in one mode don't trip the next
+    return DndApiClient(
+        url,
+        pool_size=args.concurrency,
+        backoff_factor=0.05,
+        circuit_breaker=CircuitBreaker(failure_threshold=1000),
+        **kwargs
+    )
+
+
+def _fetch_all(client: DndApiClient, args: argparse.Namespace, fields: Optional[List[str]] = None) -> int:
+    return sum(1 for _ in client.fetch_entities(args.entity_type, per_page=args.per_page, fields=fields))
+
+
+def median_of(repeat: int, fn: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+    """Run fn repeat times; return the median run plus the max-min spread in seconds"""
+    runs = sorted((fn() for _ in range(repeat)), key=lambda r: r["seconds"])
+    return dict(runs[len(runs) // 2], spread=runs[-1]["seconds"] - runs[0]["seconds"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark DndApiClient against a fake compendium API')
+    parser.add_argument('--entity-type', default='monsters', help='Entity type to fetch (API form)')
+    parser.add_argument('--count', type=int, default=1000, help='Entities served per type')
+    parser.add_argument('--entity-bytes', type=int, default=4096, help='Approximate JSON size per entity')
+    parser.add_argument('--per-page', type=int, default=100, help='Page size requested')
+    parser.add_argument('--latency-ms', type=float, default=20, help='Server latency per response')
+    parser.add_argument('--jitter-ms', type=float, default=5, help='Extra random server latency')
+    parser.add_argument('--error-rate', type=float, default=0, help='Fraction of 500 responses')
+    parser.add_argument('--bad-gateway-rate', type=float, default=0, help='Fraction of 502 responses')
+    parser.add_argument('--concurrency', type=int, default=4, help='max_concurrency for concurrent modes')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per mode (median reported)')
+    parser.add_argument('--mode', action='append', choices=MODES, dest='modes',
+                        help='Mode to run (repeatable; default: all)')
+    args = parser.parse_args()
+
+    compendium = FakeCompendium(
+        count=args.count,
+        entity_bytes=args.entity_bytes,
+        latency=args.latency_ms / 1000,
+        jitter=args.jitter_ms / 1000,
+        error_rate=args.error_rate,
+        bad_gateway_rate=args.bad_gateway_rate
+    )
+    server = create_server(compendium)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = base_url(server)
+
+    print(f"Fake API {url}: {args.count} {args.entity_type} x ~{args.entity_bytes} B, "
+          f"{args.latency_ms:g}±{args.jitter_ms:g} ms latency, per_page={args.per_page}")
+    print(f"{'mode':<12} {'median ms':>10} {'spread ms':>10} {'entities/s':>11} {'requests':>9}")
+
+    try:
+        # Let the server build and encode its pages before anything is timed
+        _fetch_all(_client(url, args, max_concurrency=args.concurrency), args)
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            for mode in args.modes or MODES:
+                result = median_of(args.repeat, lambda: run_mode(mode, url, compendium, args, Path(tmpdir)))
+                rate = result["entities"] / result["seconds"] if result["seconds"] else float("inf")
+                print(f"{mode:<12} {result['seconds'] * 1000:>10.1f} {result['spread'] * 1000:>10.1f} "
+                      f"{rate:>11.0f} {result['requests']:>9}")
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+End-to-end throughput benchmark of the CLI pipeline with the mock provider
+
+Writes a snapshot of synthetic entities (the fake compendium's), then runs
+the real CLI (`python -m src.cli --from-snapshot ...`) once per worker count
+against the mock image provider: prompts, provider latency, saving, WebP
+conversions and manifest updates all happen as in production, only the
+image API is simulated. Each run gets a fresh output directory and reports
+images/min, wall and CPU time, peak RSS, failures and per-stage p50/p95.
+
+Example:
+  python benchmarks/bench_pipeline.py --count 200 --workers 1 2 4 8 --latency-ms 1500
+"""
+
+import sys
+from pathlib import Path
+
+# Add project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import argparse
+import json
+import subprocess
+import tempfile
+from typing import Any, Dict
+
+import yaml
+
+from benchmarks.fake_compendium import FakeCompendium
+from src.generator.snapshot import write_snapshot
+
+STAGES = ["prompt", "generate", "save", "conversions", "manifest"]
+
+
+def build_config(args: argparse.Namespace, base_config: Dict[str, Any], output_dir: Path) -> Dict[str, Any]:
+    """Repo config with the mock provider selected and output redirected to output_dir"""
+    config = dict(base_config)
+    config["image_generation"] = dict(base_config["image_generation"], provider="mock")
+    config["image_generation"]["mock"] = {
+        "width": args.size,
+        "height": args.size,
+        "latency": {
+            "distribution": args.latency_distribution,
+            "mean": args.latency_ms / 1000,
+            "min": args.latency_ms / 2000,
+            "max": args.latency_ms * 1.5 / 1000,
+            "stddev": args.latency_ms / 4000,
+            "sigma": args.latency_sigma,
+        },
+        "failure_rate": args.failure_rate,
+        "rate_limit_rate": args.rate_limit_rate,
+        "retry_after": args.retry_after,
+        # Per-key quota: the key pool keeps each key within it
+        "api_keys": [f"mock-{i + 1}" for i in range(args.keys)],
+        "key_quota": args.key_quota,
+        "key_concurrency": args.key_quota,
+        "hedging": {
+            "enabled": args.hedge_percentile is not None,
+            "percentile": args.hedge_percentile,
+            "min_delay": 0,
+            "min_samples": 20,
+            "max_ratio": args.hedge_max_ratio,
+        },
+        "max_retries": 3,
+        "retry_delay": args.retry_after,
+        "seed": 0,
+    }
+
+    output = dict(base_config["output"], base_path=str(output_dir))
+    output["conversions"] = dict(
+        base_config["output"]["conversions"],
+        enabled=not args.no_conversions,
+        path=str(output_dir / "conversions")
+    )
+    config["output"] = output
+    config["generation"] = dict(base_config.get("generation", {}), batch_delay=0)
+    return config
+
+
+def run_cli(args: argparse.Namespace, snapshot: Path, config: Dict[str, Any], workers: int, workdir: Path) -> Dict[str, Any]:
+    """Run the CLI once in a subprocess; return its --timings-json report"""
+    config_path = workdir / f"config-{workers}.yaml"
+    timings_path = workdir / f"timings-{workers}.json"
+    with open(config_path, 'w') as f:
+        yaml.safe_dump(config, f)
+
+    subprocess.run(
+        [
+            sys.executable, "-m", "src.cli",
+            "--entity-type", args.entity_type,
+            "--from-snapshot", str(snapshot),
+            "--config", str(config_path),
+            "--workers", str(workers),
+            "--timings-json", str(timings_path),
+            "--force-regenerate",
+        ],
+        cwd=project_root,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        check=True
+    )
+
+    with open(timings_path) as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the generation pipeline with the mock provider')
+    parser.add_argument('--entity-type', default='monsters', help='Entity type to generate (CLI form)')
+    parser.add_argument('--count', type=int, default=100, help='Entities in the snapshot')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8], help='Worker counts to compare')
+    parser.add_argument('--size', type=int, default=1024, help='Mock image width and height')
+    parser.add_argument('--latency-ms', type=float, default=1000, help='Mock provider latency (median/mean)')
+    parser.add_argument('--latency-distribution', default='lognormal',
+                        choices=['fixed', 'uniform', 'normal', 'lognormal'], help='Mock latency distribution')
+    parser.add_argument('--latency-sigma', type=float, default=0.4,
+                        help='Lognormal sigma (larger: longer latency tail)')
+    parser.add_argument('--failure-rate', type=float, default=0.02, help='Fraction of failed provider calls')
+    parser.add_argument('--rate-limit-rate', type=float, default=0.02, help='Fraction of 429 provider calls')
+    parser.add_argument('--retry-after', type=float, default=0.5, help='Retry-After seconds on mock 429s')
+    parser.add_argument('--keys', type=int, default=1, help='Mock API keys to spread requests over')
+    parser.add_argument('--key-quota', type=int, default=None,
+                        help='Concurrent requests each mock key allows (default: unlimited)')
+    parser.add_argument('--hedge-percentile', type=float, default=None,
+                        help='Hedge mock requests slower than this latency percentile (default: no hedging)')
+    parser.add_argument('--hedge-max-ratio', type=float, default=0.1, help='Cap on hedges as a fraction of requests')
+    parser.add_argument('--no-conversions', action='store_true', help='Skip WebP conversions')
+    parser.add_argument('--config', default=str(project_root / 'config.yaml'), help='Base config file')
+    args = parser.parse_args()
+
+    with open(args.config) as f:
+        base_config = yaml.safe_load(f)
+
+    compendium = FakeCompendium(count=args.count, entity_bytes=1024)
+    api_entity_type = args.entity_type.replace('_', '-')
+
+    print(f"{args.count} {args.entity_type}, mock {args.size}px images, {args.latency_distribution} "
+          f"{args.latency_ms:g} ms latency, {args.failure_rate:.0%} failures, {args.rate_limit_rate:.0%} 429s")
+    print(f"{'workers':>7} {'img/min':>8} {'wall s':>7} {'cpu s':>6} {'rss MB':>7} {'failed':>6}  "
+          + "  ".join(f"{stage + ' p50/p95 ms':>22}" for stage in STAGES))
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        workdir = Path(tmpdir)
+        snapshot = workdir / "entities.jsonl.gz"
+        write_snapshot(
+            snapshot,
+            "fake-compendium",
+            [(api_entity_type, (compendium.entity(api_entity_type, i) for i in range(args.count)))]
+        )
+
+        for workers in args.workers:
+            config = build_config(args, base_config, workdir / f"output-{workers}")
+            report = run_cli(args, snapshot, config, workers, workdir)
+
+            stages = report["stages"]
+            cells = []
+            for stage in STAGES:
+                s = stages.get(stage)
+                cells.append(f"{s['p50'] * 1000:>10.1f}/{s['p95'] * 1000:<11.1f}" if s else f"{'-':>22}")
+            print(f"{workers:>7} {report['images_per_minute']:>8.1f} {report['wall_seconds']:>7.1f} "
+                  f"{report['cpu_seconds']:>6.1f} {report['max_rss_mb']:>7.0f} {report['failed']:>6}  "
+                  + "  ".join(cells))
+
+            hedging = report.get("provider", {}).get("hedging")
+            if hedging:
+                print(f"{'':>7} hedged {hedging['hedged']}/{hedging['requests']} ({hedging['hedge_rate']:.1%}), "
+                      f"{hedging['hedge_wins']} hedge wins, {hedging['saved_seconds']:.1f}s saved")
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark of PromptBuilder on entity payloads
+
+Builds a prompt for every entity of each type with the templates from
+config.yaml and reports prompts per second. Entities come from a snapshot
+(scripts/export_snapshot.py), so real API payloads can be measured offline,
+or from the fake compendium when no snapshot is given.
+
+Example:
+  python benchmarks/bench_prompt_builder.py --snapshot snapshots/entities.jsonl.gz
+  python benchmarks/bench_prompt_builder.py --count 5000 --entity-type spells --entity-type items
+"""
+
+import sys
+from pathlib import Path
+
+# Add project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import argparse
+import time
+from collections import deque
+from typing import Any, Dict, List
+
+from benchmarks.fake_compendium import FakeCompendium
+from src.config import ENTITY_TYPES, get_prompt_config, load_config
+from src.generator.prompt_builder import PromptBuilder
+from src.generator.snapshot import EntitySnapshot
+
+
+def load_entities(args: argparse.Namespace, entity_type: str) -> List[Dict[str, Any]]:
+    """Entities of one type from the snapshot, or synthetic ones"""
+    api_entity_type = entity_type.replace('_', '-')
+    if args.snapshot:
+        snapshot = EntitySnapshot(args.snapshot)
+        if not snapshot.has_type(entity_type):
+            return []
+        return list(snapshot.fetch_entities(api_entity_type, limit=args.count))
+
+    compendium = FakeCompendium(count=args.count, entity_bytes=args.entity_bytes)
+    return [compendium.entity(api_entity_type, i) for i in range(args.count)]
+
+
+def best_rate(repeat: int, count: int, fn) -> float:
+    """Best of repeat runs, in calls per second"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return count / best if best else float("inf")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark PromptBuilder prompts/sec')
+    parser.add_argument('--snapshot', help='Entity snapshot to read payloads from (default: synthetic entities)')
+    parser.add_argument('--entity-type', action='append', choices=ENTITY_TYPES, dest='entity_types',
+                        help='Entity type to benchmark (repeatable; default: spells, items, monsters)')
+    parser.add_argument('--count', type=int, default=2000, help='Entities per type (limit for snapshots)')
+    parser.add_argument('--entity-bytes', type=int, default=2048, help='Approximate size of synthetic entities')
+    parser.add_argument('--repeat', type=int, default=5, help='Runs per measurement (best reported)')
+    parser.add_argument('--config', default=str(project_root / 'config.yaml'), help='Config file with templates')
+    args = parser.parse_args()
+
+    config = load_config(args.config)
+
+    print(f"{'entity type':<18} {'entities':>8} {'build/s':>10} {'build_many/s':>13} {'setup us':>9}")
+    for entity_type in args.entity_types or ['spells', 'items', 'monsters']:
+        entities = load_entities(args, entity_type)
+        if not entities:
+            print(f"{entity_type:<18} {'(not in snapshot)':>8}")
+            continue
+
+        prompt_config = get_prompt_config(config, entity_type)
+        template = prompt_config.get("template") or config.get("prompts", {}).get("template", "")
+
+        start = time.perf_counter()
+        builder = PromptBuilder(prompt_config, entity_type, template)
+        setup = time.perf_counter() - start
+
+        single = best_rate(args.repeat, len(entities), lambda: [builder.build(e) for e in entities])
+        batch = best_rate(args.repeat, len(entities), lambda: deque(builder.build_many(entities), maxlen=0))
+
+        print(f"{entity_type:<18} {len(entities):>8} {single:>10.0f} {batch:>13.0f} {setup * 1e6:>9.1f}")
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+"""
+Stand-in for the D&D Compendium API, for load tests and benchmarks
+
+Serves GET /api/v1/{entity_type} and /api/v1/lookups/{entity_type} with the
+same {"data": [...], "meta": {...}} pagination as the real API, plus
+/api/v1/{entity_type}/{slug} for the per-slug endpoint types. Entities are
+synthetic and deterministic for a given seed; size, latency, 5xx errors and
+502s are configurable. Responses carry ETags and are gzipped on request.
+"""
+
+import sys
+from pathlib import Path
+
+# Add project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import argparse
+import gzip
+import hashlib
+import json
+import logging
+import math
+import random
+import threading
+import time
+from functools import lru_cache
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from src.generator.api_client import LOOKUP_ENTITY_TYPES, SLUG_ENDPOINT_ENTITY_TYPES
+
+logger = logging.getLogger(__name__)
+
+API_PREFIX = "/api/v1"
+
+WORDS = (
+    "arcane ember shadow frost radiant ancient gleaming whispering iron crimson "
+    "storm hollow gilded verdant thorn spectral molten silver obsidian wild"
+).split()
+
+
+class FakeCompendium:
+    """Synthetic entities plus the fault-injection settings of a fake API"""
+
+    def __init__(
+        self,
+        count: int = 500,
+        entity_bytes: int = 2048,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        bad_gateway_rate: float = 0.0,
+        seed: int = 0
+    ):
+        """
+        Args:
+            count: Entities per entity type
+            entity_bytes: Approximate JSON size of each entity (padding goes into
+                a nested stat block the image pipeline never reads)
+            latency: Seconds added to every response
+            jitter: Extra uniform random latency in seconds
+            error_rate: Fraction of requests answered with 500
+            bad_gateway_rate: Fraction of requests answered with an HTML 502
+            seed: Seed for entity content and fault injection
+        """
+        self.count = count
+        self.entity_bytes = entity_bytes
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.bad_gateway_rate = bad_gateway_rate
+        self.seed = seed
+
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.counters = {"requests": 0, "not_modified": 0, "errors": 0, "bad_gateway": 0}
+
+    def page(self, entity_type: str, page: int, per_page: int) -> Dict[str, Any]:
+        """One page in the API's pagination format"""
+        last_page = max(1, math.ceil(self.count / per_page))
+        start = (page - 1) * per_page
+        return {
+            "data": [self.entity(entity_type, i) for i in range(start, min(start + per_page, self.count))],
+            "meta": {"current_page": page, "last_page": last_page, "per_page": per_page, "total": self.count},
+        }
+
+    @lru_cache(maxsize=4096)
+    def page_body(self, entity_type: str, page: int, per_page: int, gzipped: bool) -> bytes:
+        """Encoded page, cached so the server's own CPU cost stays out of benchmarks"""
+        body = json.dumps(self.page(entity_type, page, per_page)).encode()
+        return gzip.compress(body, compresslevel=5) if gzipped else body
+
+    @lru_cache(maxsize=65536)
+    def entity(self, entity_type: str, index: int) -> Dict[str, Any]:
+        """Deterministic synthetic entity"""
+        rng = random.Random(f"{self.seed}:{entity_type}:{index}")
+        name = " ".join(rng.choice(WORDS) for _ in range(2)).title() + f" {index}"
+        entity: Dict[str, Any] = {"id": index + 1, "name": name}
+
+        if entity_type in LOOKUP_ENTITY_TYPES:
+            entity["code"] = f"{entity_type[:3].upper()}{index}"
+        else:
+            entity["slug"] = f"phb:{name.lower().replace(' ', '-')}"
+
+        entity["description"] = " ".join(rng.choice(WORDS) for _ in range(40)).capitalize() + "."
+        entity["category"] = {"name": rng.choice(WORDS).title(), "code": rng.choice(WORDS)[:3].upper()}
+
+        # Pad with a stat block to reach roughly entity_bytes
+        padding = max(0, self.entity_bytes - len(json.dumps(entity)))
+        actions = []
+        while padding > 0:
+            desc = " ".join(rng.choice(WORDS) for _ in range(min(30, padding // 8 + 1)))
+            actions.append({"name": rng.choice(WORDS).title(), "bonus": rng.randint(1, 12), "desc": desc})
+            padding -= len(desc) + 40
+        if actions:
+            entity["actions"] = actions
+        return entity
+
+    def find(self, entity_type: str, slug: str) -> Optional[Dict[str, Any]]:
+        """Entity by slug or code"""
+        for i in range(self.count):
+            entity = self.entity(entity_type, i)
+            if entity.get("slug") == slug or entity.get("code") == slug:
+                return entity
+        return None
+
+    def etag(self, *parts: Any) -> str:
+        key = ":".join(str(p) for p in (self.seed, self.count, self.entity_bytes) + parts)
+        return '"' + hashlib.sha1(key.encode()).hexdigest()[:16] + '"'
+
+    def inject(self) -> Optional[HTTPStatus]:
+        """Sleep for the configured latency; return an error status to send, if any"""
+        with self._lock:
+            self.counters["requests"] += 1
+            roll = self._rng.random()
+            delay = self.latency + (self._rng.uniform(0, self.jitter) if self.jitter else 0)
+
+        if delay:
+            time.sleep(delay)
+        if roll < self.bad_gateway_rate:
+            self.record("bad_gateway")
+            return HTTPStatus.BAD_GATEWAY
+        if roll < self.bad_gateway_rate + self.error_rate:
+            self.record("errors")
+            return HTTPStatus.INTERNAL_SERVER_ERROR
+        return None
+
+    def record(self, counter: str):
+        with self._lock:
+            self.counters[counter] += 1
+
+
+class FakeCompendiumHandler(BaseHTTPRequestHandler):
+    """Request handler; the compendium lives on server.compendium"""
+
+    # Keep-alive, so pooled sessions behave as they would against the real API
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        compendium: FakeCompendium = self.server.compendium
+
+        error = compendium.inject()
+        if error == HTTPStatus.BAD_GATEWAY:
+            self._send(error, b"<html><body><h1>502 Bad Gateway</h1></body></html>", "text/html")
+            return
+        if error:
+            self._send_json(error, {"message": "Server Error"})
+            return
+
+        resolved = self._route(urlsplit(self.path).path)
+        if resolved is None:
+            self._send_json(HTTPStatus.NOT_FOUND, {"message": "Not Found"})
+            return
+
+        entity_type, slug = resolved
+        if slug is not None:
+            entity = compendium.find(entity_type, slug)
+            if entity is None:
+                self._send_json(HTTPStatus.NOT_FOUND, {"message": "Not Found"})
+            else:
+                self._send_json(HTTPStatus.OK, {"data": entity})
+            return
+
+        query = parse_qs(urlsplit(self.path).query)
+        try:
+            page = max(1, int(query.get("page", ["1"])[0]))
+            per_page = max(1, min(1000, int(query.get("per_page", ["15"])[0])))
+        except ValueError:
+            self._send_json(HTTPStatus.UNPROCESSABLE_ENTITY, {"message": "Invalid page"})
+            return
+
+        etag = compendium.etag(entity_type, page, per_page)
+        if self.headers.get("If-None-Match") == etag:
+            compendium.record("not_modified")
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        gzipped = self._accepts_gzip()
+        body = compendium.page_body(entity_type, page, per_page, gzipped)
+        self._send(HTTPStatus.OK, body, "application/json", etag, compressed=gzipped)
+
+    @staticmethod
+    def _route(path: str) -> Optional[Tuple[str, Optional[str]]]:
+        """(entity_type, slug or None) for a known API path"""
+        if not path.startswith(API_PREFIX + "/"):
+            return None
+        parts = [unquote(p) for p in path[len(API_PREFIX) + 1:].strip("/").split("/")]
+
+        if parts[0] == "lookups":
+            if len(parts) == 2 and parts[1] in LOOKUP_ENTITY_TYPES:
+                return parts[1], None
+            return None
+        if len(parts) == 1 and parts[0] not in LOOKUP_ENTITY_TYPES:
+            return parts[0], None
+        if len(parts) == 2 and parts[0] in SLUG_ENDPOINT_ENTITY_TYPES:
+            return parts[0], parts[1]
+        return None
+
+    def _accepts_gzip(self) -> bool:
+        return "gzip" in self.headers.get("Accept-Encoding", "")
+
+    def _send_json(self, status: HTTPStatus, payload: Any):
+        body = json.dumps(payload).encode()
+        gzipped = self._accepts_gzip()
+        if gzipped:
+            body = gzip.compress(body, compresslevel=5)
+        self._send(status, body, "application/json", compressed=gzipped)
+
+    def _send(
+        self,
+        status: HTTPStatus,
+        body: bytes,
+        content_type: str,
+        etag: Optional[str] = None,
+        compressed: bool = False
+    ):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        if compressed:
+            self.send_header("Content-Encoding", "gzip")
+        if etag:
+            self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+
+def create_server(compendium: FakeCompendium, host: str = "127.0.0.1", port: int = 0) -> ThreadingHTTPServer:
+    """Build a fake compendium server (port 0 picks a free port)"""
+    server = ThreadingHTTPServer((host, port), FakeCompendiumHandler)
+    server.daemon_threads = True
+    server.compendium = compendium
+    return server
+
+
+def base_url(server: ThreadingHTTPServer) -> str:
+    """API base URL of a running fake server"""
+    host, port = server.server_address[:2]
+    return f"http://{host}:{port}{API_PREFIX}"
+
+
+def main():
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
+    parser = argparse.ArgumentParser(description='Serve a fake D&D Compendium API')
+    parser.add_argument('--host', default='127.0.0.1', help='Bind address')
+    parser.add_argument('--port', type=int, default=8090, help='Port (default: 8090)')
+    parser.add_argument('--count', type=int, default=500, help='Entities per type')
+    parser.add_argument('--entity-bytes', type=int, default=2048, help='Approximate JSON size per entity')
+    parser.add_argument('--latency-ms', type=float, default=0, help='Latency added to every response')
+    parser.add_argument('--jitter-ms', type=float, default=0, help='Extra random latency')
+    parser.add_argument('--error-rate', type=float, default=0, help='Fraction of 500 responses')
+    parser.add_argument('--bad-gateway-rate', type=float, default=0, help='Fraction of 502 responses')
+    parser.add_argument('--seed', type=int, default=0, help='Seed for content and faults')
+    args = parser.parse_args()
+
+    compendium = FakeCompendium(
+        count=args.count,
+        entity_bytes=args.entity_bytes,
+        latency=args.latency_ms / 1000,
+        jitter=args.jitter_ms / 1000,
+        error_rate=args.error_rate,
+        bad_gateway_rate=args.bad_gateway_rate,
+        seed=args.seed
+    )
+    server = create_server(compendium, args.host, args.port)
+
+    logger.info(f"Fake compendium API on {base_url(server)} ({args.count} entities per type)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        logger.info(f"Served: {compendium.counters}")
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
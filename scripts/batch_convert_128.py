@@ -2,8 +2,8 @@
 """
 Batch converter to create 128x128 versions of all existing images.
 
-This script scans all provider directories under output/{entity_type}/{provider}/
-and creates 128px conversions in output/conversions/128/{entity_type}/{provider}/
+This script lists all originals under output/{entity_type}/{provider}/ from the
+output index and creates 128px conversions in output/conversions/128/{entity_type}/{provider}/
 """
 
 import sys
@@ -15,6 +15,8 @@ import logging
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
+from src.generator.output_index import OutputIndex
+
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(levelname)s - %(message)s'
@@ -26,7 +28,8 @@ def convert_images(
     output_dir: Path,
     conversions_dir: Path,
     target_size: int = 128,
-    dry_run: bool = False
+    dry_run: bool = False,
+    rebuild_index: bool = False
 ) -> dict:
     """
     Convert all images to target size.
@@ -36,6 +39,7 @@ def convert_images(
         conversions_dir: Base conversions directory
         target_size: Target size in pixels (default 128)
         dry_run: If True, only report what would be done
+        rebuild_index: Rescan the output tree instead of using the persisted index
 
     Returns:
         Stats dict with counts
@@ -48,62 +52,52 @@ def convert_images(
         "by_entity_type": {}
     }
 
-    # Find all entity type directories
-    for entity_dir in sorted(output_dir.iterdir()):
-        if not entity_dir.is_dir():
-            continue
-        if entity_dir.name.startswith('.'):
-            continue
-        if entity_dir.name == 'conversions':
-            continue
-
-        entity_type = entity_dir.name
-        stats["by_entity_type"][entity_type] = {"converted": 0, "skipped": 0, "errors": 0}
-
-        # Find provider directories (e.g., stability-ai, dall-e)
-        for provider_dir in sorted(entity_dir.iterdir()):
-            if not provider_dir.is_dir():
-                continue
+    index = OutputIndex.load(output_dir, conversions_dir, rebuild=rebuild_index)
 
-            provider_name = provider_dir.name
+    # All PNG originals, sorted by entity type, provider and slug
+    for entry in index.entries(originals=True, fmt="png"):
+        entity_type = entry.entity_type
+        entity_stats = stats["by_entity_type"].setdefault(
+            entity_type, {"converted": 0, "skipped": 0, "errors": 0}
+        )
+        stats["found"] += 1
 
-            # Create target directory
-            target_dir = conversions_dir / str(target_size) / entity_type / provider_name
+        image_path = index.path_for(entry)
+        target_dir = conversions_dir / str(target_size) / entity_type / entry.provider
+        target_path = target_dir / image_path.name
 
-            # Process all PNG files
-            for image_path in sorted(provider_dir.glob("*.png")):
-                stats["found"] += 1
-
-                target_path = target_dir / image_path.name
+        # Skip if already exists
+        if index.has(entity_type, entry.slug, provider=entry.provider, size=target_size, fmt="png"):
+            stats["skipped"] += 1
+            entity_stats["skipped"] += 1
+            continue
 
-                # Skip if already exists
-                if target_path.exists():
-                    stats["skipped"] += 1
-                    stats["by_entity_type"][entity_type]["skipped"] += 1
-                    continue
+        if dry_run:
+            logger.info(f"Would convert: {image_path} -> {target_path}")
+            stats["converted"] += 1
+            entity_stats["converted"] += 1
+            continue
 
-                if dry_run:
-                    logger.info(f"Would convert: {image_path} -> {target_path}")
-                    stats["converted"] += 1
-                    stats["by_entity_type"][entity_type]["converted"] += 1
-                    continue
+        try:
+            # Ensure target directory exists
+            target_dir.mkdir(parents=True, exist_ok=True)
 
-                try:
-                    # Ensure target directory exists
-                    target_dir.mkdir(parents=True, exist_ok=True)
+            # Open and resize
+            with Image.open(image_path) as img:
+                resized = img.resize((target_size, target_size), Image.Resampling.LANCZOS)
+                resized.save(target_path, format='PNG')
 
-                    # Open and resize
-                    with Image.open(image_path) as img:
-                        resized = img.resize((target_size, target_size), Image.Resampling.LANCZOS)
-                        resized.save(target_path, format='PNG')
+            index.record(target_path, entity_type, entry.provider, entry.slug, target_size)
+            stats["converted"] += 1
+            entity_stats["converted"] += 1
 
-                    stats["converted"] += 1
-                    stats["by_entity_type"][entity_type]["converted"] += 1
+        except Exception as e:
+            logger.error(f"Error converting {image_path}: {e}")
+            stats["errors"] += 1
+            entity_stats["errors"] += 1
 
-                except Exception as e:
-                    logger.error(f"Error converting {image_path}: {e}")
-                    stats["errors"] += 1
-                    stats["by_entity_type"][entity_type]["errors"] += 1
+    if not dry_run:
+        index.save()
 
     return stats
 
@@ -119,6 +113,11 @@ def main():
         action="store_true",
         help="Show what would be done without making changes"
     )
+    parser.add_argument(
+        "--rebuild-index",
+        action="store_true",
+        help="Rescan the output tree instead of using the persisted index"
+    )
     parser.add_argument(
         "--size",
         type=int,
@@ -151,7 +150,8 @@ def main():
         output_dir=args.output_dir,
         conversions_dir=args.conversions_dir,
         target_size=args.size,
-        dry_run=args.dry_run
+        dry_run=args.dry_run,
+        rebuild_index=args.rebuild_index
     )
 
     # Print summary
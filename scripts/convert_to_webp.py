@@ -2,8 +2,8 @@
 """
 Convert all PNG images in conversions directory to WebP format.
 
-Scans output/conversions/{size}/{entity_type}/{provider}/*.png
-and creates .webp versions alongside each PNG file.
+Lists output/conversions/{size}/{entity_type}/{provider}/*.png from the
+output index and creates .webp versions alongside each PNG file.
 
 WebP provides significant file size savings (typically 25-35% smaller)
 while maintaining visual quality.
@@ -11,6 +11,7 @@ while maintaining visual quality.
 
 import sys
 from pathlib import Path
+from typing import Optional
 from PIL import Image
 import logging
 import argparse
@@ -18,6 +19,9 @@ import argparse
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
+from src.generator.image_quality import find_webp_quality, search_settings
+from src.generator.output_index import OutputIndex
+
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(levelname)s - %(message)s'
@@ -28,7 +32,10 @@ logger = logging.getLogger(__name__)
 def convert_to_webp(
     conversions_dir: Path,
     quality: int = 85,
-    dry_run: bool = False
+    dry_run: bool = False,
+    quality_search: Optional[dict] = None,
+    output_dir: Optional[Path] = None,
+    rebuild_index: bool = False
 ) -> dict:
     """
     Convert all PNG files in conversions directory to WebP format.
@@ -37,6 +44,10 @@ def convert_to_webp(
         conversions_dir: Base conversions directory
         quality: WebP quality (0-100, default 85)
         dry_run: If True, only report what would be done
+        quality_search: Optional quality_search settings; when given, each image
+            uses the lowest quality meeting the perceptual target instead of `quality`
+        output_dir: Output base directory holding the index (default: parent of conversions_dir)
+        rebuild_index: Rescan the output tree instead of using the persisted index
 
     Returns:
         Stats dict with counts and file sizes
@@ -48,81 +59,74 @@ def convert_to_webp(
         "errors": 0,
         "png_bytes": 0,
         "webp_bytes": 0,
-        "by_size": {}
+        "by_size": {},
+        "by_quality": {}
     }
 
-    # Process each size directory (128, 256, 512)
-    for size_dir in sorted(conversions_dir.iterdir()):
-        if not size_dir.is_dir():
-            continue
-        if size_dir.name.startswith('.'):
-            continue
+    index = OutputIndex.load(output_dir or conversions_dir.parent, conversions_dir, rebuild=rebuild_index)
 
-        size_name = size_dir.name
-        stats["by_size"][size_name] = {
+    # All PNG conversions, sorted by size, entity type, provider and slug
+    for entry in index.entries(originals=False, fmt="png"):
+        size_name = str(entry.size)
+        size_stats = stats["by_size"].setdefault(size_name, {
             "found": 0,
             "converted": 0,
             "skipped": 0,
             "errors": 0,
             "png_bytes": 0,
             "webp_bytes": 0
-        }
-
-        # Process each entity type
-        for entity_dir in sorted(size_dir.iterdir()):
-            if not entity_dir.is_dir():
-                continue
-
-            # Process each provider directory
-            for provider_dir in sorted(entity_dir.iterdir()):
-                if not provider_dir.is_dir():
-                    continue
-
-                # Process all PNG files
-                for png_path in sorted(provider_dir.glob("*.png")):
-                    stats["found"] += 1
-                    stats["by_size"][size_name]["found"] += 1
-
-                    webp_path = png_path.with_suffix(".webp")
-
-                    # Skip if WebP already exists
-                    if webp_path.exists():
-                        stats["skipped"] += 1
-                        stats["by_size"][size_name]["skipped"] += 1
-                        # Still count sizes for comparison
-                        png_size = png_path.stat().st_size
-                        webp_size = webp_path.stat().st_size
-                        stats["png_bytes"] += png_size
-                        stats["webp_bytes"] += webp_size
-                        stats["by_size"][size_name]["png_bytes"] += png_size
-                        stats["by_size"][size_name]["webp_bytes"] += webp_size
-                        continue
-
-                    if dry_run:
-                        logger.debug(f"Would convert: {png_path} -> {webp_path}")
-                        stats["converted"] += 1
-                        stats["by_size"][size_name]["converted"] += 1
-                        continue
-
-                    try:
-                        # Convert to WebP
-                        with Image.open(png_path) as img:
-                            img.save(webp_path, format='WEBP', quality=quality)
-
-                        png_size = png_path.stat().st_size
-                        webp_size = webp_path.stat().st_size
-
-                        stats["png_bytes"] += png_size
-                        stats["webp_bytes"] += webp_size
-                        stats["by_size"][size_name]["png_bytes"] += png_size
-                        stats["by_size"][size_name]["webp_bytes"] += webp_size
-                        stats["converted"] += 1
-                        stats["by_size"][size_name]["converted"] += 1
-
-                    except Exception as e:
-                        logger.error(f"Error converting {png_path}: {e}")
-                        stats["errors"] += 1
-                        stats["by_size"][size_name]["errors"] += 1
+        })
+        stats["found"] += 1
+        size_stats["found"] += 1
+
+        png_path = index.path_for(entry)
+        webp_path = png_path.with_suffix(".webp")
+        webp_entry = index.get(entry.entity_type, entry.provider, entry.slug, entry.size, "webp")
+
+        # Skip if WebP already exists
+        if webp_entry:
+            stats["skipped"] += 1
+            size_stats["skipped"] += 1
+            # Still count sizes for comparison
+            stats["png_bytes"] += entry.bytes
+            stats["webp_bytes"] += webp_entry.bytes
+            size_stats["png_bytes"] += entry.bytes
+            size_stats["webp_bytes"] += webp_entry.bytes
+            continue
+
+        if dry_run:
+            logger.debug(f"Would convert: {png_path} -> {webp_path}")
+            stats["converted"] += 1
+            size_stats["converted"] += 1
+            continue
+
+        try:
+            # Convert to WebP
+            with Image.open(png_path) as img:
+                if quality_search:
+                    chosen, webp_data, _ = find_webp_quality(img, **quality_search)
+                    webp_path.write_bytes(webp_data)
+                else:
+                    chosen = quality
+                    img.save(webp_path, format='WEBP', quality=quality)
+
+            stats["by_quality"][chosen] = stats["by_quality"].get(chosen, 0) + 1
+            webp_entry = index.record(webp_path, entry.entity_type, entry.provider, entry.slug, entry.size)
+
+            stats["png_bytes"] += entry.bytes
+            stats["webp_bytes"] += webp_entry.bytes
+            size_stats["png_bytes"] += entry.bytes
+            size_stats["webp_bytes"] += webp_entry.bytes
+            stats["converted"] += 1
+            size_stats["converted"] += 1
+
+        except Exception as e:
+            logger.error(f"Error converting {png_path}: {e}")
+            stats["errors"] += 1
+            size_stats["errors"] += 1
+
+    if not dry_run:
+        index.save()
 
     return stats
 
@@ -151,25 +155,58 @@ def main():
         default=85,
         help="WebP quality (0-100, default: 85)"
     )
+    parser.add_argument(
+        "--target-ssim",
+        type=float,
+        help="Pick the lowest quality per image meeting this SSIM (e.g. 0.985)"
+    )
+    parser.add_argument(
+        "--target-psnr",
+        type=float,
+        help="Pick the lowest quality per image meeting this PSNR in dB (e.g. 40)"
+    )
     parser.add_argument(
         "--conversions-dir",
         type=Path,
         default=project_root / "output" / "conversions",
         help="Conversions directory (default: ./output/conversions)"
     )
+    parser.add_argument(
+        "--output-dir",
+        type=Path,
+        default=project_root / "output",
+        help="Base output directory holding the index (default: ./output)"
+    )
+    parser.add_argument(
+        "--rebuild-index",
+        action="store_true",
+        help="Rescan the output tree instead of using the persisted index"
+    )
 
     args = parser.parse_args()
 
     if args.dry_run:
         logger.info("DRY RUN - No changes will be made")
 
-    logger.info(f"Converting PNG to WebP (quality={args.quality})")
+    quality_search = None
+    if args.target_ssim is not None:
+        quality_search = search_settings({"metric": "ssim", "target": args.target_ssim})
+    elif args.target_psnr is not None:
+        quality_search = search_settings({"metric": "psnr", "target": args.target_psnr})
+
+    if quality_search:
+        logger.info(f"Converting PNG to WebP ({quality_search['metric']} >= {quality_search['target']})")
+    else:
+        logger.info(f"Converting PNG to WebP (quality={args.quality})")
     logger.info(f"Source: {args.conversions_dir}")
 
     stats = convert_to_webp(
         conversions_dir=args.conversions_dir,
         quality=args.quality,
-        dry_run=args.dry_run
+        dry_run=args.dry_run,
+        quality_search=quality_search,
+        output_dir=args.output_dir,
+        rebuild_index=args.rebuild_index
     )
 
     # Print summary
@@ -208,6 +245,11 @@ def main():
               f"{total_pct:.1f}%")
         print("=" * 70)
 
+    if quality_search and stats["by_quality"]:
+        print("\nChosen quality distribution:")
+        for chosen, count in sorted(stats["by_quality"].items()):
+            print(f"  q={chosen}: {count}")
+
     if args.dry_run:
         print("\nDRY RUN - No changes were made")
 
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Export entities from the compendium API into an offline snapshot.
+
+Writes a gzip-compressed, line-delimited file whose first line is a header
+(API base URL, fetch time, per-type counts). Generation runs can then use
+`python -m src.cli --from-snapshot PATH` on hosts without API access, and
+reruns against the same snapshot see exactly the same entities.
+
+Entities are stored whole so one snapshot serves any prompt configuration.
+"""
+
+import sys
+import argparse
+from datetime import datetime, timezone
+from pathlib import Path
+
+import requests
+
+# Add project root to path for imports
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.config import load_config, ENTITY_TYPES
+from src.generator.api_client import DndApiClient
+from src.generator.snapshot import write_snapshot
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export API entities to a compressed snapshot")
+    parser.add_argument("--output",
+                        help="Snapshot path (default: ./snapshots/entities-<UTC timestamp>.jsonl.gz)")
+    parser.add_argument("--entity-type", action="append", choices=ENTITY_TYPES, dest="entity_types",
+                        help="Entity type to export (repeatable; default: all)")
+    parser.add_argument("--config", default="config.yaml", help="Path to config file")
+    args = parser.parse_args()
+
+    config = load_config(args.config)
+    entity_types = args.entity_types or ENTITY_TYPES
+    output = Path(args.output or (
+        f"./snapshots/entities-{datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%SZ')}.jsonl.gz"
+    ))
+
+    print(f"Exporting {len(entity_types)} entity types from {config['api']['base_url']}...")
+    with DndApiClient.from_config(config["api"]) as api_client:
+        try:
+            header = write_snapshot(
+                output,
+                api_client.base_url,
+                ((t, api_client.fetch_entities(t.replace('_', '-'))) for t in entity_types)
+            )
+        except requests.RequestException as e:
+            # A partial snapshot would look complete to later runs
+            print(f"Error fetching entities from API, no snapshot written: {e}")
+            return 1
+        api_client.log_cache_stats()
+
+    print(f"\n{'='*60}")
+    print(f"SNAPSHOT")
+    print(f"{'='*60}")
+    for entity_type, count in header["counts"].items():
+        print(f"{entity_type}: {count}")
+    print(f"Total: {sum(header['counts'].values())}")
+    print(f"Written: {output} ({output.stat().st_size / 1024:.0f} KB)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+Migrate image files and manifest entries to the prefixed slug format from the API.
+
+The API now returns slugs like "phb:acid-splash" instead of "acid-splash".
+Since colons are problematic in filenames on macOS, we use "--" as separator.
+
+Example: acid-splash.png -> phb--acid-splash.png
+
+Replaces rename_to_prefixed_slugs.py. The migration runs in three steps:
+
+1. Fetch all entity types concurrently through DndApiClient (one pooled
+   HTTP session, page cache).
+2. Build a complete rename plan from the output index, covering originals and
+   every conversion size/format for every provider, and persist it to
+   output/.slug_migration.json.
+3. Apply the plan in a single pass, rewrite manifest entries in one batch and
+   update the output index.
+
+If interrupted, rerunning picks up the saved plan and skips finished renames.
+"""
+
+import os
+import sys
+import json
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Any, List, Tuple
+
+import requests
+
+# Add project root to path for imports
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.config import load_config, ENTITY_TYPES
+from src.generator.api_client import DndApiClient
+from src.generator.file_manager import FileManager
+from src.generator.output_index import IndexEntry
+
+PLAN_FILENAME = ".slug_migration.json"
+
+# Save progress after this many renames so an interrupted run loses little work
+CHECKPOINT_EVERY = 200
+
+
+def fetch_slug_mapping(api_client: DndApiClient, entity_type: str) -> Dict[str, str]:
+    """
+    Fetch all entities of a type and map old (unprefixed) slug to new API slug.
+
+    Returns: {old_slug: new_slug} e.g., {"acid-splash": "phb:acid-splash"}
+    Only prefixed slugs are included; everything else needs no rename.
+    """
+    mapping = {}
+
+    for item in api_client.fetch_entities(entity_type.replace('_', '-'), fields=['slug']):
+        # Lookup entities use 'code' and never carry a prefix
+        new_slug = item.get('slug')
+        if new_slug and ':' in str(new_slug):
+            _, old_slug = str(new_slug).split(':', 1)
+            mapping[old_slug] = str(new_slug)
+
+    return mapping
+
+
+def fetch_all_mappings(
+    api_client: DndApiClient,
+    entity_types: List[str],
+    workers: int
+) -> Dict[str, Dict[str, str]]:
+    """Fetch slug mappings for all entity types concurrently over the client's pooled session."""
+    def fetch(entity_type: str) -> Tuple[str, Dict[str, str]]:
+        return entity_type, fetch_slug_mapping(api_client, entity_type)
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return dict(executor.map(fetch, entity_types))
+
+
+def build_plan(file_manager: FileManager, mappings: Dict[str, Dict[str, str]]) -> Dict[str, Any]:
+    """
+    Compute every file rename and manifest rename needed.
+
+    File renames cover originals and all conversion sizes/formats for every
+    provider. Renames whose target already exists are reported as conflicts.
+    """
+    index = file_manager.index
+    renames = []
+    conflicts = []
+    manifest_renames: Dict[str, Dict[str, str]] = {}
+
+    for entity_type, mapping in sorted(mappings.items()):
+        if not mapping:
+            continue
+        manifest_renames[entity_type] = dict(mapping)
+
+        for entry in index.entries(entity_type=entity_type):
+            new_slug = mapping.get(entry.slug)
+            if not new_slug:
+                continue
+            new_fs_slug = new_slug.replace(':', '--')
+            target = entry._replace(slug=new_fs_slug)
+
+            op = {
+                "from": str(index.path_for(entry)),
+                "to": str(index.path_for(target)),
+                "entry": list(entry),
+                "done": False,
+            }
+            if index.get(entity_type, entry.provider, new_fs_slug, entry.size, entry.format):
+                conflicts.append(op)
+            else:
+                renames.append(op)
+
+    return {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "renames": renames,
+        "conflicts": conflicts,
+        "manifest_renames": manifest_renames,
+        "manifest_done": False,
+    }
+
+
+def save_plan(plan_path: Path, plan: Dict[str, Any]):
+    """Write the plan atomically."""
+    tmp_path = plan_path.with_suffix(".tmp")
+    with open(tmp_path, 'w') as f:
+        json.dump(plan, f)
+    os.replace(tmp_path, plan_path)
+
+
+def apply_plan(file_manager: FileManager, plan: Dict[str, Any], plan_path: Path) -> Dict[str, int]:
+    """
+    Apply a rename plan in a single pass, checkpointing progress to plan_path.
+
+    A rename whose source is gone but whose target exists is treated as done,
+    which covers renames completed just before an interruption.
+    """
+    index = file_manager.index
+    stats = {"renamed": 0, "already_done": 0, "missing": 0, "errors": 0, "manifest": 0}
+
+    for i, op in enumerate(plan["renames"], 1):
+        if op["done"]:
+            stats["already_done"] += 1
+            continue
+
+        old_entry = IndexEntry(*op["entry"])
+
+        try:
+            os.rename(op["from"], op["to"])
+            stats["renamed"] += 1
+        except FileNotFoundError:
+            if not os.path.exists(op["to"]):
+                print(f"  Missing source: {op['from']}")
+                stats["missing"] += 1
+                continue
+            stats["already_done"] += 1
+        except OSError as e:
+            print(f"  Error renaming {op['from']}: {e}")
+            stats["errors"] += 1
+            continue
+
+        index.rename(old_entry, Path(op["to"]).stem)
+        op["done"] = True
+
+        if i % CHECKPOINT_EVERY == 0:
+            save_plan(plan_path, plan)
+            index.save()
+
+    index.save()
+
+    if not plan["manifest_done"]:
+        stats["manifest"] = file_manager.rename_manifest_entries(plan["manifest_renames"])
+        plan["manifest_done"] = True
+
+    save_plan(plan_path, plan)
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Migrate image files and manifest entries to prefixed slugs"
+    )
+    parser.add_argument("--dry-run", action="store_true",
+                        help="Compute and print the plan without renaming anything")
+    parser.add_argument("--config", default="config.yaml", help="Path to config file")
+    parser.add_argument("--workers", type=int, default=8,
+                        help="Concurrent API fetches (default: 8)")
+    parser.add_argument("--replan", action="store_true",
+                        help="Discard an interrupted migration's plan and start over")
+    parser.add_argument("--rebuild-index", action="store_true",
+                        help="Rescan the output tree instead of using the persisted index")
+    args = parser.parse_args()
+
+    config = load_config(args.config)
+    file_manager = FileManager(config["output"])
+    if args.rebuild_index:
+        file_manager.index.build()
+        file_manager.index.save()
+
+    plan_path = file_manager.base_path / PLAN_FILENAME
+
+    if plan_path.exists() and not args.replan:
+        with open(plan_path) as f:
+            plan = json.load(f)
+        print(f"Resuming migration planned at {plan['created_at']}")
+    else:
+        print(f"Fetching slugs for {len(ENTITY_TYPES)} entity types ({args.workers} workers)...")
+        api_config = dict(config["api"], pool_size=max(config["api"].get("pool_size", 10), args.workers))
+        with DndApiClient.from_config(api_config) as api_client:
+            try:
+                mappings = fetch_all_mappings(api_client, ENTITY_TYPES, args.workers)
+            except requests.RequestException as e:
+                print(f"Error fetching slugs from API: {e}")
+                return 1
+            api_client.log_cache_stats()
+
+        plan = build_plan(file_manager, mappings)
+
+    pending = [op for op in plan["renames"] if not op["done"]]
+
+    print(f"\n{'='*60}")
+    print(f"MIGRATION PLAN")
+    print(f"{'='*60}")
+    print(f"File renames pending: {len(pending)} of {len(plan['renames'])}")
+    print(f"Conflicts (target exists, skipped): {len(plan['conflicts'])}")
+    print(f"Manifest entity types to rewrite: {len(plan['manifest_renames'])}")
+
+    if args.dry_run:
+        for op in pending[:20]:
+            print(f"  Would rename: {op['from']} -> {Path(op['to']).name}")
+        if len(pending) > 20:
+            print(f"  ... and {len(pending) - 20} more")
+        for op in plan["conflicts"][:5]:
+            print(f"  Conflict: {op['to']} already exists")
+        print(f"\nRun without --dry-run to perform the migration")
+        return 0
+
+    save_plan(plan_path, plan)
+    stats = apply_plan(file_manager, plan, plan_path)
+
+    print(f"\n{'='*60}")
+    print(f"SUMMARY")
+    print(f"{'='*60}")
+    print(f"Renamed: {stats['renamed']}")
+    print(f"Already done: {stats['already_done']}")
+    print(f"Missing sources: {stats['missing']}")
+    print(f"Errors: {stats['errors']}")
+    print(f"Manifest entries rewritten: {stats['manifest']}")
+
+    if stats["errors"] == 0 and stats["missing"] == 0:
+        plan_path.unlink()
+    else:
+        print(f"\nPlan kept at {plan_path}; rerun to retry the remaining renames")
+
+    return 0 if stats["errors"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
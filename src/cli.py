@@ -4,17 +4,30 @@ CLI script for batch image generation
 """
 
 import argparse
+import json
 import logging
+import re
+import resource
 import sys
+import threading
 import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import Any, Dict, List, Optional
 from dotenv import load_dotenv
 
-from src.config import load_config, get_prompt_config
-from src.generator.api_client import DndApiClient
+from src.config import load_config, get_prompt_config, ENTITY_TYPES
+from src.generator.api_client import DndApiClient, ApiFetchError, IncompleteFetchError
 from src.generator.prompt_builder import PromptBuilder
-from src.generator.providers.factory import create_provider
+from src.generator.providers.factory import create_provider, output_provider_names
 from src.generator.file_manager import FileManager
+from src.generator.dedupe import NearDuplicateDetector
+from src.generator.planner import build_plan, load_plan, log_plan, plan_entity_type, save_plan
+from src.generator.metrics import StageTimings
+from src.generator.providers.base import ImageProvider
+from src.generator.snapshot import EntitySnapshot
+from src.generator.spool import ResultSpool
 
 # Configure logging
 logging.basicConfig(
@@ -24,164 +37,625 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-def main():
-    # Load environment variables
-    load_dotenv()
-
-    # Parse arguments
-    parser = argparse.ArgumentParser(description='Generate D&D entity images using DALL-E')
-    parser.add_argument('--entity-type', required=True,
-                       choices=['spells', 'items', 'classes', 'races', 'backgrounds',
-                               'monsters', 'feats', 'item_types', 'languages', 'sizes', 'spell_schools',
-                               'ability_scores', 'conditions', 'damage_types', 'item_properties',
-                               'proficiency_types', 'skills', 'sources', 'creature_types'],
-                       help='Type of entity to generate images for')
-    parser.add_argument('--limit', type=int, help='Limit number of entities to process')
-    parser.add_argument('--slug', help='Generate image for specific entity slug')
-    parser.add_argument('--dry-run', action='store_true',
-                       help='Preview what would be generated without calling DALL-E')
-    parser.add_argument('--force-regenerate', action='store_true',
-                       help='Regenerate images even if they already exist')
-    parser.add_argument('--config', default='config.yaml', help='Path to config file')
-
-    args = parser.parse_args()
-
-    # Load configuration
-    try:
-        config = load_config(args.config)
-    except Exception as e:
-        logger.error(f"Failed to load config: {e}")
-        sys.exit(1)
-
-    # Initialize components
-    api_client = DndApiClient(
-        base_url=config["api"]["base_url"],
-        timeout=config["api"]["timeout"]
-    )
-
-    prompt_config = get_prompt_config(config, args.entity_type)
-    # Use entity-specific template if available, otherwise use global template
-    template = prompt_config.get("template") or config.get("prompts", {}).get("template", "")
-    prompt_builder = PromptBuilder(prompt_config, args.entity_type, template)
-
-    file_manager = FileManager(config["output"])
-
-    if not args.dry_run:
-        # Get provider type and config
-        provider_type = config["image_generation"]["provider"]
-        provider_config = config["image_generation"][provider_type]
-
-        logger.info(f"Using image provider: {provider_type}")
-        image_provider = create_provider(provider_type, provider_config)
-
-    # Convert entity_type underscores to hyphens for API endpoint
-    api_entity_type = args.entity_type.replace('_', '-')
-
-    # Fetch entities
-    logger.info(f"Fetching {args.entity_type}...")
-
-    if args.slug:
-        # Fetch all and filter by slug (API doesn't support direct slug lookup)
-        entities = [e for e in api_client.fetch_entities(api_entity_type, limit=1000)
-                   if e.get('slug') == args.slug or e.get('code') == args.slug]
-        if not entities:
-            logger.error(f"Entity with slug '{args.slug}' not found")
-            sys.exit(1)
-    else:
-        entities = list(api_client.fetch_entities(api_entity_type, limit=args.limit))
-
-    logger.info(f"Found {len(entities)} entities")
-
-    # Process entities
-    success_count = 0
-    skip_count = 0
-    error_count = 0
-
-    batch_delay = config["generation"].get("batch_delay", 2)
-
-    for idx, entity in enumerate(entities, 1):
-        # Try slug first, then code, then name as fallback for slug-less entities
-        slug = entity.get('slug') or entity.get('code')
-
-        # If no slug or code, slugify the name
-        if not slug:
-            name_raw = entity.get('name', '')
-            if name_raw:
-                # Strict slugification: only a-z, 0-9, and hyphens allowed
-                import re
-                # Remove all non-alphanumeric characters except spaces and hyphens
-                slug = re.sub(r'[^a-zA-Z0-9\s-]', '', name_raw).strip().lower()
-                # Replace multiple spaces/hyphens with single hyphen
-                slug = re.sub(r'[-\s]+', '-', slug)
+def entity_slug(entity: Dict[str, Any]) -> Optional[str]:
+    """Identifier used for an entity's files and manifest entry"""
+    # Try slug first, then code, then name as fallback for slug-less entities
+    slug = entity.get('slug') or entity.get('code')
+
+    # If no slug or code, slugify the name
+    if not slug:
+        name_raw = entity.get('name', '')
+        if name_raw:
+            # Strict slugification: only a-z, 0-9, and hyphens allowed
+            # Remove all non-alphanumeric characters except spaces and hyphens
+            slug = re.sub(r'[^a-zA-Z0-9\s-]', '', name_raw).strip().lower()
+            # Replace multiple spaces/hyphens with single hyphen
+            slug = re.sub(r'[-\s]+', '-', slug)
+
+    return slug
+
+
+class GenerationRun:
+    """Per-entity pipeline (prompt, generate, save, manifest), safe to run from several workers"""
+
+    def __init__(
+        self,
+        args: argparse.Namespace,
+        entity_type: str,
+        prompt_builder: PromptBuilder,
+        file_manager: FileManager,
+        image_provider: Optional[ImageProvider],
+        timings: StageTimings,
+        batch_delay: float,
+        total: int,
+        aliases: Optional[Dict[str, str]] = None,
+        prompts: Optional[Dict[str, str]] = None,
+        spool: Optional[ResultSpool] = None,
+        output_providers: Optional[List[str]] = None
+    ):
+        self.args = args
+        self.entity_type = entity_type
+        self.prompt_builder = prompt_builder
+        self.file_manager = file_manager
+        self.image_provider = image_provider
+        self.timings = timings
+        self.batch_delay = batch_delay
+        self.total = total
+        # Near-duplicate slug -> slug of the entity whose image it shares
+        self.aliases = aliases or {}
+        # Slug -> prompt fixed by an executed plan (built on the fly otherwise)
+        self.prompts = prompts or {}
+        # Provider results are spooled before saving, so a failed save loses nothing
+        self.spool = spool
+        # Provider directories whose images count as generated (see configured_output_providers)
+        self.output_providers = output_providers or ([image_provider.get_provider_name()] if image_provider else [])
+
+        self.counts = Counter()
+        # Prompt hashes for images generated before hashes were stored
+        self.adopted_hashes: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def process(self, idx: int, entity: Dict[str, Any]):
+        """Run one entity through the pipeline, counting the outcome"""
+        args = self.args
+        file_manager = self.file_manager
+        image_provider = self.image_provider
+
+        slug = entity_slug(entity)
 
         # Validate identifier before processing
         if not slug or slug == "null":
-            logger.warning(f"[{idx}/{len(entities)}] Skipping entity with invalid identifier: {entity}")
-            error_count += 1
+            logger.warning(f"[{idx}/{self.total}] Skipping entity with invalid identifier: {entity}")
+            self._count("failed")
             file_manager.update_manifest(
-                args.entity_type,
+                self.entity_type,
                 str(entity.get('id', 'unknown')),
                 "",
                 False,
                 f"Invalid identifier: slug='{slug}', code='{entity.get('code')}', name='{entity.get('name')}'"
             )
-            continue
+            return
 
         name = entity.get('name', slug)
 
-        logger.info(f"[{idx}/{len(entities)}] Processing: {name} ({slug})")
-
-        # Skip if already generated
-        if not args.force_regenerate and file_manager.is_already_generated(args.entity_type, slug):
+        logger.info(f"[{idx}/{self.total}] Processing: {name} ({slug})")
+
+        # Provider attempts (retries and error classes) for the manifest
+        attempts = None
+        spooled = None
+
+        # Skip if already generated (with --changed-only: and the prompt hash still matches)
+        prompt = self.prompts.get(slug)
+        if args.changed_only and file_manager.is_already_generated(self.entity_type, slug, self.output_providers):
+            prompt = self.prompt_builder.build(entity)
+            # Compare with the hash of the provider that produced the image (a router member)
+            producer_name = file_manager.get_provider(self.entity_type, slug)
+            prompt_hash = image_provider.prompt_hash_for(producer_name, prompt)
+            stored_hash = file_manager.get_prompt_hash(self.entity_type, slug)
+            if stored_hash is None:
+                # Generated before hashes were stored: take the current prompt as its baseline
+                logger.info(f"  Skipping (already generated, recording prompt hash)")
+                with self._lock:
+                    self.adopted_hashes[slug] = prompt_hash
+                self._count("skipped")
+                return
+            if stored_hash == prompt_hash:
+                logger.info(f"  Skipping (prompt unchanged)")
+                self._count("skipped")
+                return
+            logger.info(f"  Prompt or provider parameters changed, regenerating")
+            self._count("changed")
+        elif not args.force_regenerate and file_manager.is_already_generated(self.entity_type, slug, self.output_providers):
             logger.info(f"  Skipping (already generated)")
-            skip_count += 1
-            continue
+            self._count("skipped")
+            return
 
         # Build prompt
         try:
-            prompt = prompt_builder.build(entity)
+            if prompt is None:
+                with self.timings.time("prompt"):
+                    prompt = self.prompt_builder.build(entity)
             logger.info(f"  Prompt: {prompt[:100]}...")
 
+            canonical_slug = self.aliases.get(slug)
+            if canonical_slug and args.dry_run:
+                logger.info(f"  [DRY RUN] Would share the image of near-duplicate {canonical_slug}")
+                self._count("aliased")
+                return
+            if canonical_slug:
+                with self.timings.time("manifest"):
+                    output_path = file_manager.alias_image(
+                        self.entity_type, slug, canonical_slug, prompt_hash=image_provider.prompt_hash(prompt)
+                    )
+                if output_path:
+                    logger.info(f"  ✓ Linked to near-duplicate {canonical_slug}: {output_path}")
+                    self._count("aliased")
+                    return
+                logger.info(f"  No image to share from {canonical_slug}, generating")
+
             if args.dry_run:
                 logger.info(f"  [DRY RUN] Would generate image")
-                success_count += 1
-                continue
+                self._count("generated")
+                return
 
             # Generate image
-            image_url = image_provider.generate(prompt)
-
-            # Save image with provider name in filename
-            provider_name = image_provider.get_provider_name()
-            output_path = file_manager.save_image(image_url, args.entity_type, slug, provider_name)
+            with self.timings.time("generate"):
+                try:
+                    image_url = image_provider.generate(prompt)
+                finally:
+                    attempts = image_provider.last_attempts()
+
+            # Save image under the name of the provider that produced it (a router picks one per image)
+            producer = image_provider.last_provider()
+            provider_name = producer.get_provider_name()
+            prompt_hash = producer.prompt_hash(prompt)
+            if self.spool:
+                spooled = self._spool(slug, provider_name, image_url, prompt_hash)
+            if spooled:
+                output_path = file_manager.save_image(
+                    image_url, self.entity_type, slug, provider_name, image_data=self.spool.read(spooled)
+                )
+            else:
+                output_path = file_manager.save_image(image_url, self.entity_type, slug, provider_name)
 
             # Update manifest
-            file_manager.update_manifest(args.entity_type, slug, output_path, True)
+            with self.timings.time("manifest"):
+                file_manager.update_manifest(
+                    self.entity_type, slug, output_path, True,
+                    prompt_hash=prompt_hash, attempts=attempts, provider=provider_name
+                )
+            if spooled:
+                self.spool.remove(spooled)
 
             logger.info(f"  ✓ Generated: {output_path}")
-            success_count += 1
+            self._count("generated")
 
             # Rate limiting
-            if idx < len(entities):
-                time.sleep(batch_delay)
+            if idx < self.total:
+                time.sleep(self.batch_delay)
 
         except Exception as e:
             logger.error(f"  ✗ Failed: {e}")
-            file_manager.update_manifest(args.entity_type, slug, "", False, str(e))
-            error_count += 1
+            if spooled:
+                logger.info(f"  Provider result kept in the spool; the next run saves it without a provider call")
+            file_manager.update_manifest(self.entity_type, slug, "", False, str(e), attempts=attempts)
+            self._count("failed")
+
+    def _spool(self, slug: str, provider_name: str, image_url: str, prompt_hash: str):
+        """Spool a provider result; None if the spool cannot be written (the result is then saved directly)"""
+        try:
+            return self.spool.put(self.entity_type, slug, provider_name, image_url, prompt_hash)
+        except OSError as e:
+            logger.error(f"  Could not spool the provider result ({e}); saving it directly")
+            return None
+
+    def _count(self, outcome: str):
+        with self._lock:
+            self.counts[outcome] += 1
+
+
+def open_entity_source(args: argparse.Namespace, config: Dict[str, Any]):
+    """Snapshot (--from-snapshot) or API client entities are read from"""
+    if not args.from_snapshot:
+        return DndApiClient.from_config(config["api"])
+
+    try:
+        snapshot = EntitySnapshot(args.from_snapshot)
+    except (OSError, ValueError) as e:
+        logger.error(f"Failed to open snapshot: {e}")
+        sys.exit(1)
+    logger.info(
+        f"Using snapshot {args.from_snapshot} of {snapshot.base_url} "
+        f"(fetched {snapshot.fetched_at})"
+    )
+    return snapshot
+
+
+def create_prompt_builder(config: Dict[str, Any], entity_type: str) -> PromptBuilder:
+    prompt_config = get_prompt_config(config, entity_type)
+    # Use entity-specific template if available, otherwise use global template
+    template = prompt_config.get("template") or config.get("prompts", {}).get("template", "")
+    return PromptBuilder(prompt_config, entity_type, template)
+
+
+def fetch_entities(
+    args: argparse.Namespace,
+    api_client,
+    entity_type: str,
+    prompt_builder: PromptBuilder
+) -> List[Dict[str, Any]]:
+    """Fetch one entity type (or --slug), exiting on errors the run cannot continue from"""
+    if args.from_snapshot and not api_client.has_type(entity_type):
+        logger.error(f"Snapshot has no {entity_type}")
+        sys.exit(1)
+
+    # Convert entity_type underscores to hyphens for API endpoint
+    api_entity_type = entity_type.replace('_', '-')
+
+    # Fetch entities
+    logger.info(f"Fetching {entity_type}...")
+
+    try:
+        if args.slug:
+            entity = api_client.get_entity(api_entity_type, args.slug)
+            if entity is None:
+                logger.error(f"Entity with slug '{args.slug}' not found")
+                sys.exit(1)
+            entities = [entity]
+        else:
+            entities = []
+            try:
+                for entity in api_client.fetch_entities(
+                    api_entity_type, limit=args.limit, fields=prompt_builder.required_fields()
+                ):
+                    entities.append(entity)
+            except IncompleteFetchError as e:
+                if not args.allow_partial:
+                    logger.error(f"{e} (use --allow-partial to continue with what was fetched)")
+                    sys.exit(1)
+                logger.warning(f"{e}; continuing with a partial list (--allow-partial)")
+    except ApiFetchError as e:
+        logger.error(f"Failed to fetch {entity_type}: {e}")
+        sys.exit(1)
+
+    logger.info(f"Found {len(entities)} entities")
+    return entities
+
+
+def find_aliases(
+    args: argparse.Namespace,
+    config: Dict[str, Any],
+    entity_type: str,
+    entities: List[Dict[str, Any]],
+    prompt_builder: PromptBuilder
+) -> Dict[str, str]:
+    """Near-duplicate slug -> canonical slug, if dedupe applies to this run"""
+    dedupe_config = config["generation"].get("dedupe", {})
+    if not (args.dedupe or entity_type in dedupe_config.get("entity_types", [])) or args.slug:
+        return {}
+
+    texts = {}
+    for entity in entities:
+        slug = entity_slug(entity)
+        if slug and slug != "null":
+            # Only the entity-specific text: the template is shared by every prompt
+            texts[slug] = " ".join(prompt_builder.placeholder_values(entity))
+    aliases = NearDuplicateDetector(dedupe_config).aliases(texts)
+    logger.info(
+        f"Near-duplicates: {len(aliases)} {entity_type} can share the images of "
+        f"{len(set(aliases.values()))} others"
+    )
+    return aliases
+
+
+def configured_output_providers(config: Dict[str, Any]) -> List[str]:
+    """Provider directories of the configured provider, shared by runs and --plan so both see the same work"""
+    image_generation = config["image_generation"]
+    return output_provider_names(image_generation["provider"], image_generation)
+
+
+def write_plan(args: argparse.Namespace, config: Dict[str, Any], api_client):
+    """--plan: report and save what a run would do, without creating a provider"""
+    provider_type = config["image_generation"]["provider"]
+    file_manager = FileManager(config["output"])
+
+    if args.entity_type == 'all':
+        entity_types = [t for t in ENTITY_TYPES if not args.from_snapshot or api_client.has_type(t)]
+    else:
+        entity_types = [args.entity_type]
+
+    sections = []
+    for entity_type in entity_types:
+        prompt_builder = create_prompt_builder(config, entity_type)
+        entities = fetch_entities(args, api_client, entity_type, prompt_builder)
+        aliases = find_aliases(args, config, entity_type, entities, prompt_builder)
+
+        pairs = []
+        for entity in entities:
+            slug = entity_slug(entity)
+            pairs.append((slug if slug and slug != "null" else None, entity))
+
+        sections.append(plan_entity_type(
+            entity_type,
+            pairs,
+            prompt_builder,
+            file_manager,
+            configured_output_providers(config),
+            force_regenerate=args.force_regenerate,
+            aliases=aliases
+        ))
+
+    plan = build_plan(
+        sections,
+        source=args.from_snapshot or config["api"]["base_url"],
+        provider=provider_type,
+        options={"force_regenerate": args.force_regenerate, "dedupe": args.dedupe, "limit": args.limit},
+        estimates=config["generation"].get("estimates"),
+        workers=max(1, args.workers or config["generation"].get("workers", 1)),
+        batch_delay=config["generation"].get("batch_delay", 2)
+    )
+    save_plan(args.plan, plan)
+
+    log_plan(plan)
+    logger.info(f"Plan written to {args.plan} (run it with --execute-plan {args.plan})")
+
+
+def complete_spooled(spool: ResultSpool, file_manager: FileManager) -> int:
+    """
+    Save and record spooled provider results left by an earlier run
+
+    Entries that still cannot be saved stay in the spool for the next run.
+
+    Returns:
+        Number of results completed
+    """
+    entries = spool.pending()
+    if not entries:
+        return 0
+
+    logger.info(f"Completing {len(entries)} spooled provider result(s) from an earlier run")
+    completed = 0
+    for entry in entries:
+        try:
+            output_path = file_manager.save_image(
+                "", entry.entity_type, entry.slug, entry.provider, image_data=spool.read(entry)
+            )
+            file_manager.update_manifest(
+                entry.entity_type, entry.slug, output_path, True,
+                prompt_hash=entry.prompt_hash, provider=entry.provider
+            )
+        except Exception as e:
+            logger.error(f"  ✗ Spooled {entry.entity_type}/{entry.slug} still cannot be saved: {e}")
+            continue
+        spool.remove(entry)
+        completed += 1
+        logger.info(f"  ✓ Saved spooled {entry.entity_type}/{entry.slug}: {output_path}")
+
+    file_manager.flush_index()
+    return completed
+
+
+def generate(
+    args: argparse.Namespace,
+    config: Dict[str, Any],
+    entity_type: str,
+    entities: List[Dict[str, Any]],
+    prompt_builder: PromptBuilder,
+    aliases: Dict[str, str],
+    prompts: Optional[Dict[str, str]] = None
+) -> Dict[str, Any]:
+    """Process one entity type's entities; returns the run report"""
+    timings = StageTimings()
+    file_manager = FileManager(config["output"], timings=timings)
+
+    # Save results a previous run paid for but could not save, before any new provider calls
+    spool = None
+    if not args.dry_run:
+        try:
+            spool = ResultSpool.from_config(config["output"], timings)
+        except OSError as e:
+            logger.error(f"Result spool unavailable ({e}); saving provider results directly")
+        if spool:
+            complete_spooled(spool, file_manager)
+
+    # --changed-only needs the provider's parameters even for a dry run; no
+    # provider calls are made until an image is actually generated
+    workers = max(1, args.workers or config["generation"].get("workers", 1))
+    image_provider = None
+    if not args.dry_run or args.changed_only:
+        # Get provider type and config
+        provider_type = config["image_generation"]["provider"]
+        # One pooled connection per worker unless the provider block sets pool_size
+        provider_config = dict({"pool_size": workers}, **config["image_generation"][provider_type])
+
+        logger.info(f"Using image provider: {provider_type}")
+        image_provider = create_provider(provider_type, provider_config, config["image_generation"])
+        if not args.dry_run:
+            image_provider.warm_up()
+
+    # Process entities (canonical ones first, so their images exist when aliases are linked)
+    run = GenerationRun(
+        args,
+        entity_type,
+        prompt_builder,
+        file_manager,
+        image_provider,
+        timings,
+        config["generation"].get("batch_delay", 2),
+        len(entities),
+        aliases,
+        prompts,
+        spool,
+        configured_output_providers(config)
+    )
+    primary = [e for e in entities if entity_slug(e) not in aliases]
+    phases = [(1, primary), (len(primary) + 1, [e for e in entities if entity_slug(e) in aliases])]
+
+    started = time.perf_counter()
+    try:
+        if workers == 1:
+            for start, batch in phases:
+                for idx, entity in enumerate(batch, start):
+                    run.process(idx, entity)
+        else:
+            logger.info(f"Processing with {workers} workers")
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                for start, batch in phases:
+                    list(executor.map(run.process, range(start, start + len(batch)), batch))
+    finally:
+        # Once per batch, and also when interrupted
+        file_manager.flush_index()
+    wall_seconds = time.perf_counter() - started
+    provider_stats = {}
+    if image_provider:
+        provider_stats = image_provider.stats()
+        image_provider.close()
+
+    if run.adopted_hashes and not args.dry_run:
+        file_manager.set_prompt_hashes(entity_type, run.adopted_hashes)
 
     # Summary
+    counts = run.counts
+    images_per_minute = counts["generated"] / wall_seconds * 60 if wall_seconds else 0.0
     logger.info("\n" + "="*50)
-    logger.info("GENERATION SUMMARY")
+    logger.info(f"GENERATION SUMMARY ({entity_type})")
     logger.info("="*50)
     logger.info(f"Total entities: {len(entities)}")
-    logger.info(f"Successfully generated: {success_count}")
-    logger.info(f"Skipped (already exist): {skip_count}")
-    logger.info(f"Failed: {error_count}")
+    logger.info(f"Successfully generated: {counts['generated']}")
+    logger.info(f"Skipped (already exist): {counts['skipped']}")
+    if args.changed_only:
+        logger.info(f"Changed (regenerated): {counts['changed']}")
+        logger.info(f"Prompt hashes recorded for existing images: {len(run.adopted_hashes)}")
+    if aliases:
+        logger.info(f"Linked to near-duplicates: {counts['aliased']} (provider calls avoided)")
+    logger.info(f"Failed: {counts['failed']}")
+    logger.info(f"Throughput: {images_per_minute:.1f} images/min over {wall_seconds:.1f}s ({workers} workers)")
+    timings.log_summary()
+    hedging = provider_stats.get("hedging")
+    if hedging:
+        logger.info(
+            f"Hedging: {hedging['hedged']}/{hedging['requests']} requests hedged ({hedging['hedge_rate']:.1%}), "
+            f"{hedging['hedge_wins']} won by the hedge, {hedging['saved_seconds']:.1f}s saved"
+        )
 
     if not args.dry_run:
-        estimated_cost = success_count * 0.04
+        estimated_cost = (counts["generated"] + provider_stats.get("extra_requests", 0)) * 0.04
         logger.info(f"Estimated cost: ${estimated_cost:.2f}")
 
+    return {
+        "workers": workers,
+        "entities": len(entities),
+        "generated": counts["generated"],
+        "skipped": counts["skipped"],
+        "failed": counts["failed"],
+        "aliased": counts["aliased"],
+        "wall_seconds": wall_seconds,
+        "images_per_minute": images_per_minute,
+        "stages": timings.summary(),
+        "provider": provider_stats,
+    }
+
+
+def execute_plan(args: argparse.Namespace, config: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """--execute-plan: process exactly the planned entities, with the planned prompts and aliases"""
+    try:
+        plan = load_plan(args.execute_plan)
+    except (OSError, ValueError) as e:
+        logger.error(f"Failed to load plan: {e}")
+        sys.exit(1)
+
+    provider_type = config["image_generation"]["provider"]
+    if plan["provider"] != provider_type:
+        logger.error(f"Plan was made for provider {plan['provider']}, but the config uses {provider_type}")
+        sys.exit(1)
+
+    logger.info(f"Executing plan {args.execute_plan} (created {plan['created_at']} from {plan['source']})")
+    args.force_regenerate = plan["options"].get("force_regenerate", False)
+
+    reports = {}
+    for section in plan["entity_types"]:
+        items = section["items"]
+        if not items:
+            continue
+        entity_type = section["entity_type"]
+        reports[entity_type] = generate(
+            args,
+            config,
+            entity_type,
+            [item["entity"] for item in items],
+            create_prompt_builder(config, entity_type),
+            {item["slug"]: item["alias_of"] for item in items if item.get("alias_of")},
+            {item["slug"]: item["prompt"] for item in items}
+        )
+    return reports
+
+
+def main(argv: Optional[List[str]] = None):
+    # Load environment variables
+    load_dotenv()
+
+    # Parse arguments
+    parser = argparse.ArgumentParser(description='Generate D&D entity images using DALL-E')
+    parser.add_argument('--entity-type',
+                       choices=ENTITY_TYPES + ['all'],
+                       help='Type of entity to generate images for ("all" only with --plan)')
+    parser.add_argument('--limit', type=int, help='Limit number of entities to process')
+    parser.add_argument('--slug', help='Generate image for specific entity slug')
+    parser.add_argument('--dry-run', action='store_true',
+                       help='Preview what would be generated without calling DALL-E')
+    parser.add_argument('--plan', metavar='PATH',
+                       help='Write a JSON work plan (pending/done/failed, prompt lengths, projected calls) '
+                            'without provider access')
+    parser.add_argument('--execute-plan', metavar='PATH',
+                       help='Process exactly the entities and prompts of a plan written by --plan')
+    parser.add_argument('--force-regenerate', action='store_true',
+                       help='Regenerate images even if they already exist')
+    parser.add_argument('--changed-only', action='store_true',
+                       help='Regenerate existing images only where the prompt or provider parameters changed')
+    parser.add_argument('--config', default='config.yaml', help='Path to config file')
+    parser.add_argument('--allow-partial', action='store_true',
+                       help='Continue with the entities fetched so far if the API fails mid-fetch')
+    parser.add_argument('--from-snapshot', metavar='PATH',
+                       help='Read entities from a snapshot (scripts/export_snapshot.py) instead of the API')
+
+    parser.add_argument('--dedupe', action='store_true',
+                       help='Share one image across near-duplicate entities (see generation.dedupe)')
+    parser.add_argument('--workers', type=int,
+                       help='Entities processed in parallel (default: generation.workers or 1)')
+    parser.add_argument('--timings-json', metavar='PATH',
+                       help='Write throughput, per-stage p50/p95, CPU and peak RSS to a JSON file')
+
+    args = parser.parse_args(argv)
+    if args.changed_only and args.force_regenerate:
+        parser.error("--changed-only and --force-regenerate are mutually exclusive")
+    if args.plan and args.execute_plan:
+        parser.error("--plan and --execute-plan are mutually exclusive")
+    if args.execute_plan:
+        if args.entity_type or args.slug or args.changed_only:
+            parser.error("--execute-plan takes entity types and options from the plan")
+    elif not args.entity_type:
+        parser.error("--entity-type is required")
+    if args.entity_type == 'all' and not args.plan:
+        parser.error("--entity-type all is only supported with --plan")
+    if args.plan and args.changed_only:
+        parser.error("--plan cannot be combined with --changed-only (prompt hashes need the provider)")
+
+    # Load configuration
+    try:
+        config = load_config(args.config)
+    except Exception as e:
+        logger.error(f"Failed to load config: {e}")
+        sys.exit(1)
+
+    if args.execute_plan:
+        reports = execute_plan(args, config)
+    else:
+        # Initialize components
+        api_client = open_entity_source(args, config)
+        if args.plan:
+            write_plan(args, config, api_client)
+            return
+
+        prompt_builder = create_prompt_builder(config, args.entity_type)
+        entities = fetch_entities(args, api_client, args.entity_type, prompt_builder)
+        aliases = find_aliases(args, config, args.entity_type, entities, prompt_builder)
+        reports = {args.entity_type: generate(args, config, args.entity_type, entities, prompt_builder, aliases)}
+
+        if not args.from_snapshot:
+            api_client.log_cache_stats()
+
+    if args.timings_json:
+        usage = resource.getrusage(resource.RUSAGE_SELF)
+        # ru_maxrss is KiB on Linux, bytes on macOS
+        max_rss_mb = usage.ru_maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+        process_usage = {"cpu_seconds": usage.ru_utime + usage.ru_stime, "max_rss_mb": max_rss_mb}
+        if len(reports) == 1:
+            report = dict(next(iter(reports.values())), **process_usage)
+        else:
+            report = dict(process_usage, entity_types=reports)
+        with open(args.timings_json, 'w') as f:
+            json.dump(report, f, indent=2)
+
 
 if __name__ == '__main__':
     main()
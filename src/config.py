@@ -2,6 +2,14 @@ import os
 import yaml
 from typing import Dict, Any
 
+# Every entity type we generate images for (CLI form; the API uses hyphens)
+ENTITY_TYPES = [
+    'spells', 'items', 'classes', 'races', 'backgrounds', 'monsters', 'feats',
+    'item_types', 'languages', 'sizes', 'spell_schools', 'ability_scores',
+    'conditions', 'damage_types', 'item_properties', 'proficiency_types', 'skills', 'sources',
+    'creature_types'
+]
+
 
 def load_config(config_path: str = "config.yaml") -> Dict[str, Any]:
     """Load configuration from YAML file with environment variable substitution"""
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Local HTTP service that renders image conversions on demand
+
+Serves GET /{size}/{entity_type}/{slug}.webp. On a cache miss the conversion is
+rendered from the original with FileManager's conversion code and kept in a
+disk LRU cache bounded by output.conversions.server.max_bytes.
+"""
+
+import sys
+from pathlib import Path
+
+# Add project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import argparse
+import logging
+import re
+import threading
+import time
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional, Tuple
+from PIL import Image
+
+from src.config import load_config
+from src.generator.conversion_cache import ConversionCache
+from src.generator.file_manager import FileManager
+from src.generator.output_index import OutputIndex
+
+logger = logging.getLogger(__name__)
+
+PATH_PATTERN = re.compile(r'^/(\d+)/([a-z_]+)/([A-Za-z0-9_.:-]+)\.webp$')
+
+# Minimum seconds between reloads of the persisted output index on unknown slugs
+INDEX_RELOAD_INTERVAL = 30
+
+
+class ConversionService:
+    """Resolves conversion requests against the output index and the cache"""
+
+    def __init__(self, file_manager: FileManager, server_config: Dict[str, Any]):
+        self.file_manager = file_manager
+        self.sizes = set(server_config.get("sizes") or file_manager.conversion_sizes)
+        self.cache_control = server_config.get("cache_control", "public, max-age=604800")
+        self.provider_preference = server_config.get("providers", [])
+        self.cache = ConversionCache(
+            server_config.get("cache_path", file_manager.base_path / ".conversion_cache"),
+            server_config.get("max_bytes", 512 * 1024 * 1024)
+        )
+        self._index_lock = threading.Lock()
+        self._index_loaded_at = time.monotonic()
+
+    def resolve(self, request_path: str) -> Tuple[HTTPStatus, Optional[Path]]:
+        """
+        Map a request path to a cached conversion file, rendering it if needed
+
+        Returns:
+            Tuple of (status, path to serve or None)
+        """
+        match = PATH_PATTERN.match(request_path.split('?', 1)[0])
+        if not match:
+            return HTTPStatus.NOT_FOUND, None
+
+        size, entity_type, slug = int(match.group(1)), match.group(2), match.group(3)
+        slug = slug.replace(':', '--')
+        if size not in self.sizes or slug.startswith('.'):
+            return HTTPStatus.NOT_FOUND, None
+
+        original = self._find_original(entity_type, slug)
+        if original is None:
+            return HTTPStatus.NOT_FOUND, None
+
+        original_path = self.file_manager.index.path_for(original)
+
+        def render() -> bytes:
+            with Image.open(original_path) as img:
+                data, info = self.file_manager.render_conversion(img, size)
+            logger.info(f"Rendered {size}px {entity_type}/{slug} (quality={info['quality']}, {len(data)} bytes)")
+            return data
+
+        key = (size, entity_type, slug)
+        path = self.cache.get_or_render(key, render, min_mtime=original.mtime)
+        return HTTPStatus.OK, path
+
+    def _find_original(self, entity_type: str, slug: str):
+        index = self.file_manager.index
+        providers = index.providers(entity_type, slug)
+        if not providers:
+            # Pick up images generated since the index was loaded
+            index = self._reload_index()
+            providers = index.providers(entity_type, slug)
+        if not providers:
+            return None
+        for provider in self.provider_preference:
+            if provider in providers:
+                return index.get(entity_type, provider, slug)
+        return index.get(entity_type, sorted(providers)[0], slug)
+
+    def _reload_index(self) -> OutputIndex:
+        with self._index_lock:
+            if time.monotonic() - self._index_loaded_at >= INDEX_RELOAD_INTERVAL:
+                self.file_manager.reload_index()
+                self._index_loaded_at = time.monotonic()
+            return self.file_manager.index
+
+
+class ConversionRequestHandler(BaseHTTPRequestHandler):
+    """Serves cached conversions with ETag / Cache-Control"""
+
+    server_version = "DndConversionServer/1.0"
+
+    def do_GET(self):
+        self._serve(send_body=True)
+
+    def do_HEAD(self):
+        self._serve(send_body=False)
+
+    def _serve(self, send_body: bool):
+        service: ConversionService = self.server.service
+
+        try:
+            status, path = service.resolve(self.path)
+            if path is None:
+                self.send_error(status)
+                return
+            try:
+                stat = path.stat()
+                data = path.read_bytes() if send_body else b""
+            except FileNotFoundError:
+                # Evicted between lookup and read; render again
+                status, path = service.resolve(self.path)
+                stat = path.stat()
+                data = path.read_bytes() if send_body else b""
+        except Exception as e:
+            logger.error(f"Failed to serve {self.path}: {e}")
+            self.send_error(HTTPStatus.INTERNAL_SERVER_ERROR)
+            return
+
+        etag = f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", service.cache_control)
+            self.end_headers()
+            return
+
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", "image/webp")
+        self.send_header("Content-Length", str(stat.st_size))
+        self.send_header("ETag", etag)
+        self.send_header("Cache-Control", service.cache_control)
+        self.end_headers()
+        if send_body:
+            self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+
+def create_server(config: Dict[str, Any], host: Optional[str] = None, port: Optional[int] = None) -> ThreadingHTTPServer:
+    """Build a conversion server from the full application config"""
+    server_config = config["output"].get("conversions", {}).get("server", {})
+    service = ConversionService(FileManager(config["output"]), server_config)
+
+    server = ThreadingHTTPServer(
+        (host or server_config.get("host", "127.0.0.1"), port if port is not None else server_config.get("port", 8081)),
+        ConversionRequestHandler
+    )
+    server.service = service
+    return server
+
+
+def main():
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
+    parser = argparse.ArgumentParser(description='Serve image conversions on demand')
+    parser.add_argument('--config', default='config.yaml', help='Path to config file')
+    parser.add_argument('--host', help='Bind address (default from config)')
+    parser.add_argument('--port', type=int, help='Port (default from config)')
+    args = parser.parse_args()
+
+    config = load_config(args.config)
+    server = create_server(config, args.host, args.port)
+
+    host, port = server.server_address[:2]
+    logger.info(f"Serving conversions on http://{host}:{port}/{{size}}/{{entity_type}}/{{slug}}.webp")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stats = server.service.cache.stats()
+        logger.info(f"Cache: {stats['hits']} hits, {stats['misses']} misses, {stats['evictions']} evictions")
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+"""On-disk cache of compendium API page responses"""
+import hashlib
+import json
+import os
+import time
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, Any, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+
+class ApiCache:
+    """
+    Stores API page responses on disk with a TTL
+
+    Each entry keeps the response body plus its ETag / Last-Modified so stale
+    entries can be revalidated with a conditional request, and served as-is
+    when the API is unreachable.
+    """
+
+    def __init__(self, path: Union[str, Path], ttl: float = 86400):
+        self.path = Path(path)
+        self.ttl = ttl
+        self.path.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self.counters = {"hits": 0, "revalidated": 0, "misses": 0, "stale": 0}
+
+    @staticmethod
+    def key(url: str, params: Optional[Dict[str, Any]] = None) -> str:
+        """Stable cache key for a URL and its query parameters"""
+        query = "&".join(f"{k}={v}" for k, v in sorted((params or {}).items()))
+        return hashlib.sha1(f"{url}?{query}".encode()).hexdigest()
+
+    def get(self, url: str, params: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        """Load an entry ({body, etag, last_modified, fetched_at}) or None"""
+        entry_path = self._entry_path(url, params)
+        try:
+            with open(entry_path) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable cache entry {entry_path}: {e}")
+            return None
+
+    def put(
+        self,
+        url: str,
+        params: Optional[Dict[str, Any]],
+        body: Any,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None
+    ):
+        """Store a fresh response"""
+        self._write(url, params, {
+            "url": url,
+            "params": params or {},
+            "fetched_at": time.time(),
+            "etag": etag,
+            "last_modified": last_modified,
+            "body": body,
+        })
+
+    def touch(self, url: str, params: Optional[Dict[str, Any]], entry: Dict[str, Any]):
+        """Mark an entry fresh again after a 304 Not Modified"""
+        entry["fetched_at"] = time.time()
+        self._write(url, params, entry)
+
+    def is_fresh(self, entry: Dict[str, Any]) -> bool:
+        """Whether an entry is within its TTL"""
+        return time.time() - entry.get("fetched_at", 0) < self.ttl
+
+    @staticmethod
+    def conditional_headers(entry: Optional[Dict[str, Any]]) -> Dict[str, str]:
+        """If-None-Match / If-Modified-Since headers for revalidating an entry"""
+        headers = {}
+        if entry:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def record(self, outcome: str):
+        """Count a lookup outcome: hits, revalidated, misses or stale"""
+        with self._lock:
+            self.counters[outcome] += 1
+
+    def log_stats(self):
+        """Log hit/miss counts for this run"""
+        c = self.counters
+        total = sum(c.values())
+        if not total:
+            return
+        logger.info(
+            f"API cache: {c['hits']} hits, {c['revalidated']} revalidated (304), "
+            f"{c['misses']} misses, {c['stale']} served stale"
+        )
+
+    def _entry_path(self, url: str, params: Optional[Dict[str, Any]]) -> Path:
+        return self.path / f"{self.key(url, params)}.json"
+
+    def _write(self, url: str, params: Optional[Dict[str, Any]], entry: Dict[str, Any]):
+        entry_path = self._entry_path(url, params)
+        tmp_path = entry_path.with_suffix(f".{threading.get_ident()}.tmp")
+        with open(tmp_path, 'w') as f:
+            json.dump(entry, f, separators=(',', ':'))
+        os.replace(tmp_path, entry_path)
@@ -1,7 +1,18 @@
+import random
+import time
 import requests
-from typing import Dict, Any, Iterator, Optional
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from typing import Dict, Any, Iterator, Optional, Sequence
+from urllib.parse import quote
 import logging
 
+from .api_cache import ApiCache
+from .circuit_breaker import CircuitBreaker, get_breaker
+from .projection import normalize_fields, parse_page, project_entity, top_level_fields
+from .slug_index import SlugIndex
+
 logger = logging.getLogger(__name__)
 
 # Entity types that live under /lookups/ prefix in the API
@@ -20,68 +31,465 @@ LOOKUP_ENTITY_TYPES = {
     'creature-types',
 }
 
+# Entity types with a per-slug endpoint: GET /{entity_type}/{slug}
+SLUG_ENDPOINT_ENTITY_TYPES = {
+    'spells',
+    'items',
+    'classes',
+    'races',
+    'backgrounds',
+    'monsters',
+    'feats',
+}
+
+# Responses worth retrying; any other 4xx is treated as permanent
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+# _fetch_by_slug result for a definite 404 (None means the lookup itself failed)
+_NOT_FOUND = object()
+
+
+class ApiFetchError(requests.RequestException):
+    """A page could not be fetched after retries"""
+
+
+class ApiUnavailableError(ApiFetchError):
+    """The circuit breaker is open; the request was not attempted"""
+
+
+class IncompleteFetchError(ApiFetchError):
+    """A paginated fetch stopped before the last page"""
+
+    def __init__(self, entity_type: str, page: int, fetched: int, cause: Exception):
+        super().__init__(
+            f"Fetch of {entity_type} stopped at page {page} after {fetched} entities: {cause}"
+        )
+        self.entity_type = entity_type
+        self.page = page
+        self.fetched = fetched
+        self.cause = cause
+
 
 class DndApiClient:
     """Client for fetching data from D&D Compendium API"""
 
-    def __init__(self, base_url: str, timeout: int = 30):
+    def __init__(
+        self,
+        base_url: str,
+        timeout: int = 30,
+        pool_size: int = 10,
+        max_retries: int = 3,
+        backoff_factor: float = 0.5,
+        max_backoff: float = 10.0,
+        max_concurrency: int = 4,
+        cache: Optional[ApiCache] = None,
+        slug_index: Optional[SlugIndex] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        fields_param: Optional[str] = None
+    ):
+        """
+        Args:
+            base_url: API base URL (e.g. http://localhost:8080/api/v1)
+            timeout: Request timeout in seconds
+            pool_size: Maximum keep-alive connections kept per host
+            max_retries: Retries per page for timeouts, connection errors, 429 and 5xx
+            backoff_factor: Base delay in seconds; doubles on every retry
+            max_backoff: Upper bound on a single retry delay in seconds
+            max_concurrency: Maximum pages fetched in parallel once the page count is known
+            cache: Optional on-disk page cache with conditional revalidation
+            slug_index: Slug -> page index used by get_entity (in-memory if omitted)
+            circuit_breaker: Breaker guarding the API (shared per base URL if omitted)
+            fields_param: Query parameter for sparse fieldsets (e.g. "fields"), if the
+                API supports one; otherwise projected pages are stream-parsed
+        """
         self.base_url = base_url.rstrip('/')
         self.timeout = timeout
+        self.max_retries = max(0, max_retries)
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.max_concurrency = max(1, max_concurrency)
+        self.cache = cache
+        self.slug_index = slug_index or SlugIndex()
+        self.breaker = circuit_breaker or get_breaker(self.base_url)
+        self.fields_param = fields_param
+        self.session = self._create_session(pool_size)
+
+    @classmethod
+    def from_config(cls, api_config: Dict[str, Any]) -> "DndApiClient":
+        """Create a client from the `api` config block"""
+        cache_config = api_config.get("cache", {})
+        cache = None
+        if cache_config.get("enabled", False):
+            cache = ApiCache(cache_config.get("path", "./.cache/api"), cache_config.get("ttl", 86400))
+        slug_index = SlugIndex(api_config.get("slug_index_path", "./.cache/slug_index.json"))
+
+        base_url = api_config["base_url"].rstrip('/')
+        breaker_config = api_config.get("circuit_breaker", {})
+        breaker = get_breaker(
+            base_url,
+            failure_threshold=breaker_config.get("failure_threshold", 5),
+            reset_timeout=breaker_config.get("reset_timeout", 30.0)
+        )
+
+        return cls(
+            base_url=base_url,
+            timeout=api_config.get("timeout", 30),
+            pool_size=api_config.get("pool_size", 10),
+            max_retries=api_config.get("max_retries", 3),
+            backoff_factor=api_config.get("backoff_factor", 0.5),
+            max_backoff=api_config.get("max_backoff", 10.0),
+            max_concurrency=api_config.get("max_concurrency", 4),
+            cache=cache,
+            slug_index=slug_index,
+            circuit_breaker=breaker,
+            fields_param=api_config.get("fields_param")
+        )
+
+    @staticmethod
+    def _create_session(pool_size: int) -> requests.Session:
+        """
+        Build a keep-alive session with a connection pool and compressed transfers
+
+        Retries are handled per page in _fetch_page so they can be jittered and
+        counted by the circuit breaker; the adapter itself never retries.
+        """
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+
+        session = requests.Session()
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        session.headers.update({
+            "Accept": "application/json",
+            "Accept-Encoding": "gzip, deflate",
+        })
+        return session
+
+    def close(self):
+        """Close pooled connections"""
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
 
     def fetch_entities(
         self,
         entity_type: str,
         limit: Optional[int] = None,
-        per_page: int = 100
+        per_page: int = 100,
+        fields: Optional[Sequence[str]] = None
     ) -> Iterator[Dict[str, Any]]:
         """
         Fetch entities from API with pagination support
 
+        After the first page, remaining pages are fetched concurrently (up to
+        max_concurrency at a time) but entities are still yielded in page order.
+
+        With fields, each entity is cut down to those dotted paths (plus id,
+        slug, code and name). The API is asked for only those fields when
+        fields_param is configured; otherwise pages are parsed incrementally
+        and unused subtrees are dropped without being built.
+
         Args:
             entity_type: Type of entity (spells, items, etc.)
             limit: Maximum number of entities to fetch (None = all)
             per_page: Number of entities per page
+            fields: Dotted paths to keep, e.g. ["description", "item_type.name"]
 
         Yields:
             Entity dictionaries
+
+        Raises:
+            ApiFetchError: If the first page cannot be fetched
+            IncompleteFetchError: If a later page cannot be fetched; entities
+                already yielded are everything before that page
         """
-        page = 1
+        url = self._entity_url(entity_type)
+        fields = normalize_fields(fields) if fields is not None else None
         fetched = 0
 
-        while True:
-            # Stop if we've reached the limit
+        # The first page tells us how many pages there are
+        data = self._fetch_page(url, entity_type, 1, per_page, fields)
+
+        first_entities = data.get("data", [])
+        self.slug_index.record_page(entity_type, 1, per_page, first_entities)
+        for entity in first_entities:
             if limit and fetched >= limit:
-                break
+                return
+            yield entity
+            fetched += 1
+
+        meta = data.get("meta", {})
+        last_page = meta.get("last_page", 1)
+        if meta.get("current_page", 1) >= last_page or (limit and fetched >= limit):
+            return
+
+        # Fetch the remaining pages concurrently, yielding them in page order.
+        # At most max_concurrency pages are in flight, and no more are scheduled
+        # than needed to reach the limit.
+        page_size = max(len(first_entities), 1)
+        next_page = 2
+        pending = deque()
+        executor = ThreadPoolExecutor(max_workers=self.max_concurrency)
+
+        def schedule():
+            nonlocal next_page
+            while next_page <= last_page and len(pending) < self.max_concurrency:
+                if limit and fetched + len(pending) * page_size >= limit:
+                    break
+                pending.append((
+                    next_page,
+                    executor.submit(self._fetch_page, url, entity_type, next_page, per_page, fields)
+                ))
+                next_page += 1
+
+        try:
+            schedule()
+            while pending:
+                page, future = pending.popleft()
+                try:
+                    data = future.result()
+                except ApiFetchError as e:
+                    raise IncompleteFetchError(entity_type, page, fetched, e) from e
+
+                self.slug_index.record_page(entity_type, page, per_page, data.get("data", []))
+                for entity in data.get("data", []):
+                    if limit and fetched >= limit:
+                        return
+                    yield entity
+                    fetched += 1
 
-            # Fetch page - use /lookups/ prefix for lookup entity types
-            if entity_type in LOOKUP_ENTITY_TYPES:
-                url = f"{self.base_url}/lookups/{entity_type}"
+                schedule()
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+            self.slug_index.save()
+
+    def get_entity(self, entity_type: str, slug: str, per_page: int = 100) -> Optional[Dict[str, Any]]:
+        """
+        Fetch a single entity by slug (or code)
+
+        Uses the per-slug endpoint where the API has one; its 404 is final.
+        Otherwise (or if that lookup fails) looks the slug up in the slug
+        index and fetches only that page; on an index miss the collection is
+        scanned page by page, recording every slug seen, until the entity is
+        found.
+
+        Args:
+            entity_type: Type of entity (spells, items, etc.)
+            slug: Entity slug or code
+            per_page: Page size used for collection pages
+
+        Returns:
+            Entity dictionary, or None if not found
+
+        Raises:
+            ApiFetchError: If a collection page needed for the lookup cannot be fetched
+        """
+        if entity_type in SLUG_ENDPOINT_ENTITY_TYPES:
+            entity = self._fetch_by_slug(entity_type, slug)
+            if entity is _NOT_FOUND:
+                return None
+            if entity is not None:
+                return entity
+
+        url = self._entity_url(entity_type)
+
+        page = self.slug_index.lookup(entity_type, slug, per_page)
+        if page is not None:
+            data = self._fetch_page(url, entity_type, page, per_page)
+            self.slug_index.record_page(entity_type, page, per_page, data.get("data", []))
+            entity = self._find_in_page(data, slug)
+            if entity is not None:
+                return entity
+            self.slug_index.forget(entity_type, slug)
+
+        # Index miss or stale entry: scan, refreshing the index as we go
+        page = 1
+        try:
+            while True:
+                data = self._fetch_page(url, entity_type, page, per_page)
+                self.slug_index.record_page(entity_type, page, per_page, data.get("data", []))
+
+                entity = self._find_in_page(data, slug)
+                if entity is not None:
+                    return entity
+
+                meta = data.get("meta", {})
+                if meta.get("current_page", page) >= meta.get("last_page", page):
+                    return None
+                page += 1
+        finally:
+            self.slug_index.save()
+
+    def _fetch_by_slug(self, entity_type: str, slug: str):
+        """GET /{entity_type}/{slug}; _NOT_FOUND on 404, None if the lookup failed"""
+        url = f"{self._entity_url(entity_type)}/{quote(slug, safe=':')}"
+
+        try:
+            response = self._get(url)
+            if response.status_code == 404:
+                return _NOT_FOUND
+            response.raise_for_status()
+            data = response.json()
+        except (requests.RequestException, ValueError) as e:
+            logger.warning(f"Direct lookup of {entity_type}/{slug} failed, falling back to slug index: {e}")
+            return None
+
+        entity = data.get("data", data) if isinstance(data, dict) else None
+        return entity if isinstance(entity, dict) else None
+
+    @staticmethod
+    def _find_in_page(data: Dict[str, Any], slug: str) -> Optional[Dict[str, Any]]:
+        for entity in data.get("data", []):
+            if entity.get("slug") == slug or entity.get("code") == slug:
+                return entity
+        return None
+
+    def _entity_url(self, entity_type: str) -> str:
+        """Collection URL - use /lookups/ prefix for lookup entity types"""
+        if entity_type in LOOKUP_ENTITY_TYPES:
+            return f"{self.base_url}/lookups/{entity_type}"
+        return f"{self.base_url}/{entity_type}"
+
+    def _fetch_page(
+        self,
+        url: str,
+        entity_type: str,
+        page: int,
+        per_page: int,
+        fields: Optional[Sequence[str]] = None
+    ) -> Dict[str, Any]:
+        """
+        Fetch one page, projected to fields if given
+
+        With a cache configured, fresh entries are served without a request,
+        stale entries are revalidated with If-None-Match / If-Modified-Since,
+        and a stale entry is served when the API cannot be reached. Projected
+        pages are cached separately from full ones.
+
+        Raises:
+            ApiFetchError: If the page cannot be fetched and nothing is cached
+        """
+        params = {"page": page, "per_page": per_page}
+        cache_params = params
+        stream = False
+        if fields is not None:
+            cache_params = dict(params, fields=",".join(fields))
+            if self.fields_param:
+                params = dict(params, **{self.fields_param: ",".join(top_level_fields(fields))})
             else:
-                url = f"{self.base_url}/{entity_type}"
-            params = {"page": page, "per_page": per_page}
+                stream = True
 
+        entry = self.cache.get(url, cache_params) if self.cache else None
+        if entry and self.cache.is_fresh(entry):
+            self.cache.record("hits")
+            return entry["body"]
+
+        try:
+            response = self._get(
+                url,
+                params=params,
+                headers=ApiCache.conditional_headers(entry),
+                stream=stream
+            )
             try:
-                response = requests.get(url, params=params, timeout=self.timeout)
+                if response.status_code == 304 and entry:
+                    self.cache.touch(url, cache_params, entry)
+                    self.cache.record("revalidated")
+                    return entry["body"]
+
                 response.raise_for_status()
-                data = response.json()
-            except requests.RequestException as e:
-                logger.error(f"Failed to fetch {entity_type} page {page}: {e}")
-                break
-
-            # Yield entities
-            entities = data.get("data", [])
-            for entity in entities:
-                if limit and fetched >= limit:
-                    break
-                yield entity
-                fetched += 1
+                if stream:
+                    data = parse_page(response.iter_content(chunk_size=64 * 1024), fields)
+                else:
+                    data = response.json()
+                    if fields is not None:
+                        data["data"] = [project_entity(e, fields) for e in data.get("data", [])]
+            finally:
+                response.close()
+        except (requests.RequestException, ValueError) as e:
+            if entry:
+                logger.warning(f"Serving cached {entity_type} page {page} after fetch failure: {e}")
+                self.cache.record("stale")
+                return entry["body"]
+            logger.error(f"Failed to fetch {entity_type} page {page}: {e}")
+            if isinstance(e, ApiFetchError):
+                raise
+            raise ApiFetchError(f"Failed to fetch {entity_type} page {page}: {e}") from e
+
+        if self.cache:
+            self.cache.put(
+                url,
+                cache_params,
+                data,
+                etag=response.headers.get("ETag"),
+                last_modified=response.headers.get("Last-Modified")
+            )
+            self.cache.record("misses")
+
+        return data
 
-            # Check if we've reached the last page
-            meta = data.get("meta", {})
-            current_page = meta.get("current_page", page)
-            last_page = meta.get("last_page", page)
+    def _get(self, url: str, **kwargs) -> requests.Response:
+        """
+        GET through the circuit breaker, retrying transient failures
+
+        Timeouts, connection errors, 429 and 5xx responses are retried up to
+        max_retries times with jittered exponential backoff (honouring
+        Retry-After). Other responses are returned as-is for the caller to
+        interpret.
+
+        Raises:
+            ApiUnavailableError: If the circuit is open
+            requests.RequestException: If the last attempt still failed
+        """
+        attempt = 0
+        while True:
+            if not self.breaker.allow():
+                raise ApiUnavailableError(f"Circuit open for {self.base_url}; not requesting {url}")
 
-            if current_page >= last_page:
-                break
+            retry_after = None
+            try:
+                response = self.session.get(url, timeout=self.timeout, **kwargs)
+            except (requests.Timeout, requests.ConnectionError) as e:
+                self.breaker.record_failure()
+                if attempt >= self.max_retries:
+                    raise
+                error = str(e)
+            except requests.RequestException:
+                # Not retried, but still an outcome: a half-open trial must always report one
+                self.breaker.record_failure()
+                raise
+            else:
+                if response.status_code not in RETRYABLE_STATUS_CODES:
+                    self.breaker.record_success()
+                    return response
+                self.breaker.record_failure()
+                if attempt >= self.max_retries:
+                    return response
+                error = f"HTTP {response.status_code}"
+                retry_after = response.headers.get("Retry-After")
+                response.close()
+
+            delay = self._backoff(attempt, retry_after)
+            attempt += 1
+            logger.warning(
+                f"GET {url} failed ({error}); retry {attempt}/{self.max_retries} in {delay:.1f}s"
+            )
+            time.sleep(delay)
+
+    def _backoff(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        """Delay before the next retry: Retry-After if given, else equal-jitter exponential"""
+        if retry_after:
+            try:
+                return min(self.max_backoff, max(0.0, float(retry_after)))
+            except ValueError:
+                pass
+        delay = min(self.max_backoff, self.backoff_factor * (2 ** attempt))
+        return random.uniform(delay / 2, delay)
 
-            page += 1
+    def log_cache_stats(self):
+        """Log cache hit/miss counts for this run (no-op without a cache)"""
+        if self.cache:
+            self.cache.log_stats()
@@ -0,0 +1,86 @@
+"""Circuit breaker shared by all callers of an upstream service"""
+import time
+import logging
+import threading
+from typing import Dict
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitBreaker:
+    """
+    Fails fast once an upstream is clearly down
+
+    closed:    requests flow; consecutive failures are counted
+    open:      after failure_threshold consecutive failures, requests are
+               rejected for reset_timeout seconds
+    half-open: after reset_timeout one trial request is let through; success
+               closes the circuit, failure opens it again. A trial that
+               reports no outcome within reset_timeout is replaced by a new
+               one, so a lost outcome cannot keep the circuit shut.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0, name: str = ""):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.name = name
+
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_at = 0.0
+        self._state = "closed"
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state
+
+    def allow(self) -> bool:
+        """Whether a request may be attempted now"""
+        with self._lock:
+            if self._state == "closed":
+                return True
+            now = time.monotonic()
+            if self._state == "open" and now - self._opened_at >= self.reset_timeout:
+                self._state = "half-open"
+                self._trial_at = now
+                return True
+            if self._state == "half-open" and now - self._trial_at >= self.reset_timeout:
+                logger.warning(f"Circuit {self.name} trial request reported no outcome; allowing another")
+                self._trial_at = now
+                return True
+            # Open, or half-open with the trial request still in flight
+            return False
+
+    def record_success(self):
+        with self._lock:
+            if self._state != "closed":
+                logger.info(f"Circuit {self.name} closed")
+            self._failures = 0
+            self._state = "closed"
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._state == "half-open" or (
+                self._state == "closed" and self._failures >= self.failure_threshold
+            ):
+                self._state = "open"
+                self._opened_at = time.monotonic()
+                logger.error(
+                    f"Circuit {self.name} open after {self._failures} consecutive failures; "
+                    f"failing fast for {self.reset_timeout:.0f}s"
+                )
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(name: str, failure_threshold: int = 5, reset_timeout: float = 30.0) -> CircuitBreaker:
+    """Process-wide breaker for a named upstream (e.g. an API base URL)"""
+    with _breakers_lock:
+        if name not in _breakers:
+            _breakers[name] = CircuitBreaker(failure_threshold, reset_timeout, name=name)
+        return _breakers[name]
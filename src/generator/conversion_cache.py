@@ -0,0 +1,165 @@
+"""Disk-backed LRU cache of on-demand image conversions"""
+import os
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Callable, Dict, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+# (size, entity_type, slug)
+CacheKey = Tuple[int, str, str]
+
+
+class ConversionCache:
+    """
+    LRU cache of rendered conversions stored under cache_path/{size}/{entity_type}/{slug}.webp
+
+    Total size on disk is kept under max_bytes by evicting the least recently
+    used files. Concurrent misses for the same key are coalesced so each
+    conversion is rendered once.
+    """
+
+    def __init__(self, cache_path: Union[str, Path], max_bytes: int):
+        self.cache_path = Path(cache_path)
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[CacheKey, int]" = OrderedDict()
+        self._inflight: Dict[CacheKey, Future] = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self.cache_path.mkdir(parents=True, exist_ok=True)
+        self._load_existing()
+
+    def path_for(self, key: CacheKey) -> Path:
+        """Filesystem path of a cached conversion"""
+        size, entity_type, slug = key
+        return self.cache_path / str(size) / entity_type / f"{slug}.webp"
+
+    def get_or_render(
+        self,
+        key: CacheKey,
+        render: Callable[[], bytes],
+        min_mtime: float = 0.0
+    ) -> Path:
+        """
+        Return the cached file for key, rendering it on a miss
+
+        Args:
+            key: (size, entity_type, slug)
+            render: Produces the conversion bytes; called at most once per miss
+                even when many threads request the same key
+            min_mtime: Cached files older than this (e.g. the original's mtime)
+                are treated as stale and re-rendered
+
+        Returns:
+            Path to the cached conversion
+        """
+        path = self.path_for(key)
+
+        with self._lock:
+            if key in self._entries and self._is_fresh(path, min_mtime):
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return path
+
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._inflight[key] = future
+                self.misses += 1
+
+        if not owner:
+            return future.result()
+
+        try:
+            data = render()
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(f".{threading.get_ident()}.tmp")
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+
+            with self._lock:
+                self.total_bytes -= self._entries.pop(key, 0)
+                self._entries[key] = len(data)
+                self.total_bytes += len(data)
+                self._evict(keep=key)
+
+            future.set_result(path)
+            return path
+
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def stats(self) -> Dict[str, int]:
+        """Cache counters"""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self.total_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+    @staticmethod
+    def _is_fresh(path: Path, min_mtime: float) -> bool:
+        if not min_mtime:
+            return True
+        try:
+            return path.stat().st_mtime >= min_mtime
+        except FileNotFoundError:
+            return False
+
+    def _evict(self, keep: CacheKey):
+        """Drop least recently used entries until under budget (caller holds the lock)"""
+        while self.total_bytes > self.max_bytes and len(self._entries) > 1:
+            key, size = next(iter(self._entries.items()))
+            if key == keep:
+                break
+            self._entries.popitem(last=False)
+            self.total_bytes -= size
+            self.evictions += 1
+            try:
+                self.path_for(key).unlink()
+            except FileNotFoundError:
+                pass
+            logger.debug(f"Evicted {key} from conversion cache")
+
+    def _load_existing(self):
+        """Adopt files left by a previous run, oldest access first"""
+        found = []
+        for size_entry in os.scandir(self.cache_path):
+            if not (size_entry.is_dir() and size_entry.name.isdigit()):
+                continue
+            for type_entry in os.scandir(size_entry.path):
+                if not type_entry.is_dir():
+                    continue
+                for file_entry in os.scandir(type_entry.path):
+                    if not (file_entry.is_file() and file_entry.name.endswith(".webp")):
+                        continue
+                    stat = file_entry.stat()
+                    key = (int(size_entry.name), type_entry.name, file_entry.name[:-len(".webp")])
+                    found.append((stat.st_atime, key, stat.st_size))
+
+        for _, key, size in sorted(found):
+            self._entries[key] = size
+            self.total_bytes += size
+
+        if found:
+            self._evict(keep=None)
+            logger.info(f"Conversion cache: {len(self._entries)} files, {self.total_bytes} bytes")
@@ -0,0 +1,156 @@
+"""Near-duplicate detection over prompt text (MinHash with LSH banding)"""
+import re
+import zlib
+import logging
+from typing import Dict, Any, List, Optional, Sequence
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Smallest prime above 2^32: hash values and permutation coefficients stay
+# below it, so a * h + b fits in uint64 without overflow
+_PRIME = np.uint64(4294967311)
+
+# Digits are dropped along with punctuation, so "+1"/"+2"/"+3" variants
+# of an entity normalize to the same text
+_NON_ALPHA_RE = re.compile(r"[^a-z]+")
+
+
+def normalize_text(text: str) -> str:
+    """Lowercase, drop digits and collapse punctuation/whitespace runs to single spaces"""
+    return _NON_ALPHA_RE.sub(" ", text.lower()).strip()
+
+
+def shingles(text: str, size: int) -> List[str]:
+    """Character shingles of normalized text (the whole text if shorter than size)"""
+    text = normalize_text(text)
+    if len(text) <= size:
+        return [text] if text else []
+    return [text[i:i + size] for i in range(len(text) - size + 1)]
+
+
+class NearDuplicateDetector:
+    """
+    Groups texts whose estimated Jaccard similarity reaches a threshold
+
+    Each text is reduced to a MinHash signature over character shingles.
+    Signatures are split into bands; texts sharing any band become candidate
+    pairs, which are kept only if their signatures agree on at least
+    `threshold` of the positions. Groups are the connected components of
+    the kept pairs.
+    """
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        """
+        Args:
+            config: The `generation.dedupe` config block (threshold,
+                shingle_size, num_perm, bands, prefer_sources, seed)
+        """
+        config = config or {}
+        self.threshold = config.get("threshold", 0.9)
+        self.shingle_size = config.get("shingle_size", 5)
+        self.num_perm = config.get("num_perm", 128)
+        self.bands = config.get("bands", 32)
+        # Source prefixes (slug "phb:fireball" -> "phb") preferred as the canonical entity
+        self.prefer_sources = list(config.get("prefer_sources", ["phb"]))
+
+        if self.num_perm % self.bands:
+            raise ValueError(f"num_perm ({self.num_perm}) must be a multiple of bands ({self.bands})")
+
+        rng = np.random.RandomState(config.get("seed", 1))
+        self._a = rng.randint(1, 2 ** 31 - 1, size=self.num_perm).astype(np.uint64)
+        self._b = rng.randint(0, 2 ** 31 - 1, size=self.num_perm).astype(np.uint64)
+
+    def signature(self, text: str) -> np.ndarray:
+        """MinHash signature (num_perm uint64 values) of a text"""
+        hashes = np.fromiter(
+            (zlib.crc32(s.encode("utf-8")) for s in set(shingles(text, self.shingle_size))),
+            dtype=np.uint64
+        )
+        if not len(hashes):
+            return np.full(self.num_perm, _PRIME, dtype=np.uint64)
+        return ((np.outer(hashes, self._a) + self._b) % _PRIME).min(axis=0)
+
+    def groups(self, texts: Dict[str, str]) -> List[List[str]]:
+        """
+        Find groups of near-duplicate texts
+
+        Args:
+            texts: {key: text}
+
+        Returns:
+            Groups of two or more keys (each sorted), sorted by first key
+        """
+        keys = list(texts)
+        if len(keys) < 2:
+            return []
+
+        signatures = np.stack([self.signature(texts[key]) for key in keys])
+        rows = self.num_perm // self.bands
+
+        parent = list(range(len(keys)))
+
+        def find(i: int) -> int:
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        checked = set()
+        for band in range(self.bands):
+            buckets: Dict[bytes, List[int]] = {}
+            for i, row in enumerate(signatures[:, band * rows:(band + 1) * rows]):
+                buckets.setdefault(row.tobytes(), []).append(i)
+
+            for members in buckets.values():
+                first = members[0]
+                for other in members[1:]:
+                    pair = (first, other)
+                    if pair in checked:
+                        continue
+                    checked.add(pair)
+                    similarity = np.count_nonzero(signatures[first] == signatures[other]) / self.num_perm
+                    if similarity >= self.threshold:
+                        parent[find(other)] = find(first)
+
+        components: Dict[int, List[str]] = {}
+        for i, key in enumerate(keys):
+            components.setdefault(find(i), []).append(key)
+
+        return sorted(
+            (sorted(members) for members in components.values() if len(members) > 1),
+            key=lambda members: members[0]
+        )
+
+    def canonical(self, slugs: Sequence[str]) -> str:
+        """
+        Pick the slug whose image a group shares
+
+        Preferred sources come first (in prefer_sources order), then the
+        shortest slug, then alphabetical order.
+        """
+        def rank(slug: str):
+            source = slug.split(":", 1)[0] if ":" in slug else ""
+            preference = self.prefer_sources.index(source) if source in self.prefer_sources else len(self.prefer_sources)
+            return (preference, len(slug), slug)
+
+        return min(slugs, key=rank)
+
+    def aliases(self, texts: Dict[str, str]) -> Dict[str, str]:
+        """
+        Map every non-canonical member of a near-duplicate group to its canonical slug
+
+        Args:
+            texts: {slug: text}
+
+        Returns:
+            {alias_slug: canonical_slug}
+        """
+        aliases = {}
+        for group in self.groups(texts):
+            canonical = self.canonical(group)
+            for slug in group:
+                if slug != canonical:
+                    aliases[slug] = canonical
+        return aliases
@@ -1,20 +1,33 @@
 import json
+import os
 import requests
 import base64
+import threading
+from contextlib import nullcontext
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Iterable, List, Optional, Sequence, Tuple, Union
 from PIL import Image
 import io
 import logging
 
+from .image_quality import find_webp_quality, search_settings
+from .metrics import StageTimings
+from .output_index import OutputIndex
+
 logger = logging.getLogger(__name__)
 
 
 class FileManager:
     """Manages file storage and manifest tracking for generated images"""
 
-    def __init__(self, config: Dict[str, Any]):
+    def __init__(self, config: Dict[str, Any], timings: Optional[StageTimings] = None):
+        """
+        Args:
+            config: The `output` config block
+            timings: Optional collector for "save" and "conversions" stage timings
+        """
         self.config = config
+        self.timings = timings
         self.base_path = Path(config["base_path"])
         self.timeout = config.get("timeout", 30)
         self.manifest_path = self.base_path / ".manifest.json"
@@ -24,10 +37,26 @@ class FileManager:
         self.conversions_enabled = self.conversions.get("enabled", False)
         self.conversion_sizes = self.conversions.get("sizes", [])
         self.conversions_path = Path(self.conversions.get("path", "./output/conversions"))
+        self.conversion_quality = self.conversions.get("quality", 85)
+
+        # Optional perceptual quality search (lowest quality meeting an SSIM/PSNR target)
+        quality_search = self.conversions.get("quality_search", {})
+        self.quality_search_enabled = quality_search.get("enabled", False)
+        self.quality_search = search_settings(quality_search)
+
+        # Conversion metadata from save_image, attached to the manifest by update_manifest
+        self._pending_conversions: Dict[Tuple[str, str], Dict[str, Any]] = {}
 
         # Ensure base directory exists
         self.base_path.mkdir(parents=True, exist_ok=True)
 
+        # Output tree index, loaded on first use
+        self._index: Optional[OutputIndex] = None
+
+        # Manifest read-modify-write cycles from concurrent pipeline workers
+        self._manifest_lock = threading.RLock()
+        self._index_lock = threading.Lock()
+
         # Ensure conversions directory exists if enabled
         if self.conversions_enabled:
             self.conversions_path.mkdir(parents=True, exist_ok=True)
@@ -37,16 +66,18 @@ class FileManager:
         image_url: str,
         entity_type: str,
         slug: str,
-        provider_name: str = "unknown"
+        provider_name: str = "unknown",
+        image_data: Optional[bytes] = None
     ) -> str:
         """
         Download and save image to entity_type/provider_name/slug.png
 
         Args:
-            image_url: URL of image to download
+            image_url: URL of image to download (ignored if image_data is given)
             entity_type: Entity type (spells, items, etc.)
             slug: Entity slug for filename
             provider_name: Name of the image generation provider
+            image_data: Image bytes already fetched (e.g. from the result spool)
 
         Returns:
             Path to saved image
@@ -65,42 +96,107 @@ class FileManager:
         provider_dir = self.base_path / entity_type / provider_name
         provider_dir.mkdir(parents=True, exist_ok=True)
 
-        # Download or decode image
+        if image_data is None:
+            image_data = self._fetch_image(image_url)
+
+        with self._timed("save"):
+            output_path, sanitized_slug = self._write_original(
+                image_data, entity_type, slug, provider_name, provider_dir
+            )
+
+        # Generate conversions if enabled
+        if self.conversions_enabled and self.conversion_sizes:
+            with self._timed("conversions"):
+                self._pending_conversions[(entity_type, slug)] = self._generate_conversions(
+                    image_data, entity_type, sanitized_slug, provider_name
+                )
+
+        return str(output_path)
+
+    def _fetch_image(self, image_url: str) -> bytes:
+        """Decode a data URL, or download an HTTP URL (timed as the "download" stage)"""
         if image_url.startswith("data:image"):
-            # Handle data URL (from Stability.ai)
+            # Handle data URL (Stability.ai, DALL-E with response_format b64_json)
             # Format: data:image/png;base64,<base64_string>
             header, base64_data = image_url.split(',', 1)
-            image_data = base64.b64decode(base64_data)
-        else:
-            # Handle regular HTTP URL (from DALL-E)
+            return base64.b64decode(base64_data)
+
+        # Handle regular HTTP URL (DALL-E with response_format url)
+        with self._timed("download"):
             response = requests.get(image_url, timeout=self.timeout)
             response.raise_for_status()
-            image_data = response.content
+            return response.content
 
-        # Sanitize slug to prevent path traversal
-        # Also convert : to -- for filesystem compatibility (macOS issues with colons)
-        sanitized_slug = slug.replace(':', '--')
-        sanitized_slug = Path(sanitized_slug).name
-        if sanitized_slug != slug.replace(':', '--'):
-            raise ValueError(f"Invalid slug: {slug}. Slugs must not contain path components.")
+    def _write_original(
+        self,
+        image_data: bytes,
+        entity_type: str,
+        slug: str,
+        provider_name: str,
+        provider_dir: Path
+    ) -> Tuple[Path, str]:
+        """Write {slug}.png; returns (path, fs slug)"""
+        sanitized_slug = self._sanitize_slug(slug)
 
         # Clean filename: just slug.png
         filename = f"{sanitized_slug}.png"
 
         # Save original image (no resize)
         output_path = provider_dir / filename
+        self._detach_alias(output_path)
         with open(output_path, 'wb') as f:
             f.write(image_data)
 
         logger.info(f"Saved image to {output_path}")
+        self.index.record(output_path, entity_type, provider_name, sanitized_slug)
 
-        # Generate conversions if enabled
-        if self.conversions_enabled and self.conversion_sizes:
-            self._generate_conversions(image_data, entity_type, sanitized_slug, provider_name)
+        return output_path, sanitized_slug
 
-        return str(output_path)
+    @staticmethod
+    def _sanitize_slug(slug: str) -> str:
+        """Filesystem slug for an API slug, rejecting path components"""
+        # Sanitize slug to prevent path traversal
+        # Also convert : to -- for filesystem compatibility (macOS issues with colons)
+        sanitized_slug = slug.replace(':', '--')
+        sanitized_slug = Path(sanitized_slug).name
+        if sanitized_slug != slug.replace(':', '--'):
+            raise ValueError(f"Invalid slug: {slug}. Slugs must not contain path components.")
+        return sanitized_slug
+
+    def _timed(self, stage: str):
+        return self.timings.time(stage) if self.timings else nullcontext()
 
-    def _generate_conversions(self, image_data: bytes, entity_type: str, slug: str, provider_name: str = "unknown"):
+    @property
+    def index(self) -> OutputIndex:
+        """Index of originals and conversions under base_path (built on first use)"""
+        if self._index is None:
+            with self._index_lock:
+                if self._index is None:
+                    self._index = OutputIndex.load(self.base_path, self.conversions_path)
+        return self._index
+
+    def flush_index(self):
+        """
+        Persist index changes (saving images only updates the in-memory index)
+
+        Call once a batch is done or interrupted; other processes (the
+        conversion server) see new images once this has run.
+        """
+        if self._index is not None:
+            self._index.flush()
+
+    def reload_index(self) -> OutputIndex:
+        """Reload the persisted index to pick up files written by other processes"""
+        self._index = OutputIndex.load(self.base_path, self.conversions_path)
+        return self._index
+
+    def _generate_conversions(
+        self,
+        image_data: bytes,
+        entity_type: str,
+        slug: str,
+        provider_name: str = "unknown"
+    ) -> Dict[str, Any]:
         """
         Generate resized WebP conversions of the image
 
@@ -109,23 +205,57 @@ class FileManager:
             entity_type: Entity type for subdirectory
             slug: Entity slug for filename
             provider_name: Name of the provider for subdirectory
+
+        Returns:
+            Conversion metadata keyed by size (path, quality, bytes, metric score)
         """
         img = Image.open(io.BytesIO(image_data))
+        metadata = {}
 
         for size in self.conversion_sizes:
             # Create provider-specific directory: conversions/size/entity_type/provider_name/
             provider_dir = self.conversions_path / str(size) / entity_type / provider_name
             provider_dir.mkdir(parents=True, exist_ok=True)
 
-            # Resize image
-            resized_img = img.resize((size, size), Image.Resampling.LANCZOS)
-
-            # Save as WebP for ~90% file size reduction
+            # Resize and encode as WebP for ~90% file size reduction
             filename = f"{slug}.webp"
             conversion_path = provider_dir / filename
-            resized_img.save(conversion_path, format='WEBP', quality=85)
+            webp_data, info = self.render_conversion(img, size)
+            self._detach_alias(conversion_path)
+            with open(conversion_path, 'wb') as f:
+                f.write(webp_data)
+            self.index.record(conversion_path, entity_type, provider_name, slug, size)
+
+            metadata[str(size)] = {"path": str(conversion_path), "bytes": len(webp_data), **info}
+
+            logger.info(f"Generated {size}x{size} WebP conversion (quality={info['quality']}): {conversion_path}")
+
+        return metadata
+
+    def render_conversion(self, img: Image.Image, size: int) -> Tuple[bytes, Dict[str, Any]]:
+        """
+        Resize an image to size x size and encode it as WebP
+
+        Uses the fixed conversion quality, or the lowest quality meeting the
+        configured perceptual target when quality search is enabled.
+
+        Args:
+            img: Original image
+            size: Target edge length in pixels
+
+        Returns:
+            Tuple of (WebP bytes, metadata with chosen quality and metric score)
+        """
+        img = img.resize((size, size), Image.Resampling.LANCZOS)
 
-            logger.info(f"Generated {size}x{size} WebP conversion: {conversion_path}")
+        if self.quality_search_enabled:
+            metric = self.quality_search["metric"]
+            quality, data, score = find_webp_quality(img, **self.quality_search)
+            return data, {"quality": quality, metric: round(score, 4)}
+
+        output = io.BytesIO()
+        img.save(output, format='WEBP', quality=self.conversion_quality)
+        return output.getvalue(), {"quality": self.conversion_quality}
 
     def _resize_image(self, image_data: bytes, target_size: int) -> bytes:
         """Resize image to target_size x target_size"""
@@ -142,7 +272,10 @@ class FileManager:
         slug: str,
         path: str,
         success: bool,
-        error: Optional[str] = None
+        error: Optional[str] = None,
+        prompt_hash: Optional[str] = None,
+        attempts: Optional[List[Dict[str, Any]]] = None,
+        provider: Optional[str] = None
     ):
         """
         Update manifest with generation result
@@ -153,22 +286,191 @@ class FileManager:
             path: Path to saved image
             success: Whether generation succeeded
             error: Error message if failed
+            prompt_hash: Provider prompt_hash() the image was generated from
+            attempts: Provider attempt records (ImageProvider.last_attempts());
+                kept when the image needed retries or failed
+            provider: Provider that produced the image
         """
-        manifest = self._load_manifest()
+        with self._manifest_lock:
+            manifest = self._load_manifest()
+
+            if entity_type not in manifest:
+                manifest[entity_type] = {}
 
-        if entity_type not in manifest:
-            manifest[entity_type] = {}
+            entry = {
+                "path": path,
+                "success": success,
+                "error": error
+            }
 
-        manifest[entity_type][slug] = {
-            "path": path,
-            "success": success,
-            "error": error
-        }
+            if success and provider:
+                entry["provider"] = provider
 
-        self._save_manifest(manifest)
+            if success and prompt_hash:
+                entry["prompt_hash"] = prompt_hash
 
-    def is_already_generated(self, entity_type: str, slug: str, provider_name: str = "stability-ai") -> bool:
-        """Check if image already exists (checks both manifest and file on disk)"""
+            if attempts and (len(attempts) > 1 or not success):
+                entry["attempts"] = attempts
+                if not success:
+                    last = attempts[-1]
+                    # "permanent", or why a retryable error was given up on
+                    entry["error_class"] = last.get("gave_up") or last["outcome"]
+
+            conversions = self._pending_conversions.pop((entity_type, slug), None)
+            if success and conversions:
+                entry["conversions"] = conversions
+
+            manifest[entity_type][slug] = entry
+            if success:
+                self._refresh_hardlink_aliases(entity_type, manifest[entity_type], slug, entry)
+
+            self._save_manifest(manifest)
+
+    def alias_image(
+        self,
+        entity_type: str,
+        slug: str,
+        canonical_slug: str,
+        prompt_hash: Optional[str] = None
+    ) -> Optional[str]:
+        """
+        Share a near-duplicate entity's image instead of generating a new one
+
+        Links {slug}.png and its conversions to the canonical entity's files
+        (symlinks, or hard links where symlinks are unavailable) and records a
+        manifest entry with alias_of set. Hard-linked aliases are marked
+        `"link": "hardlink"`; update_manifest() re-links them when the
+        canonical image is regenerated, since they do not follow its path.
+
+        Args:
+            entity_type: Entity type
+            slug: Entity slug to alias
+            canonical_slug: Slug of the entity whose image is shared
+            prompt_hash: Provider prompt_hash() of this entity's own prompt
+
+        Returns:
+            Path of the linked image, or None if the canonical entity has no
+            successful image to share
+        """
+        fs_slug = self._sanitize_slug(slug)
+
+        with self._manifest_lock:
+            manifest = self._load_manifest()
+            canonical = manifest.get(entity_type, {}).get(canonical_slug)
+            if not canonical or not canonical.get("success") or canonical.get("alias_of"):
+                return None
+
+            source = Path(canonical.get("path", ""))
+            if not source.is_file():
+                return None
+
+            provider_name = source.parent.name
+            link_path = source.with_name(f"{fs_slug}{source.suffix}")
+            hardlinked = not self._link(source, link_path)
+            self.index.record(link_path, entity_type, provider_name, fs_slug)
+
+            conversions = {}
+            for size, conversion in canonical.get("conversions", {}).items():
+                conversion_source = Path(conversion.get("path", ""))
+                if not conversion_source.is_file():
+                    continue
+                conversion_link = conversion_source.with_name(f"{fs_slug}{conversion_source.suffix}")
+                hardlinked |= not self._link(conversion_source, conversion_link)
+                self.index.record(conversion_link, entity_type, provider_name, fs_slug, int(size))
+                conversions[size] = dict(conversion, path=str(conversion_link))
+
+            entry = {
+                "path": str(link_path),
+                "success": True,
+                "error": None,
+                "alias_of": canonical_slug
+            }
+            if hardlinked:
+                entry["link"] = "hardlink"
+            if prompt_hash:
+                entry["prompt_hash"] = prompt_hash
+            if conversions:
+                entry["conversions"] = conversions
+
+            manifest.setdefault(entity_type, {})[slug] = entry
+            self._save_manifest(manifest)
+
+        logger.info(f"Linked {link_path} -> {source.name}")
+
+        return str(link_path)
+
+    @staticmethod
+    def _link(source: Path, link_path: Path) -> bool:
+        """
+        Point link_path at source (relative symlink, falling back to a hard link), replacing any file
+
+        Returns:
+            True for a symlink, False for a hard link
+        """
+        tmp_path = link_path.with_name(f".{link_path.name}.tmp")
+        if tmp_path.is_symlink() or tmp_path.exists():
+            tmp_path.unlink()
+        try:
+            os.symlink(os.path.relpath(source, link_path.parent), tmp_path)
+            symlinked = True
+        except (OSError, NotImplementedError):
+            os.link(source, tmp_path)
+            symlinked = False
+        os.replace(tmp_path, link_path)
+        return symlinked
+
+    def _refresh_hardlink_aliases(
+        self,
+        entity_type: str,
+        entries: Dict[str, Any],
+        canonical_slug: str,
+        canonical: Dict[str, Any]
+    ):
+        """
+        Re-link hard-linked aliases of a regenerated canonical image
+
+        Writing the canonical image detaches it from its hard links (see
+        _detach_alias), which would leave those aliases on the old bytes.
+        Caller holds the manifest lock.
+        """
+        for slug, entry in entries.items():
+            if entry.get("alias_of") != canonical_slug or entry.get("link") != "hardlink":
+                continue
+
+            sources = [(None, canonical.get("path", ""), entry.get("path", ""))]
+            for size, conversion in entry.get("conversions", {}).items():
+                source = canonical.get("conversions", {}).get(size, {}).get("path", "")
+                sources.append((int(size), source, conversion.get("path", "")))
+
+            for size, source, link in sources:
+                if not source or not link or not Path(source).is_file():
+                    continue
+                link_path = Path(link)
+                self._link(Path(source), link_path)
+                self.index.record(link_path, entity_type, link_path.parent.name, link_path.stem, size)
+            logger.info(f"Re-linked {slug} to regenerated {canonical_slug}")
+
+    @staticmethod
+    def _detach_alias(path: Path):
+        """Remove an alias link before writing, so the shared file is not overwritten through it"""
+        if path.is_symlink() or (path.exists() and path.stat().st_nlink > 1):
+            path.unlink()
+
+    def is_already_generated(
+        self,
+        entity_type: str,
+        slug: str,
+        providers: Union[str, Sequence[str]] = "stability-ai"
+    ) -> bool:
+        """
+        Check if image already exists (checks both manifest and the output index)
+
+        Args:
+            entity_type: Entity type
+            slug: Entity slug
+            providers: Provider directory, or several (a router's members), an
+                image under any of which counts
+        """
         # First check manifest (for backwards compatibility)
         manifest = self._load_manifest()
         if (
@@ -178,11 +480,145 @@ class FileManager:
         ):
             return True
 
-        # Also check if file exists on disk (handles renamed files)
+        # Also check the output index (handles renamed files)
         # Convert slug for filesystem (: -> --)
         fs_slug = slug.replace(':', '--')
-        file_path = self.base_path / entity_type / provider_name / f"{fs_slug}.png"
-        return file_path.exists()
+        return self._has_original(entity_type, fs_slug, providers)
+
+    def generation_statuses(
+        self,
+        entity_type: str,
+        slugs: Iterable[str],
+        providers: Union[str, Sequence[str]]
+    ) -> Dict[str, str]:
+        """
+        Status of many slugs from one manifest read ("done", "failed" or "new")
+
+        "done" matches is_already_generated(); "failed" means the last attempt
+        recorded in the manifest failed and no image exists.
+        """
+        entries = self._load_manifest().get(entity_type, {})
+        statuses = {}
+
+        for slug in slugs:
+            entry = entries.get(slug)
+            if entry and entry["success"]:
+                statuses[slug] = "done"
+            elif self._has_original(entity_type, slug.replace(':', '--'), providers):
+                statuses[slug] = "done"
+            elif entry:
+                statuses[slug] = "failed"
+            else:
+                statuses[slug] = "new"
+
+        return statuses
+
+    def _has_original(self, entity_type: str, fs_slug: str, providers: Union[str, Sequence[str]]) -> bool:
+        """Index lookup, confirmed with a stat so files deleted by hand are generated again"""
+        if isinstance(providers, str):
+            providers = [providers]
+        index = self.index
+        for provider in providers:
+            entry = index.get(entity_type, provider, fs_slug)
+            if entry is None:
+                continue
+            if index.path_for(entry).exists():
+                return True
+            logger.info(f"Indexed {entity_type}/{provider}/{fs_slug} no longer exists, dropping it from the index")
+            index.remove(entry)
+        return False
+
+    def get_prompt_hash(self, entity_type: str, slug: str) -> Optional[str]:
+        """Stored prompt hash of a successful generation, or None (missing, failed or pre-dates hashing)"""
+        entry = self._load_manifest().get(entity_type, {}).get(slug)
+        if not entry or not entry.get("success"):
+            return None
+        return entry.get("prompt_hash")
+
+    def get_provider(self, entity_type: str, slug: str) -> Optional[str]:
+        """Provider that produced a successful generation, or None (missing, failed, alias or pre-dates tracking)"""
+        entry = self._load_manifest().get(entity_type, {}).get(slug)
+        if not entry or not entry.get("success"):
+            return None
+        return entry.get("provider")
+
+    def set_prompt_hashes(self, entity_type: str, hashes: Dict[str, str]) -> int:
+        """
+        Record prompt hashes on existing successful entries in a single load/save
+
+        Used to baseline entries generated before hashes were stored.
+
+        Args:
+            entity_type: Entity type
+            hashes: {slug: prompt_hash}
+
+        Returns:
+            Number of entries updated
+        """
+        with self._manifest_lock:
+            manifest = self._load_manifest()
+            entries = manifest.get(entity_type, {})
+            updated = 0
+
+            for slug, prompt_hash in hashes.items():
+                entry = entries.get(slug)
+                if entry and entry.get("success"):
+                    entry["prompt_hash"] = prompt_hash
+                    updated += 1
+
+            if updated:
+                self._save_manifest(manifest)
+
+            return updated
+
+    def rename_manifest_entries(self, renames: Dict[str, Dict[str, str]]) -> int:
+        """
+        Re-key manifest entries and rewrite their paths in a single load/save
+
+        Args:
+            renames: {entity_type: {old_slug: new_slug}} using API slugs
+
+        Returns:
+            Number of manifest entries renamed
+        """
+        with self._manifest_lock:
+            manifest = self._load_manifest()
+            renamed = 0
+
+            for entity_type, slug_map in renames.items():
+                entries = manifest.get(entity_type)
+                if not entries:
+                    continue
+
+                for old_slug, new_slug in slug_map.items():
+                    if old_slug not in entries or new_slug in entries:
+                        continue
+
+                    entry = entries.pop(old_slug)
+                    old_stem = old_slug.replace(':', '--')
+                    new_stem = new_slug.replace(':', '--')
+
+                    entry["path"] = self._renamed_path(entry.get("path", ""), old_stem, new_stem)
+                    for conversion in entry.get("conversions", {}).values():
+                        conversion["path"] = self._renamed_path(conversion.get("path", ""), old_stem, new_stem)
+
+                    entries[new_slug] = entry
+                    renamed += 1
+
+            if renamed:
+                self._save_manifest(manifest)
+
+            return renamed
+
+    @staticmethod
+    def _renamed_path(path: str, old_stem: str, new_stem: str) -> str:
+        """Swap the filename stem of a stored path if it matches old_stem"""
+        if not path:
+            return path
+        p = Path(path)
+        if p.stem != old_stem:
+            return path
+        return str(p.with_name(f"{new_stem}{p.suffix}"))
 
     def get_generated_count(self, entity_type: Optional[str] = None) -> int:
         """
@@ -213,6 +649,8 @@ class FileManager:
         return {}
 
     def _save_manifest(self, manifest: Dict[str, Any]):
-        """Save manifest to disk"""
-        with open(self.manifest_path, 'w') as f:
+        """Save manifest to disk (atomically, so concurrent readers never see a partial file)"""
+        tmp_path = self.manifest_path.with_suffix(".tmp")
+        with open(tmp_path, 'w') as f:
             json.dump(manifest, f, indent=2)
+        os.replace(tmp_path, self.manifest_path)
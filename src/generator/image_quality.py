@@ -0,0 +1,163 @@
+"""Perceptual image metrics and WebP quality search"""
+import io
+import math
+import logging
+from typing import Dict, Any, Optional, Tuple
+
+import numpy as np
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+# SSIM stabilisation constants for 8-bit images (Wang et al. 2004)
+_SSIM_C1 = (0.01 * 255) ** 2
+_SSIM_C2 = (0.03 * 255) ** 2
+_SSIM_WINDOW = 7
+
+METRICS = ("ssim", "psnr")
+
+
+def _to_array(img: Image.Image) -> np.ndarray:
+    """Convert an image to a float64 RGB array"""
+    if img.mode != "RGB":
+        img = img.convert("RGB")
+    return np.asarray(img, dtype=np.float64)
+
+
+def _luma(rgb: np.ndarray) -> np.ndarray:
+    """ITU-R BT.601 luma of an RGB array"""
+    return rgb @ np.array([0.299, 0.587, 0.114])
+
+
+def _box_mean(x: np.ndarray, window: int) -> np.ndarray:
+    """Mean over every window x window block ('valid' mode) using an integral image"""
+    integral = np.pad(x, ((1, 0), (1, 0))).cumsum(axis=0).cumsum(axis=1)
+    total = (
+        integral[window:, window:]
+        - integral[:-window, window:]
+        - integral[window:, :-window]
+        + integral[:-window, :-window]
+    )
+    return total / (window * window)
+
+
+def ssim(reference: Image.Image, candidate: Image.Image) -> float:
+    """
+    Mean structural similarity between two images of the same size
+
+    Computed on luma with a uniform sliding window.
+
+    Returns:
+        SSIM in [-1, 1], 1.0 for identical images
+    """
+    x = _luma(_to_array(reference))
+    y = _luma(_to_array(candidate))
+
+    # Fall back to a single global window for tiny images
+    window = min(_SSIM_WINDOW, x.shape[0], x.shape[1])
+
+    mu_x = _box_mean(x, window)
+    mu_y = _box_mean(y, window)
+    var_x = _box_mean(x * x, window) - mu_x * mu_x
+    var_y = _box_mean(y * y, window) - mu_y * mu_y
+    cov_xy = _box_mean(x * y, window) - mu_x * mu_y
+
+    numerator = (2 * mu_x * mu_y + _SSIM_C1) * (2 * cov_xy + _SSIM_C2)
+    denominator = (mu_x * mu_x + mu_y * mu_y + _SSIM_C1) * (var_x + var_y + _SSIM_C2)
+
+    return float(np.mean(numerator / denominator))
+
+
+def psnr(reference: Image.Image, candidate: Image.Image) -> float:
+    """
+    Peak signal-to-noise ratio between two images of the same size
+
+    Returns:
+        PSNR in dB, infinity for identical images
+    """
+    mse = float(np.mean((_to_array(reference) - _to_array(candidate)) ** 2))
+    if mse == 0:
+        return math.inf
+    return 10 * math.log10(255 ** 2 / mse)
+
+
+def _encode_webp(img: Image.Image, quality: int) -> bytes:
+    """Encode image as WebP at the given quality"""
+    output = io.BytesIO()
+    img.save(output, format='WEBP', quality=quality)
+    return output.getvalue()
+
+
+def find_webp_quality(
+    img: Image.Image,
+    metric: str = "ssim",
+    target: float = 0.985,
+    min_quality: int = 40,
+    max_quality: int = 95,
+    max_steps: int = 7
+) -> Tuple[int, bytes, float]:
+    """
+    Find the lowest WebP quality whose decoded output meets a perceptual target
+
+    Runs a bounded binary search over [min_quality, max_quality], assuming the
+    metric increases with quality. If no probed quality meets the target, the
+    image is encoded at max_quality.
+
+    Args:
+        img: Image to encode (already resized)
+        metric: "ssim" or "psnr"
+        target: Minimum acceptable metric value
+        min_quality: Lowest quality to consider
+        max_quality: Highest quality to consider
+        max_steps: Maximum number of trial encodes
+
+    Returns:
+        Tuple of (quality, encoded WebP bytes, metric value)
+
+    Raises:
+        ValueError: If metric is not supported
+    """
+    if metric not in METRICS:
+        raise ValueError(f"Unknown quality metric: {metric}. Available metrics: {', '.join(METRICS)}")
+
+    score_fn = ssim if metric == "ssim" else psnr
+    reference = img.convert("RGB")
+
+    best: Optional[Tuple[int, bytes, float]] = None
+    lo, hi = min_quality, max_quality
+    steps = 0
+
+    while lo <= hi and steps < max_steps:
+        quality = (lo + hi) // 2
+        data = _encode_webp(img, quality)
+        with Image.open(io.BytesIO(data)) as decoded:
+            score = score_fn(reference, decoded)
+        steps += 1
+
+        if score >= target:
+            best = (quality, data, score)
+            hi = quality - 1
+        else:
+            lo = quality + 1
+
+    if best is None:
+        data = _encode_webp(img, max_quality)
+        with Image.open(io.BytesIO(data)) as decoded:
+            score = score_fn(reference, decoded)
+        logger.debug(f"No quality met {metric} >= {target}; using {max_quality} ({metric}={score:.4f})")
+        best = (max_quality, data, score)
+
+    return best
+
+
+def search_settings(config: Dict[str, Any]) -> Dict[str, Any]:
+    """Normalize a quality_search config block into find_webp_quality kwargs"""
+    metric = config.get("metric", "ssim")
+    default_target = 0.985 if metric == "ssim" else 40.0
+    return {
+        "metric": metric,
+        "target": config.get("target", default_target),
+        "min_quality": config.get("min_quality", 40),
+        "max_quality": config.get("max_quality", 95),
+        "max_steps": config.get("max_steps", 7),
+    }
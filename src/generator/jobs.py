@@ -0,0 +1,202 @@
+"""Background jobs for long-running MCP tool calls, with progress and cancellation"""
+import asyncio
+import threading
+import time
+import uuid
+import logging
+from collections import OrderedDict
+from typing import Dict, Any, Callable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+FINISHED = (COMPLETED, FAILED, CANCELLED)
+
+
+class Job:
+    """
+    A unit of background work and its progress
+
+    The work function runs on a worker thread and reports each entity
+    through record(); it should check `cancelled` between entities.
+    """
+
+    def __init__(self, kind: str, params: Dict[str, Any]):
+        self.id = uuid.uuid4().hex[:12]
+        self.kind = kind
+        self.params = params
+        self.status = QUEUED
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.total: Optional[int] = None
+        self.counts = {"done": 0, "failed": 0, "skipped": 0}
+        self.result: Optional[str] = None
+        self.error: Optional[str] = None
+        self.task: Optional[asyncio.Task] = None
+
+        self._cancel = threading.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def cancelled(self) -> bool:
+        """True once cancellation was requested"""
+        return self._cancel.is_set()
+
+    def cancel(self):
+        self._cancel.set()
+
+    def set_total(self, total: int):
+        with self._lock:
+            self.total = total
+
+    def record(self, outcome: str):
+        """Count one entity as "done", "failed" or "skipped" """
+        with self._lock:
+            self.counts[outcome] += 1
+
+    def progress(self) -> Dict[str, Any]:
+        """
+        Snapshot of the job's state
+
+        Returns:
+            Status, counts, remaining entities, generation rate (per minute,
+            over processed entities) and ETA in seconds (None until known)
+        """
+        with self._lock:
+            counts = dict(self.counts)
+            total = self.total
+
+        end = self.finished_at or time.time()
+        elapsed = end - self.started_at if self.started_at else 0.0
+        finished = sum(counts.values())
+        remaining = max(0, total - finished) if total is not None else None
+
+        # Skips cost nothing, so rate and ETA count generated and failed entities only
+        processed = counts["done"] + counts["failed"]
+        rate = processed / elapsed * 60 if elapsed and processed else 0.0
+        eta = None
+        if self.status == RUNNING and remaining is not None and rate:
+            eta = round(remaining / rate * 60, 1)
+
+        return {
+            "job_id": self.id,
+            "kind": self.kind,
+            "params": self.params,
+            "status": self.status,
+            "total": total,
+            **counts,
+            "remaining": remaining,
+            "elapsed_seconds": round(elapsed, 1),
+            "rate_per_minute": round(rate, 2),
+            "eta_seconds": eta,
+            "result": self.result,
+            "error": self.error,
+        }
+
+    def describe(self) -> str:
+        """One-line human-readable progress"""
+        p = self.progress()
+        params = " ".join(f"{key}={value}" for key, value in p["params"].items() if value is not None)
+        line = f"Job {p['job_id']} ({p['kind']}{' ' + params if params else ''}): {p['status']}"
+        if p["total"] is not None:
+            line += (f", {p['done']} done, {p['failed']} failed, {p['skipped']} skipped, "
+                     f"{p['remaining']} remaining of {p['total']}")
+        if p["rate_per_minute"]:
+            line += f", {p['rate_per_minute']:.1f} images/min"
+        if p["eta_seconds"] is not None:
+            minutes, seconds = divmod(int(p["eta_seconds"]), 60)
+            line += f", ETA {minutes}m{seconds:02d}s"
+        if p["error"]:
+            line += f", error: {p['error']}"
+        elif p["result"]:
+            line += f" - {p['result']}"
+        return line
+
+
+class JobManager:
+    """
+    Runs jobs in the background of an asyncio event loop
+
+    Each job's work function runs in a worker thread (asyncio.to_thread), so
+    blocking provider and file I/O never stalls other tool calls. At most
+    `max_running` jobs run at once; later ones wait as "queued". Only the
+    most recent `keep_finished` finished jobs are kept for status queries.
+    """
+
+    def __init__(self, max_running: int = 1, keep_finished: int = 50):
+        self.max_running = max(1, max_running)
+        self.keep_finished = keep_finished
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._slots: Optional[asyncio.Semaphore] = None
+
+    def submit(self, kind: str, params: Dict[str, Any], work: Callable[[Job], str]) -> Job:
+        """
+        Start a job (must be called from the running event loop)
+
+        Args:
+            kind: Job type, e.g. "batch_generate"
+            params: Parameters shown in status reports
+            work: Blocking function run in a thread; returns a result summary
+
+        Returns:
+            The queued job
+        """
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_running)
+
+        job = Job(kind, params)
+        self._jobs[job.id] = job
+        self._prune()
+        job.task = asyncio.get_running_loop().create_task(self._run(job, work))
+        logger.info(f"Queued job {job.id}: {kind} {params}")
+        return job
+
+    async def _run(self, job: Job, work: Callable[[Job], str]):
+        async with self._slots:
+            if job.cancelled:
+                job.status = CANCELLED
+                job.finished_at = time.time()
+                return
+
+            job.status = RUNNING
+            job.started_at = time.time()
+            try:
+                job.result = await asyncio.to_thread(work, job)
+                job.status = CANCELLED if job.cancelled else COMPLETED
+            except Exception as e:
+                logger.error(f"Job {job.id} failed: {e}")
+                job.error = str(e)
+                job.status = FAILED
+            finally:
+                job.finished_at = time.time()
+                logger.info(f"Job {job.id} {job.status}")
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+    def jobs(self) -> List[Job]:
+        """All known jobs, oldest first"""
+        return list(self._jobs.values())
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        """
+        Request cancellation; a running job stops after its current entity
+
+        Returns:
+            The job, or None if unknown
+        """
+        job = self._jobs.get(job_id)
+        if job and job.status not in FINISHED:
+            job.cancel()
+        return job
+
+    def _prune(self):
+        finished = [job_id for job_id, job in self._jobs.items() if job.status in FINISHED]
+        for job_id in finished[:max(0, len(finished) - self.keep_finished)]:
+            del self._jobs[job_id]
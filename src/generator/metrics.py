@@ -0,0 +1,62 @@
+"""Per-stage timing for the generation pipeline"""
+import math
+import threading
+import time
+import logging
+from contextlib import contextmanager
+from typing import Dict, Iterator, List
+
+logger = logging.getLogger(__name__)
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list (0.0 if empty)"""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, math.ceil(pct / 100 * len(sorted_values)) - 1)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+class StageTimings:
+    """Thread-safe collection of wall-clock durations per pipeline stage"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._samples: Dict[str, List[float]] = {}
+
+    @contextmanager
+    def time(self, stage: str) -> Iterator[None]:
+        """Time the enclosed block as one sample of stage (recorded even on error)"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - start)
+
+    def record(self, stage: str, seconds: float):
+        with self._lock:
+            self._samples.setdefault(stage, []).append(seconds)
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """{stage: {count, total, p50, p95, max}} with times in seconds"""
+        with self._lock:
+            samples = {stage: sorted(values) for stage, values in self._samples.items()}
+
+        return {
+            stage: {
+                "count": len(values),
+                "total": sum(values),
+                "p50": percentile(values, 50),
+                "p95": percentile(values, 95),
+                "max": values[-1],
+            }
+            for stage, values in samples.items()
+        }
+
+    def log_summary(self):
+        """Log one line per stage"""
+        for stage, s in self.summary().items():
+            logger.info(
+                f"  {stage:<12} n={s['count']:<5} p50={s['p50'] * 1000:8.1f}ms "
+                f"p95={s['p95'] * 1000:8.1f}ms total={s['total']:.1f}s"
+            )
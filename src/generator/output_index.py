@@ -0,0 +1,295 @@
+"""Persistent index of generated images and conversions under the output tree"""
+import json
+import os
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, Iterator, NamedTuple, Optional, Set, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+INDEX_FILENAME = ".index.json"
+INDEX_VERSION = 1
+
+
+class IndexEntry(NamedTuple):
+    """One indexed file. size is None for originals, the pixel size for conversions."""
+    entity_type: str
+    provider: str
+    slug: str
+    size: Optional[int]
+    format: str
+    bytes: int
+    mtime: float
+
+
+# Key identifying a file: (entity_type, provider, slug, size, format)
+IndexKey = Tuple[str, str, str, Optional[int], str]
+
+
+class OutputIndex:
+    """
+    Compact index of output/ built with a single os.scandir pass
+
+    Layout indexed:
+        {base_path}/{entity_type}/{provider}/{slug}.{format}               (originals)
+        {conversions_path}/{size}/{entity_type}/{provider}/{slug}.{format}  (conversions)
+
+    Slugs are filesystem slugs (':' already converted to '--').
+    """
+
+    def __init__(self, base_path: Union[str, Path], conversions_path: Optional[Union[str, Path]] = None):
+        self.base_path = Path(base_path)
+        self.conversions_path = Path(conversions_path) if conversions_path else self.base_path / "conversions"
+        self.index_path = self.base_path / INDEX_FILENAME
+        self._entries: Dict[IndexKey, IndexEntry] = {}
+        # (entity_type, slug, size, format) -> providers, for provider-agnostic lookups
+        self._providers: Dict[Tuple[str, str, Optional[int], str], Set[str]] = {}
+        # Guards mutation and save when pipeline workers record files concurrently
+        self._lock = threading.RLock()
+        # Changed since loaded or last saved (see flush)
+        self._dirty = False
+
+    @classmethod
+    def load(
+        cls,
+        base_path: Union[str, Path],
+        conversions_path: Optional[Union[str, Path]] = None,
+        rebuild: bool = False
+    ) -> "OutputIndex":
+        """
+        Load the persisted index, building (and saving) it if missing or unreadable
+
+        Args:
+            base_path: Output base directory
+            conversions_path: Conversions directory (default: base_path/conversions)
+            rebuild: Ignore the persisted index and rescan the tree
+        """
+        index = cls(base_path, conversions_path)
+
+        if not rebuild and index.index_path.exists():
+            try:
+                with open(index.index_path) as f:
+                    data = json.load(f)
+                if data.get("version") == INDEX_VERSION:
+                    for row in data.get("entries", []):
+                        index._put(IndexEntry(*row))
+                    index._dirty = False
+                    return index
+            except (OSError, ValueError, TypeError) as e:
+                logger.warning(f"Ignoring unreadable output index {index.index_path}: {e}")
+
+        index.build()
+        index.save()
+        return index
+
+    def build(self):
+        """Rebuild the index from disk, visiting each directory once"""
+        self._entries = {}
+        self._providers = {}
+
+        conversions_real = os.path.realpath(self.conversions_path)
+
+        # Originals: base/{entity_type}/{provider}/{file}
+        for entity_dir in self._scan_dirs(self.base_path):
+            if os.path.realpath(entity_dir.path) == conversions_real:
+                continue
+            for provider_dir in self._scan_dirs(entity_dir.path):
+                for file_entry in self._scan_files(provider_dir.path):
+                    self._add_scanned(file_entry, entity_dir.name, provider_dir.name, None)
+
+        # Conversions: conversions/{size}/{entity_type}/{provider}/{file}
+        for size_dir in self._scan_dirs(self.conversions_path):
+            if not size_dir.name.isdigit():
+                continue
+            size = int(size_dir.name)
+            for entity_dir in self._scan_dirs(size_dir.path):
+                for provider_dir in self._scan_dirs(entity_dir.path):
+                    for file_entry in self._scan_files(provider_dir.path):
+                        self._add_scanned(file_entry, entity_dir.name, provider_dir.name, size)
+
+        logger.info(f"Indexed {len(self._entries)} files under {self.base_path}")
+
+    def save(self):
+        """Persist the index to {base_path}/.index.json"""
+        self.base_path.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            rows = [list(entry) for _, entry in sorted(self._entries.items(), key=lambda item: self._sort_key(item[0]))]
+            tmp_path = self.index_path.with_suffix(".tmp")
+            with open(tmp_path, 'w') as f:
+                json.dump({"version": INDEX_VERSION, "entries": rows}, f, separators=(',', ':'))
+            os.replace(tmp_path, self.index_path)
+            self._dirty = False
+
+    def flush(self) -> bool:
+        """
+        Save only if entries changed since the last load or save
+
+        Recording files just marks the index dirty, so a batch rewrites
+        .index.json once rather than once per image.
+
+        Returns:
+            True if the index was saved
+        """
+        with self._lock:
+            if not self._dirty:
+                return False
+            self.save()
+            return True
+
+    def record(
+        self,
+        path: Union[str, Path],
+        entity_type: str,
+        provider: str,
+        slug: str,
+        size: Optional[int] = None
+    ) -> IndexEntry:
+        """Add or update the entry for a file that was just written"""
+        path = Path(path)
+        stat = path.stat()
+        entry = IndexEntry(entity_type, provider, slug, size, path.suffix.lstrip('.').lower(), stat.st_size, stat.st_mtime)
+        self._put(entry)
+        return entry
+
+    def remove(self, entry: IndexEntry):
+        """Drop an entry (e.g. after the file was renamed or deleted)"""
+        key = self._key(entry)
+        with self._lock:
+            if self._entries.pop(key, None) is not None:
+                self._dirty = True
+                providers = self._providers.get((entry.entity_type, entry.slug, entry.size, entry.format))
+                if providers:
+                    providers.discard(entry.provider)
+
+    def rename(self, entry: IndexEntry, new_slug: str) -> IndexEntry:
+        """Move an entry to a new slug after its file was renamed (no stat needed)"""
+        renamed = entry._replace(slug=new_slug)
+        with self._lock:
+            self.remove(entry)
+            self._put(renamed)
+        return renamed
+
+    def get(
+        self,
+        entity_type: str,
+        provider: str,
+        slug: str,
+        size: Optional[int] = None,
+        fmt: str = "png"
+    ) -> Optional[IndexEntry]:
+        """Look up a single file"""
+        return self._entries.get((entity_type, provider, slug, size, fmt))
+
+    def has(
+        self,
+        entity_type: str,
+        slug: str,
+        provider: Optional[str] = None,
+        size: Optional[int] = None,
+        fmt: str = "png"
+    ) -> bool:
+        """Check whether a file exists, optionally for any provider"""
+        if provider is not None:
+            return (entity_type, provider, slug, size, fmt) in self._entries
+        return bool(self._providers.get((entity_type, slug, size, fmt)))
+
+    def providers(
+        self,
+        entity_type: str,
+        slug: str,
+        size: Optional[int] = None,
+        fmt: str = "png"
+    ) -> Set[str]:
+        """Providers that have a given file"""
+        with self._lock:
+            return set(self._providers.get((entity_type, slug, size, fmt), ()))
+
+    def entries(
+        self,
+        entity_type: Optional[str] = None,
+        provider: Optional[str] = None,
+        originals: Optional[bool] = None,
+        size: Optional[int] = None,
+        fmt: Optional[str] = None
+    ) -> Iterator[IndexEntry]:
+        """
+        Iterate matching entries in sorted (size, entity_type, provider, slug, format) order
+
+        Args:
+            entity_type: Filter by entity type
+            provider: Filter by provider
+            originals: True for originals only, False for conversions only
+            size: Filter conversions by size (implies originals=False)
+            fmt: Filter by file format ("png", "webp")
+        """
+        with self._lock:
+            keys = sorted(self._entries, key=self._sort_key)
+
+        for key in keys:
+            entry = self._entries.get(key)
+            if entry is None:
+                continue
+            if entity_type is not None and entry.entity_type != entity_type:
+                continue
+            if provider is not None and entry.provider != provider:
+                continue
+            if originals is True and entry.size is not None:
+                continue
+            if originals is False and entry.size is None:
+                continue
+            if size is not None and entry.size != size:
+                continue
+            if fmt is not None and entry.format != fmt:
+                continue
+            yield entry
+
+    def path_for(self, entry: IndexEntry) -> Path:
+        """Filesystem path of an entry"""
+        filename = f"{entry.slug}.{entry.format}"
+        if entry.size is None:
+            return self.base_path / entry.entity_type / entry.provider / filename
+        return self.conversions_path / str(entry.size) / entry.entity_type / entry.provider / filename
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def _key(entry: IndexEntry) -> IndexKey:
+        return (entry.entity_type, entry.provider, entry.slug, entry.size, entry.format)
+
+    @staticmethod
+    def _sort_key(key: IndexKey):
+        entity_type, provider, slug, size, fmt = key
+        return (size or 0, entity_type, provider, slug, fmt)
+
+    def _put(self, entry: IndexEntry):
+        with self._lock:
+            self._entries[self._key(entry)] = entry
+            self._dirty = True
+            self._providers.setdefault((entry.entity_type, entry.slug, entry.size, entry.format), set()).add(entry.provider)
+
+    def _add_scanned(self, file_entry: os.DirEntry, entity_type: str, provider: str, size: Optional[int]):
+        slug, _, ext = file_entry.name.rpartition('.')
+        if not slug:
+            return
+        stat = file_entry.stat()
+        self._put(IndexEntry(entity_type, provider, slug, size, ext.lower(), stat.st_size, stat.st_mtime))
+
+    @staticmethod
+    def _scan_dirs(path: Union[str, Path]) -> Iterator[os.DirEntry]:
+        try:
+            with os.scandir(path) as it:
+                entries = [e for e in it if not e.name.startswith('.') and e.is_dir()]
+        except FileNotFoundError:
+            return
+        yield from entries
+
+    @staticmethod
+    def _scan_files(path: Union[str, Path]) -> Iterator[os.DirEntry]:
+        try:
+            with os.scandir(path) as it:
+                entries = [e for e in it if not e.name.startswith('.') and e.is_file()]
+        except FileNotFoundError:
+            return
+        yield from entries
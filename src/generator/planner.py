@@ -0,0 +1,202 @@
+"""Offline generation plans: what a run would do, computed without provider access"""
+import json
+import os
+import logging
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Sequence, Tuple, Union
+
+from .file_manager import FileManager
+from .metrics import percentile
+from .prompt_builder import PromptBuilder
+
+logger = logging.getLogger(__name__)
+
+PLAN_VERSION = 1
+
+# Used when generation.estimates is not configured
+DEFAULT_SECONDS_PER_IMAGE = 15.0
+DEFAULT_COST_PER_IMAGE = 0.04
+
+
+def plan_entity_type(
+    entity_type: str,
+    entities: Sequence[Tuple[Optional[str], Dict[str, Any]]],
+    prompt_builder: PromptBuilder,
+    file_manager: FileManager,
+    providers: Union[str, Sequence[str]],
+    force_regenerate: bool = False,
+    aliases: Optional[Dict[str, str]] = None
+) -> Dict[str, Any]:
+    """
+    Plan one entity type
+
+    Status comes from a single manifest read plus the output index, so no
+    per-slug manifest loads and no provider calls are made.
+
+    Args:
+        entity_type: Entity type (CLI form)
+        entities: (slug, entity) pairs in processing order; slug is None for
+            entities without a usable identifier
+        prompt_builder: Builder for this entity type
+        file_manager: Output manifest and index
+        providers: Provider directories whose images count as done
+            (providers.factory.output_provider_names())
+        force_regenerate: Plan every entity, even those already generated
+        aliases: Near-duplicate slug -> canonical slug (from --dedupe)
+
+    Returns:
+        Plan section: counts, prompt length distribution, empty descriptions
+        and the items a run would process, each with its exact prompt
+    """
+    aliases = aliases or {}
+    statuses = file_manager.generation_statuses(
+        entity_type, [slug for slug, _ in entities if slug], providers
+    )
+
+    counts = {"entities": len(entities), "done": 0, "pending": 0, "failed": 0, "invalid": 0, "aliased": 0}
+    lengths = []
+    empty_descriptions = []
+    invalid = []
+    items = []
+
+    for slug, entity in entities:
+        if not slug:
+            counts["invalid"] += 1
+            invalid.append(entity.get("id", entity.get("name")))
+            continue
+
+        prompt = prompt_builder.build(entity)
+        lengths.append(len(prompt))
+        if not prompt_builder.placeholder_values(entity)[2]:
+            empty_descriptions.append(slug)
+
+        status = statuses[slug]
+        if status == "done" and not force_regenerate:
+            counts["done"] += 1
+            continue
+
+        counts["pending"] += 1
+        if status == "failed":
+            counts["failed"] += 1
+
+        item = {"slug": slug, "entity": entity, "prompt": prompt}
+        if slug in aliases:
+            item["alias_of"] = aliases[slug]
+            counts["aliased"] += 1
+        items.append(item)
+
+    lengths.sort()
+    return {
+        "entity_type": entity_type,
+        "counts": counts,
+        "provider_calls": counts["pending"] - counts["aliased"],
+        "prompt_length": {
+            "min": lengths[0] if lengths else 0,
+            "p50": percentile(lengths, 50),
+            "p95": percentile(lengths, 95),
+            "max": lengths[-1] if lengths else 0,
+            "mean": round(sum(lengths) / len(lengths), 1) if lengths else 0,
+        },
+        "empty_descriptions": empty_descriptions,
+        "invalid": invalid,
+        "items": items,
+    }
+
+
+def build_plan(
+    sections: List[Dict[str, Any]],
+    source: str,
+    provider: str,
+    options: Dict[str, Any],
+    estimates: Optional[Dict[str, Any]] = None,
+    workers: int = 1,
+    batch_delay: float = 0.0
+) -> Dict[str, Any]:
+    """
+    Combine per-type sections into a plan with totals and projections
+
+    Args:
+        sections: plan_entity_type() results
+        source: Where entities came from (snapshot path or API base URL)
+        provider: Configured image provider
+        options: Run options the plan was made with (force_regenerate, dedupe, limit)
+        estimates: The `generation.estimates` config block (seconds_per_image, cost_per_image)
+        workers: Parallel workers the projection assumes
+        batch_delay: Delay after each generated image, in seconds
+    """
+    estimates = estimates or {}
+    seconds_per_image = estimates.get("seconds_per_image", DEFAULT_SECONDS_PER_IMAGE)
+    cost_per_image = estimates.get("cost_per_image", DEFAULT_COST_PER_IMAGE)
+
+    totals = {key: sum(s["counts"][key] for s in sections) for key in ("entities", "done", "pending", "failed", "invalid", "aliased")}
+    provider_calls = sum(s["provider_calls"] for s in sections)
+    totals.update({
+        "provider_calls": provider_calls,
+        "empty_descriptions": sum(len(s["empty_descriptions"]) for s in sections),
+        "projected_seconds": round(provider_calls * (seconds_per_image + batch_delay) / max(1, workers), 1),
+        "projected_cost": round(provider_calls * cost_per_image, 2),
+    })
+
+    return {
+        "plan_version": PLAN_VERSION,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "source": source,
+        "provider": provider,
+        "options": options,
+        "assumptions": {
+            "seconds_per_image": seconds_per_image,
+            "cost_per_image": cost_per_image,
+            "workers": workers,
+            "batch_delay": batch_delay,
+        },
+        "totals": totals,
+        "entity_types": sections,
+    }
+
+
+def save_plan(path: Union[str, Path], plan: Dict[str, Any]):
+    """Write a plan as JSON (atomically)"""
+    path = Path(path)
+    if path.parent:
+        path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp_path, 'w') as f:
+        json.dump(plan, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def load_plan(path: Union[str, Path]) -> Dict[str, Any]:
+    """
+    Read a plan written by save_plan
+
+    Raises:
+        ValueError: If the file is not a plan of a supported version
+    """
+    with open(path) as f:
+        plan = json.load(f)
+    if not isinstance(plan, dict) or plan.get("plan_version") != PLAN_VERSION:
+        raise ValueError(f"{path} is not a version {PLAN_VERSION} generation plan")
+    return plan
+
+
+def log_plan(plan: Dict[str, Any]):
+    """Log a per-type table and the totals"""
+    logger.info(f"{'entity type':<18} {'total':>6} {'done':>6} {'pending':>7} {'failed':>6} "
+                f"{'aliased':>7} {'calls':>6} {'no desc':>7} {'prompt p50/p95/max':>19}")
+    for section in plan["entity_types"]:
+        c = section["counts"]
+        lengths = section["prompt_length"]
+        logger.info(
+            f"{section['entity_type']:<18} {c['entities']:>6} {c['done']:>6} {c['pending']:>7} {c['failed']:>6} "
+            f"{c['aliased']:>7} {section['provider_calls']:>6} {len(section['empty_descriptions']):>7} "
+            f"{lengths['p50']:>7}/{lengths['p95']}/{lengths['max']}"
+        )
+
+    totals = plan["totals"]
+    hours, remainder = divmod(int(totals["projected_seconds"]), 3600)
+    logger.info(
+        f"Total: {totals['pending']} pending of {totals['entities']} ({totals['failed']} failed before, "
+        f"{totals['invalid']} without identifier), {totals['provider_calls']} provider calls, "
+        f"~{hours}h{remainder // 60:02d}m, ~${totals['projected_cost']:.2f}"
+    )
@@ -0,0 +1,134 @@
+"""Field projection for API entity pages"""
+from typing import Dict, Any, Iterable, Iterator, List, Sequence, Tuple
+
+import ijson
+
+# Identifiers every projection keeps: the pipeline and slug index need them
+BASE_FIELDS = ("id", "slug", "code", "name")
+
+# ijson prefix of one entity within a page ({"data": [entity, ...], "meta": {...}})
+_ENTITY_PREFIX = "data.item"
+
+
+def normalize_fields(fields: Iterable[str]) -> Tuple[str, ...]:
+    """BASE_FIELDS plus the requested dotted paths, de-duplicated and sorted"""
+    return tuple(sorted(set(BASE_FIELDS) | {f for f in fields if f}))
+
+
+def top_level_fields(fields: Sequence[str]) -> List[str]:
+    """First component of each dotted path (what a sparse-fieldset API understands)"""
+    return sorted({f.split(".", 1)[0] for f in fields})
+
+
+def project_entity(entity: Dict[str, Any], fields: Sequence[str]) -> Dict[str, Any]:
+    """
+    Copy of an entity with only the given dotted paths
+
+    "item_type.name" keeps {"item_type": {"name": ...}}; a path that stops at a
+    non-dict value keeps that value whole.
+    """
+    tree = _path_tree(fields)
+    return _project(entity, tree)
+
+
+def parse_page(chunks: Iterable[bytes], fields: Sequence[str]) -> Dict[str, Any]:
+    """
+    Parse a page of JSON incrementally, dropping unused entity subtrees
+
+    Subtrees of an entity that no field path reaches are skipped event by
+    event and never materialized, so large nested stat blocks are never held
+    in memory. Everything outside "data" (meta, links) is kept.
+
+    Args:
+        chunks: Response body as an iterable of byte chunks
+        fields: Dotted paths to keep on each entity
+
+    Returns:
+        The page as a dict
+
+    Raises:
+        ValueError: If the body is not valid JSON
+    """
+    try:
+        return _parse_page(_ChunkReader(iter(chunks)), fields)
+    except ijson.JSONError as e:
+        raise ValueError(f"Invalid JSON page: {e}") from e
+
+
+def _parse_page(stream: "_ChunkReader", fields: Sequence[str]) -> Dict[str, Any]:
+    builder = ijson.ObjectBuilder()
+    paths = [tuple(f.split(".")) for f in fields]
+    skip_depth = 0
+    skip_value = False
+
+    for prefix, event, value in ijson.parse(stream):
+        if skip_value:
+            if event in ("start_map", "start_array"):
+                skip_depth += 1
+            elif event in ("end_map", "end_array"):
+                skip_depth -= 1
+            if skip_depth == 0:
+                skip_value = False
+            continue
+
+        if event == "map_key" and _is_entity_prefix(prefix):
+            relative = prefix[len(_ENTITY_PREFIX) + 1:] if prefix != _ENTITY_PREFIX else ""
+            key_path = tuple(relative.split(".")) + (value,) if relative else (value,)
+            if not _wanted(key_path, paths):
+                skip_value = True
+                continue
+
+        builder.event(event, value)
+
+    return builder.value
+
+
+class _ChunkReader:
+    """Minimal file-like wrapper so ijson can read from an iterator of chunks"""
+
+    def __init__(self, chunks: Iterator[bytes]):
+        self._chunks = chunks
+
+    def read(self, size: int = -1) -> bytes:
+        # ijson probes with read(0) to tell bytes from text streams
+        if size == 0:
+            return b""
+        for chunk in self._chunks:
+            if chunk:
+                return chunk
+        return b""
+
+
+def _is_entity_prefix(prefix: str) -> bool:
+    return prefix == _ENTITY_PREFIX or prefix.startswith(_ENTITY_PREFIX + ".")
+
+
+def _wanted(key_path: Tuple[str, ...], paths: List[Tuple[str, ...]]) -> bool:
+    """Whether a key lies on, or inside, one of the projected paths"""
+    # Array elements inside an entity show up as "item" in ijson prefixes
+    key_path = tuple(part for part in key_path if part != "item")
+    for path in paths:
+        n = min(len(path), len(key_path))
+        if path[:n] == key_path[:n]:
+            return True
+    return False
+
+
+def _path_tree(fields: Sequence[str]) -> Dict[str, Any]:
+    """{"item_type": {"name": {}}, "name": {}}; an empty dict means keep whole"""
+    tree: Dict[str, Any] = {}
+    for field in fields:
+        node = tree
+        for part in field.split("."):
+            node = node.setdefault(part, {})
+    return tree
+
+
+def _project(value: Any, tree: Dict[str, Any]) -> Any:
+    if not tree:
+        return value
+    if isinstance(value, list):
+        return [_project(v, tree) for v in value]
+    if not isinstance(value, dict):
+        return value
+    return {key: _project(value[key], subtree) for key, subtree in tree.items() if key in value}
@@ -1,6 +1,14 @@
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Tuple
 import re
 
+# Template placeholders filled in by build()
+PLACEHOLDERS = ("entity_prefix", "entity", "entityDescription")
+
+_PLACEHOLDER_RE = re.compile(r"\{(" + "|".join(PLACEHOLDERS) + r")\}")
+_WHITESPACE_RE = re.compile(r"\s+")
+# Greedy prefix: matches through the *last* sentence ending in the text
+_LAST_SENTENCE_END_RE = re.compile(r".*[.!?]\s+", re.DOTALL)
+
 
 class PromptBuilder:
     """Builds DALL-E prompts from entity data and configuration using template system"""
@@ -10,6 +18,14 @@ class PromptBuilder:
         self.entity_type = entity_type
         self.template = template
 
+        # Everything that depends only on config is resolved once here
+        self._max_length = config.get("max_length", 1000)
+        self._entity_prefix = config.get("entity_prefix", "")
+        self._include_category = config.get("include_category", False)
+        category_field = config.get("category_field", "")
+        self._category_path = tuple(category_field.split(".")) if category_field else ()
+        self._segments, self._slots = self._compile(template)
+
     def build(self, entity: Dict[str, Any], custom_text: Optional[str] = None) -> str:
         """
         Build a prompt for DALL-E from entity data using template
@@ -21,20 +37,48 @@ class PromptBuilder:
         Returns:
             Formatted prompt string
         """
-        max_length = self.config.get("max_length", 1000)
+        values = self.placeholder_values(entity, custom_text)
+
+        # Build prompt from template
+        if self.template:
+            parts = self._segments.copy()
+            for index, placeholder in self._slots:
+                parts[index] = values[placeholder]
+            prompt = "".join(parts)
+        else:
+            # Fallback to simple concatenation if no template
+            entity_prefix, entity_name, entity_description = values
+            prompt = f"{entity_prefix} {entity_name}. {entity_description}"
+
+        # Truncate if needed
+        if len(prompt) > self._max_length:
+            prompt = self._truncate_at_sentence(prompt, self._max_length)
+
+        return prompt
+
+    def placeholder_values(self, entity: Dict[str, Any], custom_text: Optional[str] = None) -> Tuple[str, str, str]:
+        """
+        The entity-specific text build() substitutes into the template
+
+        Args:
+            entity: Entity data from API
+            custom_text: Optional custom text to override flavor text
 
+        Returns:
+            (entity_prefix, entity name, entity description), in PLACEHOLDERS order
+        """
         # Get entity name
         entity_name = entity.get("name", "")
 
         # Get entity prefix (e.g., "a", "a D&D Evocation spell effect:")
-        entity_prefix = self.config.get("entity_prefix", "")
+        entity_prefix = self._entity_prefix
 
         # Extract category if configured
-        if self.config.get("include_category", False):
+        if self._include_category:
             category = self._extract_category(entity)
             entity_prefix = entity_prefix.replace("{category}", category)
             # Normalize whitespace to prevent double spaces when category is empty
-            entity_prefix = re.sub(r'\s+', ' ', entity_prefix).strip()
+            entity_prefix = _WHITESPACE_RE.sub(' ', entity_prefix).strip()
 
         # Get description text
         if custom_text:
@@ -45,20 +89,49 @@ class PromptBuilder:
         # Filter out bad/confusing descriptions
         entity_description = self._clean_description(entity_description)
 
-        # Build prompt from template
-        if self.template:
-            prompt = self.template.replace("{entity_prefix}", entity_prefix)
-            prompt = prompt.replace("{entity}", entity_name)
-            prompt = prompt.replace("{entityDescription}", entity_description)
-        else:
-            # Fallback to simple concatenation if no template
-            prompt = f"{entity_prefix} {entity_name}. {entity_description}"
+        return entity_prefix, entity_name, entity_description
 
-        # Truncate if needed
-        if len(prompt) > max_length:
-            prompt = self._truncate_at_sentence(prompt, max_length)
+    def build_many(self, entities: Iterable[Dict[str, Any]]) -> Iterator[str]:
+        """
+        Stream prompts for a batch of entities
 
-        return prompt
+        Args:
+            entities: Entity data from API (any iterable, consumed lazily)
+
+        Yields:
+            One prompt per entity, in input order
+        """
+        build = self.build
+        for entity in entities:
+            yield build(entity)
+
+    def required_fields(self) -> List[str]:
+        """Entity fields build() reads, as dotted paths (for API field projection)"""
+        fields = ["name", "description"]
+        if self._include_category and self._category_path:
+            fields.append(".".join(self._category_path))
+        return fields
+
+    @staticmethod
+    def _compile(template: str) -> Tuple[List[str], List[Tuple[int, int]]]:
+        """
+        Split a template into literal segments and placeholder slots
+
+        Returns:
+            (segments, slots): segments is the template as a list of strings
+            with an empty string at each placeholder; slots lists
+            (segment index, index into PLACEHOLDERS) for every placeholder
+        """
+        segments = []
+        slots = []
+        pos = 0
+        for match in _PLACEHOLDER_RE.finditer(template):
+            segments.append(template[pos:match.start()])
+            slots.append((len(segments), PLACEHOLDERS.index(match.group(1))))
+            segments.append("")
+            pos = match.end()
+        segments.append(template[pos:])
+        return segments, slots
 
     def _extract_flavor_text(self, entity: Dict[str, Any]) -> str:
         """Extract descriptive flavor text from entity"""
@@ -108,16 +181,13 @@ class PromptBuilder:
 
     def _extract_category(self, entity: Dict[str, Any]) -> str:
         """Extract category value from nested field path"""
-        category_field = self.config.get("category_field", "")
-
-        if not category_field:
+        if not self._category_path:
             return ""
 
         # Handle nested paths like "item_type.name"
-        parts = category_field.split(".")
         value = entity
 
-        for part in parts:
+        for part in self._category_path:
             if isinstance(value, dict) and part in value:
                 value = value[part]
             else:
@@ -133,12 +203,11 @@ class PromptBuilder:
         # Find the last sentence ending before max_length
         truncated = text[:max_length]
 
-        # Look for sentence endings (., !, ?)
-        sentence_ends = [m.end() for m in re.finditer(r'[.!?]\s+', truncated)]
+        # Look for the last sentence ending (., !, ?)
+        match = _LAST_SENTENCE_END_RE.match(truncated)
 
-        if sentence_ends:
-            last_sentence_end = sentence_ends[-1]
-            return text[:last_sentence_end].strip()
+        if match:
+            return text[:match.end()].strip()
 
         # If no sentence boundary found, just truncate at word boundary
         last_space = truncated.rfind(' ')
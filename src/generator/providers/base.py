@@ -1,6 +1,10 @@
 """Base interface for image generation providers"""
+import hashlib
+import json
 from abc import ABC, abstractmethod
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
+
+from .retry import RetryPolicy
 
 
 class ImageProvider(ABC):
@@ -14,6 +18,8 @@ class ImageProvider(ABC):
             config: Provider-specific configuration
         """
         self.config = config
+        # Set by providers that retry through the shared policy
+        self.retry_policy: Optional[RetryPolicy] = None
 
     @abstractmethod
     def generate(self, prompt: str) -> str:
@@ -40,3 +46,84 @@ class ImageProvider(ABC):
             Provider name (e.g., "dall-e", "stability-ai")
         """
         pass
+
+    def warm_up(self):
+        """
+        Prepare for a batch (e.g. pre-open connections) before the first generate()
+
+        Must not raise: a failed warm-up only costs the latency it tried to save.
+        """
+
+    def close(self):
+        """Release connections and other resources held by the provider"""
+
+    def last_attempts(self) -> List[Dict[str, Any]]:
+        """
+        Attempts made by this thread's most recent generate() call
+
+        Returns:
+            One record per attempt ({outcome, error, wait, gave_up}); empty if
+            the provider does not retry through a RetryPolicy
+        """
+        return self.retry_policy.attempts() if self.retry_policy else []
+
+    def last_provider(self) -> "ImageProvider":
+        """
+        Provider that produced this thread's most recent generate() result
+
+        Returns:
+            self, except for providers that delegate to others (RouterProvider)
+        """
+        return self
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Provider-level counters for the run report
+
+        Returns:
+            Empty by default; may include "extra_requests" (billable requests
+            beyond one per image) and provider-specific sections
+        """
+        return {}
+
+    def generation_params(self) -> Dict[str, Any]:
+        """
+        Parameters that affect the generated image (model, size, ...)
+
+        Credentials and retry settings are excluded: changing them must not
+        mark existing images as out of date.
+
+        Returns:
+            JSON-serializable parameter dict
+        """
+        return {}
+
+    def prompt_hash(self, prompt: str) -> str:
+        """
+        Fingerprint of everything that determines the image for a prompt
+
+        Args:
+            prompt: Final prompt text
+
+        Returns:
+            Hex SHA-256 of the prompt, provider name and generation_params()
+        """
+        payload = json.dumps(
+            {"prompt": prompt, "provider": self.get_provider_name(), "params": self.generation_params()},
+            sort_keys=True,
+            separators=(",", ":")
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def prompt_hash_for(self, provider_name: Optional[str], prompt: str) -> str:
+        """
+        prompt_hash() as computed by the provider that produced an existing image
+
+        Args:
+            provider_name: Producing provider recorded in the manifest (None if unknown)
+            prompt: Final prompt text
+
+        Returns:
+            prompt_hash(prompt), except for providers that delegate to others (RouterProvider)
+        """
+        return self.prompt_hash(prompt)
@@ -1,10 +1,11 @@
 """DALL-E image generation provider"""
-import time
 import logging
 from typing import Dict, Any
 from openai import OpenAI
 
 from .base import ImageProvider
+from .key_pool import KeyPool, configured_keys
+from .retry import RetryPolicy
 
 logger = logging.getLogger(__name__)
 
@@ -15,15 +16,23 @@ class DalleProvider(ImageProvider):
     def __init__(self, config: Dict[str, Any]):
         super().__init__(config)
 
-        self.client = OpenAI(api_key=config["api_key"])
+        # One client per API key (api_keys spreads requests over per-key quotas).
+        # Retries happen in the shared policy, not (additionally) inside the clients
+        self.key_pool = KeyPool(configured_keys(config), config, "DALL-E")
+        self.clients = {key.value: OpenAI(api_key=key.value, max_retries=0) for key in self.key_pool.keys}
+        self.client = self.clients[self.key_pool.keys[0].value]
         self.model = config.get("model", "dall-e-3")
         self.size = config.get("size", "1024x1024")
         self.quality = config.get("quality", "standard")
         self.style = config.get("style", "vivid")
+        # "b64_json": image bytes come back in the response (no second download,
+        # nothing to expire); "url": a temporary URL to download
+        self.response_format = config.get("response_format", "url")
+        if self.response_format not in ("url", "b64_json"):
+            raise ValueError(f"Unsupported DALL-E response_format: {self.response_format}")
 
-        # Retry configuration
-        self.max_retries = config.get("max_retries", 3)
-        self.retry_delay = config.get("retry_delay", 5)
+        # Retry configuration (max_retries, retry_delay, retry_budget, ...)
+        self.retry_policy = RetryPolicy.from_config(config, "DALL-E")
 
     def generate(self, prompt: str) -> str:
         """
@@ -33,31 +42,36 @@ class DalleProvider(ImageProvider):
             prompt: Text description for image generation
 
         Returns:
-            URL of generated image
+            URL of generated image, or a base64 data URL with response_format b64_json
 
         Raises:
             Exception: If generation fails after all retries
         """
-        for attempt in range(self.max_retries + 1):
-            try:
-                response = self.client.images.generate(
-                    model=self.model,
-                    prompt=prompt,
-                    size=self.size,
-                    quality=self.quality,
-                    style=self.style,
-                    n=1
-                )
+        return self.retry_policy.call(self.key_pool.call, lambda api_key: self._generate_once(prompt, api_key))
 
-                return response.data[0].url
+    def _generate_once(self, prompt: str, api_key: str) -> str:
+        response = self.clients[api_key].images.generate(
+            model=self.model,
+            prompt=prompt,
+            size=self.size,
+            quality=self.quality,
+            style=self.style,
+            response_format=self.response_format,
+            n=1
+        )
 
-            except Exception as e:
-                if attempt < self.max_retries:
-                    logger.warning(f"DALL-E generation attempt {attempt + 1} failed: {e}")
-                    time.sleep(self.retry_delay * (2 ** attempt))  # Exponential backoff
-                else:
-                    logger.error(f"DALL-E generation failed after {self.max_retries} retries: {e}")
-                    raise
+        if self.response_format == "b64_json":
+            return f"data:image/png;base64,{response.data[0].b64_json}"
+        return response.data[0].url
+
+    def generation_params(self) -> Dict[str, Any]:
+        """Model and rendering parameters sent with every request"""
+        return {
+            "model": self.model,
+            "size": self.size,
+            "quality": self.quality,
+            "style": self.style,
+        }
 
     def get_provider_name(self) -> str:
         """Get provider name"""
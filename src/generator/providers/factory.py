@@ -1,17 +1,26 @@
 """Factory for creating image generation providers"""
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
 from .base import ImageProvider
 from .dalle_provider import DalleProvider
+from .hedged_provider import HedgedProvider
+from .mock_provider import MockProvider
+from .router_provider import RouterProvider
 from .stability_provider import StabilityProvider
 
 
-def create_provider(provider_type: str, config: Dict[str, Any]) -> ImageProvider:
+def create_provider(
+    provider_type: str,
+    config: Dict[str, Any],
+    provider_configs: Optional[Dict[str, Dict[str, Any]]] = None
+) -> ImageProvider:
     """
     Create an image generation provider
 
     Args:
-        provider_type: Type of provider ("dall-e" or "stability-ai")
+        provider_type: Type of provider ("dall-e", "stability-ai", "mock" or "router")
         config: Provider-specific configuration
+        provider_configs: All provider config blocks (the `image_generation`
+            section); the router builds its members from them
 
     Returns:
         ImageProvider instance
@@ -19,18 +28,49 @@ def create_provider(provider_type: str, config: Dict[str, Any]) -> ImageProvider
     Raises:
         ValueError: If provider_type is not supported
     """
+    if provider_type == "router":
+        return RouterProvider(config, provider_configs or {})
+
     providers = {
         "dall-e": DalleProvider,
         "stability-ai": StabilityProvider,
+        "mock": MockProvider,
     }
 
     provider_class = providers.get(provider_type)
 
     if not provider_class:
-        available = ", ".join(providers.keys())
+        available = ", ".join(list(providers.keys()) + ["router"])
         raise ValueError(
             f"Unknown provider type: {provider_type}. "
             f"Available providers: {available}"
         )
 
-    return provider_class(config)
+    provider = provider_class(config)
+
+    # Opt-in request hedging (see HedgedProvider)
+    hedging = config.get("hedging") or {}
+    if hedging.get("enabled"):
+        provider = HedgedProvider(provider, hedging, config.get("pool_size", 1))
+
+    return provider
+
+
+def output_provider_names(provider_type: str, provider_configs: Dict[str, Dict[str, Any]]) -> List[str]:
+    """
+    Provider directories a configured provider saves images under
+
+    Needs no provider instance, so runs and offline plans agree on what is
+    already generated. Provider types double as provider names.
+
+    Args:
+        provider_type: Configured provider type (`image_generation.provider`)
+        provider_configs: The `image_generation` section, for router members
+
+    Returns:
+        [provider_type], or every member's type for a router
+    """
+    if provider_type == "router":
+        entries = (provider_configs.get("router") or {}).get("providers") or []
+        return list(dict.fromkeys(entry["provider"] for entry in entries))
+    return [provider_type]
@@ -0,0 +1,223 @@
+"""Hedged requests: a second identical request when the first is slower than usual"""
+import threading
+import time
+import logging
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Dict, Any, List, Optional
+
+from ..metrics import percentile
+from .base import ImageProvider
+
+logger = logging.getLogger(__name__)
+
+
+class _Call:
+    """One launched request of a generate() call"""
+
+    def __init__(self, hedge: bool, started: float):
+        self.hedge = hedge
+        self.started = started
+        self.finished: Optional[float] = None
+        self.attempts: List[Dict[str, Any]] = []
+        self.provider: Optional[ImageProvider] = None
+        self.future: Optional[Future] = None
+
+
+class HedgedProvider(ImageProvider):
+    """
+    Wraps a provider and hedges its slow requests
+
+    Each generate() runs the wrapped provider's generate() on a worker
+    thread. If it has not finished after the `percentile` latency of recent
+    successful calls (at least `min_delay`), an identical second request is
+    started and the first result wins. The loser is cancelled if it has not
+    started yet and otherwise discarded when it completes. Hedges are capped
+    at `max_ratio` of requests, which bounds the extra spend.
+
+    Latency samples come from the last `window` successful calls; until
+    `min_samples` exist, `initial_delay` is used (no hedging if unset).
+    """
+
+    def __init__(self, provider: ImageProvider, config: Dict[str, Any], pool_size: int = 1):
+        """
+        Args:
+            provider: Provider to hedge
+            config: The provider's `hedging` config block (percentile,
+                min_delay, initial_delay, max_ratio, window, min_samples)
+            pool_size: Concurrent generate() calls expected (the CLI's workers)
+        """
+        super().__init__(config)
+        self.provider = provider
+        self.percentile = config.get("percentile", 95)
+        self.min_delay = config.get("min_delay", 5.0)
+        self.initial_delay = config.get("initial_delay")
+        self.max_ratio = config.get("max_ratio", 0.05)
+        self.min_samples = config.get("min_samples", 20)
+        self._latencies: deque = deque(maxlen=config.get("window", 200))
+
+        self._requests = 0
+        self._hedges = 0
+        self._hedge_wins = 0
+        self._saved_seconds = 0.0
+        self._lock = threading.Lock()
+
+        # Room for every caller's request and its hedge
+        self._executor = ThreadPoolExecutor(max_workers=2 * max(1, pool_size), thread_name_prefix="hedge")
+        self._local = threading.local()
+        self._clock = time.monotonic
+
+    def generate(self, prompt: str) -> str:
+        """
+        Generate an image, hedging if the request is slow
+
+        Args:
+            prompt: Text description of the image to generate
+
+        Returns:
+            The first successful result
+
+        Raises:
+            Exception: The wrapped provider's error if every launched request failed
+        """
+        self._local.attempts = []
+        self._local.provider = None
+        with self._lock:
+            self._requests += 1
+        delay = self.hedge_delay()
+
+        primary = self._launch(prompt, hedge=False)
+        calls = [primary]
+        try:
+            primary.future.result(timeout=delay)
+        except Exception:
+            # Timed out (hedge below) or failed (raised below)
+            pass
+
+        if not primary.future.done() and self._allow_hedge():
+            logger.info(f"Hedging {self.provider.get_provider_name()} request still running after {delay:.1f}s")
+            calls.append(self._launch(prompt, hedge=True))
+
+        pending = {call.future for call in calls}
+        last_error: Optional[BaseException] = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                call = next(c for c in calls if c.future is future)
+                error = future.exception()
+                if error is not None:
+                    last_error = error
+                    continue
+
+                for other in calls:
+                    if other is not call and other.future.cancel() and other.hedge:
+                        with self._lock:
+                            self._hedges -= 1  # never started, never billed
+                self._finish(call, calls)
+                return future.result()
+
+        self._local.attempts = [a for call in calls for a in call.attempts]
+        raise last_error
+
+    def _launch(self, prompt: str, hedge: bool) -> _Call:
+        call = _Call(hedge, self._clock())
+        call.future = self._executor.submit(self._run, prompt, call)
+        call.future.add_done_callback(lambda future: self._completed(call, future))
+        return call
+
+    def _run(self, prompt: str, call: _Call) -> str:
+        """Runs on a worker thread: the wrapped provider's attempts are thread-local there"""
+        try:
+            return self.provider.generate(prompt)
+        finally:
+            call.finished = self._clock()
+            call.attempts = self.provider.last_attempts()
+            call.provider = self.provider.last_provider()
+
+    def _completed(self, call: _Call, future: Future):
+        """Record the latency of every successful request, winners and losers alike"""
+        if future.cancelled() or future.exception() is not None:
+            return
+        with self._lock:
+            self._latencies.append(call.finished - call.started)
+
+    def _finish(self, winner: _Call, calls: List[_Call]):
+        """Expose the winner's attempts and provider, and count hedge outcomes"""
+        self._local.attempts = [dict(a, hedge=True) if winner.hedge else a for a in winner.attempts]
+        self._local.provider = winner.provider
+        if not winner.hedge:
+            return
+
+        with self._lock:
+            self._hedge_wins += 1
+        primary = calls[0]
+
+        def saved(future: Future):
+            # Measurable once the discarded primary finishes successfully
+            if not future.cancelled() and future.exception() is None:
+                with self._lock:
+                    self._saved_seconds += primary.finished - winner.finished
+
+        primary.future.add_done_callback(saved)
+
+    def _allow_hedge(self) -> bool:
+        """Spend cap: hedges stay within max_ratio of requests"""
+        with self._lock:
+            if self._hedges + 1 > self.max_ratio * self._requests:
+                return False
+            self._hedges += 1
+            return True
+
+    def hedge_delay(self) -> Optional[float]:
+        """Seconds before a hedge is sent (None: not enough samples and no initial_delay)"""
+        with self._lock:
+            return self._hedge_delay()
+
+    def _hedge_delay(self) -> Optional[float]:
+        # Caller holds the lock
+        if len(self._latencies) < self.min_samples:
+            return self.initial_delay
+        return max(self.min_delay, percentile(sorted(self._latencies), self.percentile))
+
+    def stats(self) -> Dict[str, Any]:
+        """Hedge counts, rate, wins and seconds saved; hedges are the extra billable requests"""
+        with self._lock:
+            return {
+                "extra_requests": self._hedges,
+                "hedging": {
+                    "requests": self._requests,
+                    "hedged": self._hedges,
+                    "hedge_rate": round(self._hedges / self._requests, 4) if self._requests else 0.0,
+                    "hedge_wins": self._hedge_wins,
+                    "saved_seconds": round(self._saved_seconds, 2),
+                    "delay_seconds": self._hedge_delay(),
+                },
+            }
+
+    def last_attempts(self) -> List[Dict[str, Any]]:
+        """Attempts of the request whose result was used (hedge attempts are marked)"""
+        return list(getattr(self._local, "attempts", []))
+
+    def last_provider(self) -> ImageProvider:
+        """Provider that produced this thread's last image"""
+        return getattr(self._local, "provider", None) or self.provider.last_provider()
+
+    def warm_up(self):
+        self.provider.warm_up()
+
+    def close(self):
+        """Close the wrapped provider; discarded requests are not waited for"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self.provider.close()
+
+    def generation_params(self) -> Dict[str, Any]:
+        return self.provider.generation_params()
+
+    def prompt_hash(self, prompt: str) -> str:
+        return self.provider.prompt_hash(prompt)
+
+    def prompt_hash_for(self, provider_name: Optional[str], prompt: str) -> str:
+        return self.provider.prompt_hash_for(provider_name, prompt)
+
+    def get_provider_name(self) -> str:
+        return self.provider.get_provider_name()
@@ -0,0 +1,198 @@
+"""API key pool: spreads provider requests over several keys, each with its own quota"""
+import threading
+import time
+import logging
+from collections import deque
+from typing import Dict, Any, Callable, List, Optional, Set, TypeVar
+
+from .retry import THROTTLED, classify, status_code
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Statuses meaning the key itself is unusable (revoked, unpaid, forbidden)
+KEY_REJECTED_STATUSES = {401, 402, 403}
+
+
+class _Key:
+    """One API key and its scheduling state (guarded by the pool's condition)"""
+
+    def __init__(self, index: int, value: str):
+        self.index = index
+        self.value = value
+        self.label = f"key {index + 1} (...{value[-4:]})"
+        self.in_flight = 0
+        self.benched_until = 0.0
+        self.disabled = False
+        self.last_used = 0.0
+        self.sent: deque = deque()  # request start times within the last minute
+        self.requests = 0
+        self.throttled = 0
+
+
+def configured_keys(config: Dict[str, Any]) -> List[str]:
+    """
+    API keys from a provider config block
+
+    `api_keys` (a list) takes precedence over `api_key`. List entries whose
+    environment variable was not set (still "${VAR}") are dropped.
+
+    Raises:
+        ValueError: If no key is configured
+    """
+    keys = config.get("api_keys")
+    if keys is None:
+        return [config["api_key"]]
+
+    usable = [key for key in keys if key and not str(key).startswith("${")]
+    if len(usable) < len(keys):
+        logger.warning(f"Ignoring {len(keys) - len(usable)} API key(s) whose environment variable is not set")
+    if not usable:
+        raise ValueError("No usable API keys in 'api_keys'")
+    return usable
+
+
+class KeyPool:
+    """
+    Schedules requests over several API keys
+
+    Each request takes the least busy key that is within its concurrency
+    (`key_concurrency`) and request rate (`key_requests_per_minute`) limits,
+    waiting while none is. A key answered with 429 is benched for Retry-After
+    (or `key_bench_seconds`) and the request moves on to another key; a key
+    rejected with 401/402/403 is disabled for the rest of the run. With one
+    key this only adds the bookkeeping.
+    """
+
+    def __init__(self, keys: List[str], config: Optional[Dict[str, Any]] = None, name: str = "provider"):
+        """
+        Args:
+            keys: API keys
+            config: Provider config block (key_concurrency,
+                key_requests_per_minute, key_bench_seconds)
+            name: Label for log messages
+        """
+        config = config or {}
+        self.keys = [_Key(i, value) for i, value in enumerate(keys)]
+        self.concurrency = config.get("key_concurrency")
+        self.requests_per_minute = config.get("key_requests_per_minute")
+        self.bench_seconds = config.get("key_bench_seconds", 60)
+        self.name = name
+
+        self._cond = threading.Condition()
+        self._clock = time.monotonic
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def call(self, fn: Callable[[str], T]) -> T:
+        """
+        Call fn with a key, moving on to other keys when one is throttled or rejected
+
+        Args:
+            fn: Makes one request with the given key
+
+        Returns:
+            fn's result
+
+        Raises:
+            The error from fn if it is not key-specific, or the last
+            key-specific error once every key has been tried
+        """
+        tried: Set[int] = set()
+        last_error: Optional[Exception] = None
+
+        while True:
+            key = self._acquire(tried)
+            if key is None:
+                if last_error is None:
+                    raise RuntimeError(f"{self.name}: every API key has been rejected")
+                raise last_error
+
+            try:
+                result = fn(key.value)
+            except Exception as e:
+                if not self._key_specific(key, e):
+                    raise
+                tried.add(key.index)
+                last_error = e
+                continue
+            finally:
+                self._release(key)
+
+            return result
+
+    def _acquire(self, tried: Set[int]) -> Optional[_Key]:
+        """
+        Reserve the least busy usable key not yet tried, waiting while all are busy, benched or rate limited
+
+        Returns:
+            The key, or None if every key was tried or is disabled
+        """
+        with self._cond:
+            while True:
+                candidates = [k for k in self.keys if k.index not in tried and not k.disabled]
+                if not candidates:
+                    return None
+
+                now = self._clock()
+                ready = []
+                wake_at = []
+                for key in candidates:
+                    while key.sent and now - key.sent[0] >= 60:
+                        key.sent.popleft()
+                    if key.benched_until > now:
+                        wake_at.append(key.benched_until)
+                    elif self.requests_per_minute and len(key.sent) >= self.requests_per_minute:
+                        wake_at.append(key.sent[0] + 60)
+                    elif self.concurrency is None or key.in_flight < self.concurrency:
+                        ready.append(key)
+
+                if ready:
+                    key = min(ready, key=lambda k: (k.in_flight, k.last_used))
+                    key.in_flight += 1
+                    key.last_used = now
+                    key.sent.append(now)
+                    key.requests += 1
+                    return key
+
+                # Wake up on a release, or when a bench or rate window ends
+                self._cond.wait(timeout=max(0.0, min(wake_at) - now) if wake_at else None)
+
+    def _release(self, key: _Key):
+        with self._cond:
+            key.in_flight -= 1
+            self._cond.notify_all()
+
+    def _key_specific(self, key: _Key, error: Exception) -> bool:
+        """Bench or disable a key after an error caused by it; False for other errors"""
+        error_class, server_delay = classify(error)
+        with self._cond:
+            if error_class == THROTTLED:
+                pause = server_delay if server_delay is not None else self.bench_seconds
+                key.benched_until = max(key.benched_until, self._clock() + pause)
+                key.throttled += 1
+                if len(self.keys) > 1:
+                    logger.warning(f"{self.name} {key.label} throttled, benched for {pause:.0f}s")
+                return True
+            if status_code(error) in KEY_REJECTED_STATUSES and len(self.keys) > 1:
+                key.disabled = True
+                logger.error(f"{self.name} {key.label} rejected ({error}), disabled for this run")
+                return True
+        return False
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """Per-key counters (label, requests, throttled, benched, disabled)"""
+        with self._cond:
+            now = self._clock()
+            return [
+                {
+                    "key": k.label,
+                    "requests": k.requests,
+                    "throttled": k.throttled,
+                    "benched": k.benched_until > now,
+                    "disabled": k.disabled,
+                }
+                for k in self.keys
+            ]
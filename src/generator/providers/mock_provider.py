@@ -0,0 +1,159 @@
+"""Mock image provider for benchmarks and offline pipeline runs"""
+import base64
+import hashlib
+import io
+import math
+import random
+import threading
+import time
+import logging
+from typing import Dict, Any, List
+
+import requests
+from PIL import Image
+
+from .base import ImageProvider
+from .key_pool import KeyPool
+from .retry import RetryPolicy
+
+logger = logging.getLogger(__name__)
+
+
+class MockProvider(ImageProvider):
+    """
+    Returns synthetic PNGs after a simulated API delay, without network calls
+
+    Latency follows a configurable distribution, and a configurable fraction
+    of calls fail or are rate limited (HTTP 429 with Retry-After), so retry
+    and throughput behaviour can be measured without spending money. Failures
+    are retried through the same RetryPolicy as the real providers.
+    """
+
+    def __init__(self, config: Dict[str, Any]):
+        super().__init__(config)
+
+        self.width = config.get("width", 1024)
+        self.height = config.get("height", 1024)
+
+        # Simulated latency in seconds: "fixed" (mean), "uniform" (min..max),
+        # "normal" (mean, stddev) or "lognormal" (mean, sigma)
+        latency = config.get("latency", {})
+        self.latency_distribution = latency.get("distribution", "fixed")
+        self.latency_mean = latency.get("mean", 0.0)
+        self.latency_min = latency.get("min", 0.0)
+        self.latency_max = latency.get("max", self.latency_mean)
+        self.latency_stddev = latency.get("stddev", 0.0)
+        self.latency_sigma = latency.get("sigma", 0.5)
+
+        self.failure_rate = config.get("failure_rate", 0.0)
+        self.rate_limit_rate = config.get("rate_limit_rate", 0.0)
+        self.retry_after = config.get("retry_after", 1)
+
+        # Simulated per-key quota: concurrent requests a key may have before
+        # further ones get 429 (None: unlimited); api_keys are labels only
+        self.key_quota = config.get("key_quota")
+        self.key_pool = KeyPool(config.get("api_keys") or ["mock"], config, "Mock")
+        self._key_in_flight: Dict[str, int] = {}
+        self._key_lock = threading.Lock()
+
+        # Retry configuration (max_retries, retry_delay, retry_budget, ...)
+        self.retry_policy = RetryPolicy.from_config(config, "Mock")
+
+        # A few distinct images, rendered on first use and then reused by
+        # prompt hash so PNG encoding barely shows up as provider time
+        self.variants = max(1, config.get("variants", 8))
+        self._images: List[str] = []
+        self._images_lock = threading.Lock()
+
+        self._rng = random.Random(config.get("seed"))
+        self._rng_lock = threading.Lock()
+
+    def generate(self, prompt: str) -> str:
+        """
+        Simulate generating an image
+
+        Args:
+            prompt: Text description (selects which synthetic image is returned)
+
+        Returns:
+            Data URL of a synthetic PNG of the configured size
+
+        Raises:
+            Exception: If the simulated call still fails after all retries
+        """
+        return self.retry_policy.call(self.key_pool.call, lambda api_key: self._generate_once(prompt, api_key))
+
+    def generation_params(self) -> Dict[str, Any]:
+        """Image size (the only parameter that changes the output)"""
+        return {"width": self.width, "height": self.height}
+
+    def get_provider_name(self) -> str:
+        """Get provider name"""
+        return "mock"
+
+    def _generate_once(self, prompt: str, api_key: str) -> str:
+        with self._key_lock:
+            in_flight = self._key_in_flight.get(api_key, 0)
+            if self.key_quota is not None and in_flight >= self.key_quota:
+                raise self._rate_limited()
+            self._key_in_flight[api_key] = in_flight + 1
+
+        try:
+            with self._rng_lock:
+                delay = self._sample_latency()
+                roll = self._rng.random()
+
+            time.sleep(delay)
+        finally:
+            with self._key_lock:
+                self._key_in_flight[api_key] -= 1
+
+        if roll < self.rate_limit_rate:
+            raise self._rate_limited()
+        if roll < self.rate_limit_rate + self.failure_rate:
+            raise RuntimeError("Simulated provider failure (mock)")
+
+        index = int(hashlib.sha1(prompt.encode("utf-8")).hexdigest(), 16) % self.variants
+        return self._image(index)
+
+    def _rate_limited(self) -> requests.HTTPError:
+        """Simulated 429 with Retry-After"""
+        response = requests.Response()
+        response.status_code = 429
+        response.headers["Retry-After"] = str(self.retry_after)
+        response.reason = "Too Many Requests"
+        return requests.HTTPError("429 Client Error: Too Many Requests (mock)", response=response)
+
+    def _sample_latency(self) -> float:
+        if self.latency_distribution == "uniform":
+            return self._rng.uniform(self.latency_min, self.latency_max)
+        if self.latency_distribution == "normal":
+            return max(0.0, self._rng.gauss(self.latency_mean, self.latency_stddev))
+        if self.latency_distribution == "lognormal":
+            if self.latency_mean <= 0:
+                return 0.0
+            # Parameterised so the median is latency.mean
+            return self._rng.lognormvariate(math.log(self.latency_mean), self.latency_sigma)
+        return self.latency_mean
+
+    def _image(self, index: int) -> str:
+        with self._images_lock:
+            while len(self._images) <= index:
+                self._images.append(self._render(len(self._images)))
+            return self._images[index]
+
+    def _render(self, index: int) -> str:
+        """Noisy gradient PNG: compresses and converts like a real illustration"""
+        rng = random.Random(index)
+        base = Image.linear_gradient("L").resize((self.width, self.height))
+        noise = Image.effect_noise((self.width, self.height), 40 + rng.randint(0, 40))
+        img = Image.merge("RGB", (
+            Image.blend(base, noise, 0.5),
+            Image.blend(base.rotate(90), noise, 0.3),
+            Image.new("L", (self.width, self.height), rng.randint(40, 255)),
+        ))
+
+        output = io.BytesIO()
+        img.save(output, format="PNG", compress_level=1)
+        return f"data:image/png;base64,{base64.b64encode(output.getvalue()).decode('ascii')}"
+
@@ -0,0 +1,205 @@
+"""Retry policy shared by image providers: error classification, jittered backoff and a time budget"""
+import random
+import threading
+import time
+import logging
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple, TypeVar
+
+import openai
+import requests
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Error classes
+RETRYABLE = "retryable"   # transient: timeouts, connection errors, 5xx, unknown errors
+THROTTLED = "throttled"   # 429: wait as long as the server asks (Retry-After)
+PERMANENT = "permanent"   # the same request will fail again: 400 (incl. content policy), 401, 403, 404, 422
+
+# 4xx statuses that are worth retrying
+RETRYABLE_CLIENT_STATUSES = {408, 409, 425}
+
+# Network-level failures of requests (Stability) and the OpenAI client (DALL-E)
+_TRANSIENT_ERRORS = (
+    requests.Timeout,
+    requests.ConnectionError,
+    openai.APIConnectionError,
+    TimeoutError,
+    ConnectionError,
+)
+
+
+def status_code(error: BaseException) -> Optional[int]:
+    """HTTP status of a requests or OpenAI error, if it carries one"""
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    return status if isinstance(status, int) else None
+
+
+def retry_after(error: BaseException) -> Optional[float]:
+    """Seconds from the error response's Retry-After header (delta-seconds or HTTP date)"""
+    headers = getattr(getattr(error, "response", None), "headers", None)
+    value = headers.get("Retry-After") if headers is not None else None
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+def classify(error: BaseException) -> Tuple[str, Optional[float]]:
+    """
+    Classify a provider error
+
+    Args:
+        error: Exception raised by a provider call
+
+    Returns:
+        (error class, server-requested delay in seconds or None)
+    """
+    if isinstance(error, _TRANSIENT_ERRORS):
+        return RETRYABLE, None
+
+    status = status_code(error)
+    if status == 429:
+        return THROTTLED, retry_after(error)
+    if status is not None and 400 <= status < 500 and status not in RETRYABLE_CLIENT_STATUSES:
+        return PERMANENT, None
+
+    # 5xx, empty responses and anything unrecognised: retry as before
+    return RETRYABLE, None
+
+
+class RetryPolicy:
+    """
+    Runs a provider call with classified retries
+
+    Permanent errors fail at once. Retryable errors back off exponentially
+    with equal jitter; throttled errors wait for Retry-After when the server
+    sends one. A per-call time budget caps the total time spent waiting on
+    one image, so hopeless entities are abandoned quickly.
+
+    The attempts of the most recent call on the current thread are kept for
+    the manifest (see attempts()).
+    """
+
+    def __init__(
+        self,
+        max_retries: int = 3,
+        retry_delay: float = 5.0,
+        max_delay: float = 60.0,
+        budget: float = 300.0,
+        jitter: bool = True,
+        name: str = "provider",
+        sleep: Callable[[float], None] = time.sleep,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Args:
+            max_retries: Retries after the first attempt
+            retry_delay: Base delay; attempt n waits retry_delay * 2^n
+            max_delay: Cap on any single wait (including Retry-After)
+            budget: Seconds one call may take in total, attempts included;
+                no retry is started if its wait would exceed it
+            jitter: Randomize backoff (between half and all of the delay)
+            name: Label for log messages
+            sleep: Sleep function (injectable for tests)
+            clock: Monotonic clock (injectable for tests)
+        """
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.max_delay = max_delay
+        self.budget = budget
+        self.jitter = jitter
+        self.name = name
+        self._sleep = sleep
+        self._clock = clock
+        self._local = threading.local()
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any], name: str) -> "RetryPolicy":
+        """Policy from a provider config block (max_retries, retry_delay, max_retry_delay, retry_budget, retry_jitter)"""
+        return cls(
+            max_retries=config.get("max_retries", 3),
+            retry_delay=config.get("retry_delay", 5),
+            max_delay=config.get("max_retry_delay", 60),
+            budget=config.get("retry_budget", 300),
+            jitter=config.get("retry_jitter", True),
+            name=name
+        )
+
+    def call(self, fn: Callable[..., T], *args, **kwargs) -> T:
+        """
+        Call fn, retrying according to the policy
+
+        Returns:
+            fn's result
+
+        Raises:
+            The last error from fn once it is permanent, retries are
+            exhausted or the time budget would be exceeded
+        """
+        attempts: List[Dict[str, Any]] = []
+        self._local.attempts = attempts
+        start = self._clock()
+
+        for attempt in range(self.max_retries + 1):
+            try:
+                result = fn(*args, **kwargs)
+                attempts.append({"outcome": "ok"})
+                return result
+            except Exception as e:
+                error_class, server_delay = classify(e)
+                record = {"outcome": error_class, "error": str(e)[:300]}
+                attempts.append(record)
+
+                if error_class == PERMANENT:
+                    logger.error(f"{self.name} generation failed permanently: {e}")
+                    raise
+                if attempt >= self.max_retries:
+                    record["gave_up"] = "retries"
+                    logger.error(f"{self.name} generation failed after {self.max_retries} retries: {e}")
+                    raise
+
+                delay = self.delay(attempt, server_delay)
+                elapsed = self._clock() - start
+                if elapsed + delay > self.budget:
+                    record["gave_up"] = "budget"
+                    logger.error(
+                        f"{self.name} generation abandoned: retry in {delay:.1f}s would exceed the "
+                        f"{self.budget:g}s budget ({elapsed:.1f}s used): {e}"
+                    )
+                    raise
+
+                record["wait"] = round(delay, 2)
+                logger.warning(
+                    f"{self.name} generation attempt {attempt + 1} failed ({error_class}): {e}; "
+                    f"retrying in {delay:.1f}s"
+                )
+                self._sleep(delay)
+
+    def delay(self, attempt: int, server_delay: Optional[float] = None) -> float:
+        """Wait before retry number attempt + 1: Retry-After if given, else jittered exponential"""
+        if server_delay is not None:
+            return min(self.max_delay, server_delay)
+        delay = min(self.max_delay, self.retry_delay * (2 ** attempt))
+        if self.jitter:
+            # Equal jitter: at least half the delay, so backoff still grows
+            delay = delay / 2 + random.uniform(0, delay / 2)
+        return delay
+
+    def attempts(self) -> List[Dict[str, Any]]:
+        """Attempt records ({outcome, error, wait, gave_up}) of this thread's last call"""
+        return list(getattr(self._local, "attempts", []))
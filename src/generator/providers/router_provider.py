@@ -0,0 +1,258 @@
+"""Router provider: spreads images over several providers with weights, concurrency limits and failover"""
+import threading
+import time
+import logging
+from typing import Dict, Any, List, Optional, Set
+
+from .base import ImageProvider
+from .retry import PERMANENT, THROTTLED, RetryPolicy, classify
+
+logger = logging.getLogger(__name__)
+
+
+class _Member:
+    """One routed provider and its scheduling state (guarded by the router's condition)"""
+
+    def __init__(self, index: int, provider_type: str, provider: ImageProvider, weight: float, concurrency: int):
+        self.index = index
+        self.provider_type = provider_type
+        self.provider = provider
+        self.weight = weight
+        self.concurrency = concurrency
+        self.in_flight = 0
+        self.current = 0.0          # smooth weighted round-robin counter
+        self.failures = 0           # consecutive retryable failures
+        self.cooldown_until = 0.0   # monotonic time before which the member is avoided
+
+
+class RouterProvider(ImageProvider):
+    """
+    Routes each image to one of several configured providers
+
+    Members are chosen by smooth weighted round-robin among those with a free
+    concurrency slot, so once the preferred provider's slots are busy work
+    spills to the next one and throughput adds up across quotas. A member
+    that is throttled (429) is avoided for its Retry-After (or `cooldown`);
+    one that fails `failure_threshold` times in a row is avoided for
+    `cooldown` seconds. A failed image is tried on the remaining members
+    before the router's own RetryPolicy backs off and starts another pass.
+
+    Members retry in place only `max_retries` times (default 0): failing
+    over is usually faster than waiting for the same provider.
+    """
+
+    def __init__(self, config: Dict[str, Any], provider_configs: Dict[str, Dict[str, Any]]):
+        """
+        Args:
+            config: The `image_generation.router` config block
+            provider_configs: The `image_generation` block, for member configs
+
+        Raises:
+            ValueError: If no members are configured or a member is a router
+        """
+        super().__init__(config)
+        from .factory import create_provider
+
+        entries = config.get("providers") or []
+        if not entries:
+            raise ValueError("Router provider needs at least one entry in 'providers'")
+
+        self.members: List[_Member] = []
+        for index, entry in enumerate(entries):
+            provider_type = entry["provider"]
+            if provider_type == "router":
+                raise ValueError("Router provider cannot route to another router")
+
+            concurrency = max(1, entry.get("concurrency", 1))
+            member_config = dict(provider_configs.get(provider_type) or {}, **entry.get("options", {}))
+            member_config["pool_size"] = concurrency
+            member_config["max_retries"] = entry.get("max_retries", 0)
+
+            self.members.append(_Member(
+                index,
+                provider_type,
+                create_provider(provider_type, member_config),
+                float(entry.get("weight", 1)),
+                concurrency
+            ))
+
+        self.cooldown = config.get("cooldown", 30)
+        self.failure_threshold = max(1, config.get("failure_threshold", 3))
+
+        # Retries of whole passes over the members (max_retries, retry_delay, retry_budget, ...)
+        self.retry_policy = RetryPolicy.from_config(config, "Router")
+
+        self._cond = threading.Condition()
+        self._local = threading.local()
+        self._clock = time.monotonic
+
+    def generate(self, prompt: str) -> str:
+        """
+        Generate an image on the first member that succeeds
+
+        Args:
+            prompt: Text description of the image to generate
+
+        Returns:
+            URL (or data URL) from the producing member; see last_provider()
+
+        Raises:
+            Exception: The last member error once every pass has failed
+        """
+        self._local.attempts = []
+        self._local.provider = None
+        try:
+            return self.retry_policy.call(self._route_once, prompt)
+        finally:
+            passes = self.retry_policy.attempts()
+            if passes and passes[-1].get("gave_up") and self._local.attempts:
+                self._local.attempts[-1]["gave_up"] = passes[-1]["gave_up"]
+
+    def _route_once(self, prompt: str) -> str:
+        """One pass: try members (healthy ones first) until one succeeds"""
+        tried: Set[int] = set()
+        last_error: Optional[Exception] = None
+
+        while True:
+            member = self._acquire(tried)
+            if member is None:
+                raise last_error
+            tried.add(member.index)
+            name = member.provider.get_provider_name()
+
+            try:
+                image_url = member.provider.generate(prompt)
+            except Exception as e:
+                self._record(member, e)
+                last_error = e
+                logger.warning(f"Router: {name} failed ({e}), trying next provider")
+                continue
+            finally:
+                self._local.attempts.extend(
+                    dict(attempt, provider=name) for attempt in member.provider.last_attempts()
+                )
+                self._release(member)
+
+            self._record(member, None)
+            self._local.provider = member.provider
+            return image_url
+
+    def _acquire(self, tried: Set[int]) -> Optional[_Member]:
+        """
+        Reserve a slot on the next member to try, waiting while all candidates are busy
+
+        Members in cooldown are only used once every healthy member has been tried.
+
+        Returns:
+            The reserved member, or None if every member has been tried
+        """
+        with self._cond:
+            while True:
+                untried = [m for m in self.members if m.index not in tried]
+                if not untried:
+                    return None
+
+                now = self._clock()
+                healthy = [m for m in untried if m.cooldown_until <= now]
+                free = [m for m in (healthy or untried) if m.in_flight < m.concurrency]
+                if free:
+                    member = self._pick(free)
+                    member.in_flight += 1
+                    return member
+
+                # Wake up on a release, or when a cooling member becomes healthy
+                cooling = [m.cooldown_until - now for m in untried if m.cooldown_until > now]
+                self._cond.wait(timeout=min(cooling) if cooling else None)
+
+    @staticmethod
+    def _pick(candidates: List[_Member]) -> _Member:
+        """Smooth weighted round-robin (caller holds the condition)"""
+        total = sum(m.weight for m in candidates)
+        for m in candidates:
+            m.current += m.weight
+        chosen = max(candidates, key=lambda m: m.current)
+        chosen.current -= total
+        return chosen
+
+    def _release(self, member: _Member):
+        with self._cond:
+            member.in_flight -= 1
+            self._cond.notify_all()
+
+    def _record(self, member: _Member, error: Optional[Exception]):
+        """Update a member's health after a call (error is None on success)"""
+        name = member.provider.get_provider_name()
+        with self._cond:
+            if error is None:
+                member.failures = 0
+                return
+
+            error_class, server_delay = classify(error)
+            if error_class == THROTTLED:
+                pause = server_delay if server_delay is not None else self.cooldown
+                member.cooldown_until = max(member.cooldown_until, self._clock() + pause)
+                logger.warning(f"Router: {name} throttled, avoiding it for {pause:.0f}s")
+            elif error_class != PERMANENT:
+                # Permanent errors (e.g. a rejected prompt) say nothing about the provider's health
+                member.failures += 1
+                if member.failures >= self.failure_threshold:
+                    member.failures = 0
+                    member.cooldown_until = self._clock() + self.cooldown
+                    logger.warning(
+                        f"Router: {name} failed {self.failure_threshold} times in a row, "
+                        f"avoiding it for {self.cooldown:.0f}s"
+                    )
+
+    def last_attempts(self) -> List[Dict[str, Any]]:
+        """Member attempts of this thread's last generate(), each tagged with its provider"""
+        return list(getattr(self._local, "attempts", []))
+
+    def last_provider(self) -> ImageProvider:
+        """Member that produced this thread's last image (self if none did)"""
+        return getattr(self._local, "provider", None) or self
+
+    def warm_up(self):
+        """Warm up every member"""
+        for member in self.members:
+            member.provider.warm_up()
+
+    def close(self):
+        """Close every member"""
+        for member in self.members:
+            member.provider.close()
+
+    def stats(self) -> Dict[str, Any]:
+        """Members' counters, with their extra requests summed"""
+        members = [m.provider.stats() for m in self.members]
+        if not any(members):
+            return {}
+        return {
+            "extra_requests": sum(m.get("extra_requests", 0) for m in members),
+            "members": members,
+        }
+
+    def prompt_hash(self, prompt: str) -> str:
+        """
+        Hash for the highest-weight member
+
+        Which member will produce an image is not known in advance; after
+        generation the CLI records the producing member's own hash.
+        """
+        primary = max(self.members, key=lambda m: m.weight)
+        return primary.provider.prompt_hash(prompt)
+
+    def prompt_hash_for(self, provider_name: Optional[str], prompt: str) -> str:
+        """
+        Hash for the member that produced an existing image
+
+        Falls back to prompt_hash() when the producer is unknown or no longer
+        a member, so such images count as changed rather than unchanged.
+        """
+        for member in self.members:
+            if member.provider.get_provider_name() == provider_name:
+                return member.provider.prompt_hash_for(provider_name, prompt)
+        return self.prompt_hash(prompt)
+
+    def get_provider_name(self) -> str:
+        """Get provider name"""
+        return "router"
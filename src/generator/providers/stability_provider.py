@@ -2,9 +2,15 @@
 import time
 import logging
 import requests
-from typing import Dict, Any, List
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional
+from urllib.parse import urlsplit
+
+from requests.adapters import HTTPAdapter
 
 from .base import ImageProvider
+from .key_pool import KeyPool, configured_keys
+from .retry import RetryPolicy
 
 logger = logging.getLogger(__name__)
 
@@ -15,7 +21,9 @@ class StabilityProvider(ImageProvider):
     def __init__(self, config: Dict[str, Any]):
         super().__init__(config)
 
-        self.api_key = config["api_key"]
+        # One or more API keys (api_keys spreads requests over per-key quotas)
+        self.key_pool = KeyPool(configured_keys(config), config, "Stability.ai")
+        self.api_key = self.key_pool.keys[0].value
         self.model = config.get("model", "stable-diffusion-xl-1024-v1-0")
         self.base_url = config.get("base_url", "https://api.stability.ai/v1/generation")
 
@@ -26,9 +34,77 @@ class StabilityProvider(ImageProvider):
         self.steps = config.get("steps", 30)
         self.samples = config.get("samples", 1)
 
-        # Retry configuration
-        self.max_retries = config.get("max_retries", 3)
-        self.retry_delay = config.get("retry_delay", 5)
+        # Retry configuration (max_retries, retry_delay, retry_budget, ...)
+        self.retry_policy = RetryPolicy.from_config(config, "Stability.ai")
+
+        # Connection handling: generation can take a minute, connecting should not
+        self.connect_timeout = config.get("connect_timeout", 10)
+        self.read_timeout = config.get("read_timeout", 60)
+        # Keep-alive connections, one per concurrent request (the CLI defaults it to --workers)
+        self.pool_size = config.get("pool_size", 1)
+        self.warm_up_enabled = config.get("warm_up", True)
+
+        self.url = f"{self.base_url}/{self.model}/text-to-image"
+        self.session = self._create_session(self.pool_size)
+
+    def _create_session(self, pool_size: int) -> requests.Session:
+        """
+        Build a keep-alive session holding the auth and content headers
+
+        The Authorization header is the first key's; generation requests
+        override it with the key the pool assigns. Retries stay in
+        generate(), so the adapter itself never retries.
+        """
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+
+        session = requests.Session()
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        session.headers.update({
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json",
+            "Accept": "application/json"
+        })
+        return session
+
+    def warm_up(self, connections: Optional[int] = None):
+        """
+        Open pool connections (TCP + TLS) before the first generation
+
+        Sends concurrent lightweight requests to the API host so that many
+        keep-alive connections are in the pool; the responses (whatever
+        their status) are discarded.
+
+        Args:
+            connections: Connections to open (default: pool_size)
+        """
+        if not self.warm_up_enabled:
+            return
+
+        connections = min(connections or self.pool_size, self.pool_size)
+        parts = urlsplit(self.base_url)
+        url = f"{parts.scheme}://{parts.netloc}/v1/engines/list"
+
+        def touch(_):
+            try:
+                response = self.session.get(url, timeout=(self.connect_timeout, self.connect_timeout))
+                response.close()
+                return True
+            except requests.RequestException as e:
+                logger.debug(f"Stability.ai warm-up request failed: {e}")
+                return False
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=connections) as executor:
+            opened = sum(executor.map(touch, range(connections)))
+        logger.info(
+            f"Stability.ai warm-up: {opened}/{connections} connections in "
+            f"{(time.perf_counter() - start) * 1000:.0f}ms"
+        )
+
+    def close(self):
+        """Close pooled connections"""
+        self.session.close()
 
     def generate(self, prompt: str, negative_prompt: str = "") -> str:
         """
@@ -50,46 +126,46 @@ class StabilityProvider(ImageProvider):
         if negative_prompt:
             text_prompts.append({"text": negative_prompt, "weight": -1})
 
-        for attempt in range(self.max_retries + 1):
-            try:
-                response = requests.post(
-                    f"{self.base_url}/{self.model}/text-to-image",
-                    headers={
-                        "Authorization": f"Bearer {self.api_key}",
-                        "Content-Type": "application/json",
-                        "Accept": "application/json"
-                    },
-                    json={
-                        "text_prompts": text_prompts,
-                        "cfg_scale": self.cfg_scale,
-                        "height": self.height,
-                        "width": self.width,
-                        "steps": self.steps,
-                        "samples": self.samples,
-                    },
-                    timeout=60
-                )
-
-                response.raise_for_status()
-
-                data = response.json()
-
-                # Stability.ai returns base64 encoded images
-                # We need to return a data URL that can be "downloaded" by file_manager
-                if data.get("artifacts") and len(data["artifacts"]) > 0:
-                    base64_image = data["artifacts"][0]["base64"]
-                    # Return as data URL
-                    return f"data:image/png;base64,{base64_image}"
-                else:
-                    raise ValueError("No image returned from Stability.ai")
-
-            except Exception as e:
-                if attempt < self.max_retries:
-                    logger.warning(f"Stability.ai generation attempt {attempt + 1} failed: {e}")
-                    time.sleep(self.retry_delay * (2 ** attempt))  # Exponential backoff
-                else:
-                    logger.error(f"Stability.ai generation failed after {self.max_retries} retries: {e}")
-                    raise
+        return self.retry_policy.call(self.key_pool.call, lambda api_key: self._generate_once(text_prompts, api_key))
+
+    def _generate_once(self, text_prompts: List[Dict[str, Any]], api_key: str) -> str:
+        response = self.session.post(
+            self.url,
+            headers={"Authorization": f"Bearer {api_key}"},
+            json={
+                "text_prompts": text_prompts,
+                "cfg_scale": self.cfg_scale,
+                "height": self.height,
+                "width": self.width,
+                "steps": self.steps,
+                "samples": self.samples,
+            },
+            timeout=(self.connect_timeout, self.read_timeout)
+        )
+
+        response.raise_for_status()
+
+        data = response.json()
+
+        # Stability.ai returns base64 encoded images
+        # We need to return a data URL that can be "downloaded" by file_manager
+        if data.get("artifacts") and len(data["artifacts"]) > 0:
+            base64_image = data["artifacts"][0]["base64"]
+            # Return as data URL
+            return f"data:image/png;base64,{base64_image}"
+        else:
+            raise ValueError("No image returned from Stability.ai")
+
+    def generation_params(self) -> Dict[str, Any]:
+        """Model and sampling parameters sent with every request"""
+        return {
+            "model": self.model,
+            "width": self.width,
+            "height": self.height,
+            "cfg_scale": self.cfg_scale,
+            "steps": self.steps,
+            "samples": self.samples,
+        }
 
     def get_provider_name(self) -> str:
         """Get provider name"""
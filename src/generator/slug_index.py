@@ -0,0 +1,66 @@
+"""Persistent slug -> page index for entity lookups"""
+import json
+import os
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, Any, Iterable, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+
+class SlugIndex:
+    """
+    Remembers which API page each entity slug (or code) was last seen on
+
+    Stored as {entity_type: {"per_page": n, "slugs": {slug: page}}}. Entries are
+    only valid for the per_page they were recorded with. With path=None the
+    index lives in memory only.
+    """
+
+    def __init__(self, path: Optional[Union[str, Path]] = None):
+        self.path = Path(path) if path else None
+        self._lock = threading.Lock()
+        self._data: Dict[str, Dict[str, Any]] = {}
+
+        if self.path and self.path.exists():
+            try:
+                with open(self.path) as f:
+                    self._data = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.warning(f"Ignoring unreadable slug index {self.path}: {e}")
+
+    def lookup(self, entity_type: str, slug: str, per_page: int) -> Optional[int]:
+        """Page the slug was last seen on, or None"""
+        with self._lock:
+            section = self._data.get(entity_type)
+            if not section or section.get("per_page") != per_page:
+                return None
+            return section["slugs"].get(slug)
+
+    def record_page(self, entity_type: str, page: int, per_page: int, entities: Iterable[Dict[str, Any]]):
+        """Record the identifiers of every entity on a page"""
+        with self._lock:
+            section = self._data.get(entity_type)
+            if not section or section.get("per_page") != per_page:
+                section = self._data[entity_type] = {"per_page": per_page, "slugs": {}}
+            for entity in entities:
+                for identifier in (entity.get("slug"), entity.get("code")):
+                    if identifier:
+                        section["slugs"][str(identifier)] = page
+
+    def forget(self, entity_type: str, slug: str):
+        """Drop a stale entry"""
+        with self._lock:
+            self._data.get(entity_type, {}).get("slugs", {}).pop(slug, None)
+
+    def save(self):
+        """Persist the index (no-op for in-memory indexes)"""
+        if not self.path:
+            return
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix(".tmp")
+            with open(tmp_path, 'w') as f:
+                json.dump(self._data, f, separators=(',', ':'))
+            os.replace(tmp_path, self.path)
@@ -0,0 +1,167 @@
+"""Offline, compressed snapshots of compendium API entities"""
+import gzip
+import json
+import os
+import shutil
+import logging
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Any, Iterable, Iterator, Optional, Sequence, Tuple, Union
+
+from .projection import normalize_fields, project_entity
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_VERSION = 1
+
+
+def write_snapshot(
+    path: Union[str, Path],
+    base_url: str,
+    entities_by_type: Iterable[Tuple[str, Iterable[Dict[str, Any]]]]
+) -> Dict[str, Any]:
+    """
+    Write a gzip-compressed, line-delimited snapshot
+
+    The first line is a header ({snapshot_version, base_url, fetched_at,
+    counts}); every following line is {"type": ..., "entity": {...}}, grouped
+    by type in the order given. Entities are streamed to a temporary body
+    file, then the header and body are joined as two gzip members so the
+    counts can go first without holding entities in memory.
+
+    Args:
+        path: Output path (conventionally *.jsonl.gz)
+        base_url: API the entities were fetched from
+        entities_by_type: (entity_type, entities) pairs; types use CLI names
+
+    Returns:
+        The header that was written
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    body_path = path.with_name(path.name + ".body.tmp")
+    tmp_path = path.with_name(path.name + ".tmp")
+
+    counts: Dict[str, int] = {}
+    try:
+        with gzip.open(body_path, "wt", encoding="utf-8") as body:
+            for entity_type, entities in entities_by_type:
+                counts[entity_type] = 0
+                for entity in entities:
+                    body.write(_entity_line(entity_type, entity))
+                    counts[entity_type] += 1
+                logger.info(f"Snapshot: {counts[entity_type]} {entity_type}")
+
+        header = {
+            "snapshot_version": SNAPSHOT_VERSION,
+            "base_url": base_url,
+            "fetched_at": datetime.now(timezone.utc).isoformat(),
+            "counts": counts,
+        }
+        with open(tmp_path, "wb") as out:
+            out.write(gzip.compress((json.dumps(header) + "\n").encode("utf-8")))
+            with open(body_path, "rb") as body:
+                shutil.copyfileobj(body, out)
+        os.replace(tmp_path, path)
+    finally:
+        body_path.unlink(missing_ok=True)
+        tmp_path.unlink(missing_ok=True)
+
+    return header
+
+
+def _entity_line(entity_type: str, entity: Dict[str, Any]) -> str:
+    # Fixed key order lets readers filter by type on the line prefix
+    return json.dumps({"type": entity_type, "entity": entity}, separators=(",", ":")) + "\n"
+
+
+class EntitySnapshot:
+    """
+    Read-only entity source backed by a snapshot file
+
+    Offers the same fetch_entities / get_entity calls as DndApiClient so runs
+    can work from a snapshot instead of the API. Entity types may be given in
+    CLI (spell_schools) or API (spell-schools) form.
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        with gzip.open(self.path, "rt", encoding="utf-8") as f:
+            try:
+                self.header = json.loads(f.readline())
+            except ValueError as e:
+                raise ValueError(f"Not an entity snapshot: {self.path}") from e
+
+        version = self.header.get("snapshot_version")
+        if version != SNAPSHOT_VERSION:
+            raise ValueError(f"Unsupported snapshot version {version!r} in {self.path}")
+
+    @property
+    def base_url(self) -> str:
+        return self.header.get("base_url", "")
+
+    @property
+    def fetched_at(self) -> str:
+        return self.header.get("fetched_at", "")
+
+    @property
+    def counts(self) -> Dict[str, int]:
+        return self.header.get("counts", {})
+
+    def has_type(self, entity_type: str) -> bool:
+        return self._type_key(entity_type) in self.counts
+
+    def fetch_entities(
+        self,
+        entity_type: str,
+        limit: Optional[int] = None,
+        per_page: Optional[int] = None,
+        fields: Optional[Sequence[str]] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Stream one type's entities in snapshot order
+
+        Args:
+            entity_type: Type of entity (CLI or API form)
+            limit: Maximum number of entities (None = all)
+            per_page: Ignored; accepted for DndApiClient compatibility
+            fields: Dotted paths to keep, as for DndApiClient.fetch_entities
+
+        Yields:
+            Entity dictionaries
+        """
+        fields = normalize_fields(fields) if fields is not None else None
+        fetched = 0
+        for entity in self._iter_type(self._type_key(entity_type)):
+            if limit and fetched >= limit:
+                return
+            yield project_entity(entity, fields) if fields is not None else entity
+            fetched += 1
+
+    def get_entity(self, entity_type: str, slug: str, per_page: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """Find an entity by slug (or code); None if not in the snapshot"""
+        for entity in self._iter_type(self._type_key(entity_type)):
+            if entity.get("slug") == slug or entity.get("code") == slug:
+                return entity
+        return None
+
+    def _iter_type(self, type_key: str) -> Iterator[Dict[str, Any]]:
+        if type_key not in self.counts:
+            return
+
+        prefix = json.dumps({"type": type_key}, separators=(",", ":"))[:-1] + ","
+        seen = False
+        with gzip.open(self.path, "rt", encoding="utf-8") as f:
+            f.readline()  # header
+            for line in f:
+                if not line.startswith(prefix):
+                    if seen:
+                        # Types are written in contiguous blocks
+                        return
+                    continue
+                seen = True
+                yield json.loads(line)["entity"]
+
+    @staticmethod
+    def _type_key(entity_type: str) -> str:
+        return entity_type.replace("-", "_")
@@ -0,0 +1,188 @@
+"""Durable spool of provider results, so a paid-for image survives a failed save"""
+import base64
+import json
+import os
+import logging
+from contextlib import nullcontext
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+import requests
+
+from .metrics import StageTimings
+
+logger = logging.getLogger(__name__)
+
+
+class SpoolEntry:
+    """One spooled provider result: {key}.png (when fetched) and its {key}.json metadata"""
+
+    def __init__(self, meta_path: Path, meta: Dict[str, Any]):
+        self.meta_path = meta_path
+        self.data_path = meta_path.with_suffix(".png")
+        self.meta = meta
+
+    @property
+    def entity_type(self) -> str:
+        return self.meta["entity_type"]
+
+    @property
+    def slug(self) -> str:
+        return self.meta["slug"]
+
+    @property
+    def provider(self) -> str:
+        return self.meta["provider"]
+
+    @property
+    def prompt_hash(self) -> Optional[str]:
+        return self.meta.get("prompt_hash")
+
+
+class ResultSpool:
+    """
+    Directory of provider results that have not been saved yet
+
+    A result is written as soon as the provider returns it: data URLs are
+    decoded and HTTP URLs (DALL-E's expire after an hour) downloaded at
+    once, falling back to keeping the URL if that download fails. The
+    metadata file is written last, so an entry exists only once complete.
+    Saving reads the image back from the spool, and the entry is removed
+    after the manifest records it; entries left behind by a failed save or
+    a crash are completed by the next run before it calls the provider.
+    """
+
+    def __init__(self, path: Path, timeout: int = 30, timings: Optional[StageTimings] = None):
+        """
+        Args:
+            path: Spool directory (created if missing)
+            timeout: Seconds allowed for downloading URL results
+            timings: Optional collector for "download" and "spool" stage timings
+        """
+        self.path = Path(path)
+        self.timeout = timeout
+        self.timings = timings
+        self.path.mkdir(parents=True, exist_ok=True)
+
+    @classmethod
+    def from_config(
+        cls,
+        output_config: Dict[str, Any],
+        timings: Optional[StageTimings] = None
+    ) -> Optional["ResultSpool"]:
+        """Spool for the `output` config block (`output.spool`), or None if disabled"""
+        spool_config = output_config.get("spool", {})
+        if not spool_config.get("enabled", True):
+            return None
+        path = spool_config.get("path") or Path(output_config["base_path"]) / ".spool"
+        return cls(Path(path), output_config.get("timeout", 30), timings)
+
+    def put(
+        self,
+        entity_type: str,
+        slug: str,
+        provider: str,
+        image_url: str,
+        prompt_hash: Optional[str] = None
+    ) -> SpoolEntry:
+        """
+        Spool a provider result
+
+        Args:
+            entity_type: Entity type
+            slug: Entity slug
+            provider: Name of the provider that produced the image
+            image_url: Provider result (data URL or HTTP URL)
+            prompt_hash: Producing provider's prompt_hash()
+
+        Returns:
+            The spooled entry
+        """
+        key = slug.replace(':', '--').replace('/', '-')
+        if prompt_hash:
+            key = f"{key}--{prompt_hash[:12]}"
+        type_dir = self.path / entity_type
+        type_dir.mkdir(parents=True, exist_ok=True)
+
+        meta = {
+            "entity_type": entity_type,
+            "slug": slug,
+            "provider": provider,
+            "prompt_hash": prompt_hash,
+            "spooled_at": datetime.now(timezone.utc).isoformat(),
+        }
+        entry = SpoolEntry(type_dir / f"{key}.json", meta)
+
+        try:
+            data = self._fetch(image_url)
+        except (requests.RequestException, ValueError) as e:
+            # Keep the URL: it may still be fetchable when the save is retried
+            logger.warning(f"Could not fetch result for {entity_type}/{slug} into the spool ({e}); keeping its URL")
+            data = None
+            meta["url"] = image_url
+
+        with self._timed("spool"):
+            if data is not None:
+                self._write(entry.data_path, data)
+            self._write(entry.meta_path, json.dumps(meta, indent=2).encode("utf-8"))
+        return entry
+
+    def read(self, entry: SpoolEntry) -> bytes:
+        """
+        Image bytes of an entry
+
+        Raises:
+            requests.RequestException: If the entry only has a URL and it cannot be downloaded
+        """
+        if entry.data_path.exists():
+            return entry.data_path.read_bytes()
+        data = self._fetch(entry.meta["url"])
+        self._write(entry.data_path, data)
+        return data
+
+    def remove(self, entry: SpoolEntry):
+        """Drop an entry once its image is saved and recorded"""
+        for path in (entry.meta_path, entry.data_path):
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+
+    def pending(self, entity_type: Optional[str] = None) -> List[SpoolEntry]:
+        """
+        Complete entries, oldest first
+
+        Args:
+            entity_type: Only entries of this type (default: all)
+        """
+        pattern = f"{entity_type}/*.json" if entity_type else "*/*.json"
+        entries = []
+        for meta_path in self.path.glob(pattern):
+            try:
+                with open(meta_path) as f:
+                    entries.append(SpoolEntry(meta_path, json.load(f)))
+            except (OSError, ValueError) as e:
+                logger.warning(f"Ignoring unreadable spool entry {meta_path}: {e}")
+        return sorted(entries, key=lambda entry: entry.meta.get("spooled_at", ""))
+
+    def _fetch(self, image_url: str) -> bytes:
+        if image_url.startswith("data:image"):
+            return base64.b64decode(image_url.split(',', 1)[1])
+        with self._timed("download"):
+            response = requests.get(image_url, timeout=self.timeout)
+            response.raise_for_status()
+            return response.content
+
+    def _timed(self, stage: str):
+        return self.timings.time(stage) if self.timings else nullcontext()
+
+    @staticmethod
+    def _write(path: Path, data: bytes):
+        """Write atomically and durably (the point of the spool is surviving crashes)"""
+        tmp_path = path.with_suffix(path.suffix + ".tmp")
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
@@ -10,6 +10,7 @@ from pathlib import Path
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
+import asyncio
 import logging
 from typing import Optional
 from dotenv import load_dotenv
@@ -20,6 +21,7 @@ from src.generator.api_client import DndApiClient
 from src.generator.prompt_builder import PromptBuilder
 from src.generator.image_generator import ImageGenerator
 from src.generator.file_manager import FileManager
+from src.generator.jobs import FINISHED, Job, JobManager
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -30,12 +32,11 @@ load_dotenv()
 
 # Initialize components
 config = load_config()
-api_client = DndApiClient(
-    base_url=config["api"]["base_url"],
-    timeout=config["api"]["timeout"]
-)
+api_client = DndApiClient.from_config(config["api"])
 image_generator = ImageGenerator(config["openai"], config["generation"])
 file_manager = FileManager(config["output"])
+# Batches run in the background; tool calls only start, poll and cancel them
+job_manager = JobManager()
 
 # Create MCP server
 app = FastMCP("dnd-image-generator")
@@ -58,17 +59,20 @@ async def generate_image(
     Returns:
         Path to generated image
     """
+    # Provider and file work is blocking: keep it off the event loop
+    return await asyncio.to_thread(_generate_one, entity_type, slug, custom_prompt)
+
+
+def _generate_one(entity_type: str, slug: str, custom_prompt: Optional[str]) -> str:
+    """Fetch one entity, generate and save its image (blocking)"""
     try:
         # Fetch entity
         logger.info(f"Fetching {entity_type}/{slug}...")
-        entities = [e for e in api_client.fetch_entities(entity_type, limit=100)
-                   if e.get('slug') == slug]
+        entity = api_client.get_entity(entity_type, slug)
 
-        if not entities:
+        if entity is None:
             return f"Error: Entity '{slug}' not found in {entity_type}"
 
-        entity = entities[0]
-
         # Build prompt
         prompt_config = get_prompt_config(config, entity_type)
         prompt_builder = PromptBuilder(prompt_config, entity_type)
@@ -84,6 +88,7 @@ async def generate_image(
 
         # Update manifest
         file_manager.update_manifest(entity_type, slug, output_path, True)
+        file_manager.flush_index()
 
         return f"Successfully generated image: {output_path}"
 
@@ -98,33 +103,49 @@ async def batch_generate(
     limit: Optional[int] = None
 ) -> str:
     """
-    Batch generate images for multiple entities
+    Start batch generation of images for multiple entities in the background
 
     Args:
         entity_type: Type of entity (spells, items, classes, races, backgrounds)
         limit: Optional limit on number of entities to process
 
     Returns:
-        Summary of generation results
+        Job id to pass to job_status and cancel_job
     """
-    try:
-        # Fetch entities
-        logger.info(f"Fetching {entity_type}...")
-        entities = list(api_client.fetch_entities(entity_type, limit=limit))
-
-        prompt_config = get_prompt_config(config, entity_type)
-        prompt_builder = PromptBuilder(prompt_config, entity_type)
-
-        success_count = 0
-        error_count = 0
-        skip_count = 0
+    job = job_manager.submit(
+        "batch_generate",
+        {"entity_type": entity_type, "limit": limit},
+        lambda job: _run_batch(job, entity_type, limit)
+    )
+    return (
+        f"Started batch job {job.id} for {entity_type}. "
+        f"Poll job_status(job_id=\"{job.id}\") for progress or cancel_job(job_id=\"{job.id}\") to stop it."
+    )
+
+
+def _run_batch(job: Job, entity_type: str, limit: Optional[int]) -> str:
+    """Batch body (blocking, on a worker thread); raises on fetch errors so the job fails"""
+    # Fetch entities
+    logger.info(f"Fetching {entity_type}...")
+    prompt_config = get_prompt_config(config, entity_type)
+    prompt_builder = PromptBuilder(prompt_config, entity_type)
+
+    entities = list(api_client.fetch_entities(
+        entity_type, limit=limit, fields=prompt_builder.required_fields()
+    ))
+    job.set_total(len(entities))
 
+    try:
         for entity in entities:
+            if job.cancelled:
+                logger.info(f"Job {job.id} cancelled")
+                break
+
             slug = entity.get('slug')
 
             # Skip if already generated
             if file_manager.is_already_generated(entity_type, slug):
-                skip_count += 1
+                job.record("skipped")
                 continue
 
             try:
@@ -134,19 +155,63 @@ async def batch_generate(
                 output_path = file_manager.save_image(image_url, entity_type, slug)
                 file_manager.update_manifest(entity_type, slug, output_path, True)
 
-                success_count += 1
+                job.record("done")
                 logger.info(f"Generated {slug}")
 
             except Exception as e:
                 logger.error(f"Failed to generate {slug}: {e}")
                 file_manager.update_manifest(entity_type, slug, "", False, str(e))
-                error_count += 1
+                job.record("failed")
+    finally:
+        # Once per batch, even if the loop is interrupted
+        file_manager.flush_index()
 
-        return f"Batch generation complete: {success_count} succeeded, {skip_count} skipped, {error_count} failed"
+    api_client.log_cache_stats()
+    counts = job.counts
+    return (
+        f"Batch generation {'cancelled' if job.cancelled else 'complete'}: {counts['done']} succeeded, "
+        f"{counts['skipped']} skipped, {counts['failed']} failed"
+    )
 
-    except Exception as e:
-        logger.error(f"Batch generation failed: {e}")
-        return f"Error: {str(e)}"
+
+@app.tool()
+async def job_status(job_id: Optional[str] = None) -> str:
+    """
+    Report progress of background jobs
+
+    Args:
+        job_id: Job to report (default: all known jobs)
+
+    Returns:
+        Status, done/failed/skipped/remaining counts, rate and ETA per job
+    """
+    if job_id:
+        job = job_manager.get(job_id)
+        return job.describe() if job else f"Error: Unknown job '{job_id}'"
+
+    jobs = job_manager.jobs()
+    if not jobs:
+        return "No jobs"
+    return "\n".join(job.describe() for job in jobs)
+
+
+@app.tool()
+async def cancel_job(job_id: str) -> str:
+    """
+    Cancel a background job
+
+    Args:
+        job_id: Job to cancel
+
+    Returns:
+        Confirmation; a running job stops after the entity in progress
+    """
+    job = job_manager.cancel(job_id)
+    if job is None:
+        return f"Error: Unknown job '{job_id}'"
+    if job.status in FINISHED and not job.cancelled:
+        return f"Job {job_id} already {job.status}"
+    return f"Cancellation requested for job {job_id}; it stops after the entity in progress"
 
 
 @app.tool()
@@ -161,7 +226,8 @@ async def list_generated(entity_type: Optional[str] = None) -> str:
         Summary of generated images
     """
     try:
-        count = file_manager.get_generated_count(entity_type)
+        # Reads the manifest: off the event loop so it answers while batches run
+        count = await asyncio.to_thread(file_manager.get_generated_count, entity_type)
 
         if entity_type:
             return f"Generated {count} images for {entity_type}"
@@ -173,8 +239,6 @@ async def list_generated(entity_type: Optional[str] = None) -> str:
 
 
 if __name__ == '__main__':
-    import asyncio
-
     # Run MCP server
     logger.info("Starting D&D Image Generator MCP server...")
     app.run()
@@ -0,0 +1,11 @@
+import pytest
+
+from src.generator import circuit_breaker
+
+
+@pytest.fixture(autouse=True)
+def fresh_circuit_breakers():
+    """Give each test its own process-wide circuit breakers, so results do not depend on test order"""
+    circuit_breaker._breakers.clear()
+    yield
+    circuit_breaker._breakers.clear()
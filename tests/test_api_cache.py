@@ -0,0 +1,67 @@
+import tempfile
+
+import responses
+
+from src.generator.api_cache import ApiCache
+from src.generator.api_client import DndApiClient
+from src.generator.circuit_breaker import CircuitBreaker
+
+SPELLS_URL = "http://localhost:8080/api/v1/spells"
+PAGE = {
+    "data": [{"id": 1, "slug": "phb:fireball", "name": "Fireball"}],
+    "meta": {"current_page": 1, "last_page": 1}
+}
+
+
+@responses.activate
+def test_fresh_cache_entry_skips_request():
+    """Test that a page within its TTL is served without HTTP"""
+    responses.add(responses.GET, SPELLS_URL, json=PAGE, headers={"ETag": '"v1"'}, status=200)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        cache = ApiCache(tmpdir, ttl=3600)
+        client = DndApiClient("http://localhost:8080/api/v1", cache=cache)
+
+        assert list(client.fetch_entities("spells"))[0]["slug"] == "phb:fireball"
+        assert list(client.fetch_entities("spells"))[0]["slug"] == "phb:fireball"
+
+        assert len(responses.calls) == 1
+        assert cache.counters["misses"] == 1
+        assert cache.counters["hits"] == 1
+
+
+@responses.activate
+def test_stale_entry_is_revalidated():
+    """Test conditional requests and 304 handling"""
+    responses.add(responses.GET, SPELLS_URL, json=PAGE, headers={"ETag": '"v1"'}, status=200)
+    responses.add(responses.GET, SPELLS_URL, status=304)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        cache = ApiCache(tmpdir, ttl=0)
+        client = DndApiClient("http://localhost:8080/api/v1", cache=cache)
+
+        list(client.fetch_entities("spells"))
+        entities = list(client.fetch_entities("spells"))
+
+        assert entities[0]["slug"] == "phb:fireball"
+        assert responses.calls[1].request.headers["If-None-Match"] == '"v1"'
+        assert cache.counters["revalidated"] == 1
+
+
+@responses.activate
+def test_stale_entry_served_when_api_down():
+    """Test that cached pages are used when the API returns errors"""
+    responses.add(responses.GET, SPELLS_URL, json=PAGE, status=200)
+    responses.add(responses.GET, SPELLS_URL, body="<h1>502 Bad Gateway</h1>", status=502)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        cache = ApiCache(tmpdir, ttl=0)
+        client = DndApiClient(
+            "http://localhost:8080/api/v1", cache=cache, max_retries=0, circuit_breaker=CircuitBreaker()
+        )
+
+        list(client.fetch_entities("spells"))
+        entities = list(client.fetch_entities("spells"))
+
+        assert len(entities) == 1
+        assert cache.counters["stale"] == 1
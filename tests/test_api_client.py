@@ -1,6 +1,12 @@
 import pytest
+import requests
 import responses
-from src.generator.api_client import DndApiClient, LOOKUP_ENTITY_TYPES
+from responses import matchers
+from src.generator.api_client import (
+    DndApiClient, LOOKUP_ENTITY_TYPES, ApiFetchError, ApiUnavailableError, IncompleteFetchError
+)
+from src.generator.circuit_breaker import CircuitBreaker
+from src.generator.slug_index import SlugIndex
 
 
 @responses.activate
@@ -129,3 +135,309 @@ def test_lookup_entity_types_constant():
         'conditions', 'proficiency-types', 'languages'
     }
     assert LOOKUP_ENTITY_TYPES == expected
+
+
+@responses.activate
+def test_fetch_entities_reuses_pooled_session():
+    """Test that pages share one session and request compressed responses"""
+    for page in (1, 2):
+        responses.add(
+            responses.GET,
+            "http://localhost:8080/api/v1/monsters",
+            json={
+                "data": [{"id": page, "slug": f"monster-{page}", "name": f"Monster {page}"}],
+                "meta": {"current_page": page, "last_page": 2}
+            },
+            status=200
+        )
+
+    client = DndApiClient(base_url="http://localhost:8080/api/v1", timeout=30, pool_size=4)
+    entities = list(client.fetch_entities("monsters"))
+
+    assert len(entities) == 2
+    assert len(responses.calls) == 2
+    assert "gzip" in responses.calls[0].request.headers["Accept-Encoding"]
+    assert client.session.get_adapter("http://localhost:8080")._pool_maxsize == 4
+
+
+def test_from_config():
+    """Test building a client from the api config block"""
+    client = DndApiClient.from_config({"base_url": "http://localhost:8080/api/v1/", "timeout": 5, "pool_size": 2})
+
+    assert client.base_url == "http://localhost:8080/api/v1"
+    assert client.timeout == 5
+
+
+def _add_pages(entity_type, last_page, per_page=2):
+    """Register one response per page, matched on the page query parameter"""
+    for page in range(1, last_page + 1):
+        responses.add(
+            responses.GET,
+            f"http://localhost:8080/api/v1/{entity_type}",
+            match=[matchers.query_param_matcher({"page": str(page), "per_page": str(per_page)})],
+            json={
+                "data": [
+                    {"id": i, "slug": f"{entity_type}-{i}", "name": f"Entity {i}"}
+                    for i in range((page - 1) * per_page + 1, page * per_page + 1)
+                ],
+                "meta": {"current_page": page, "last_page": last_page}
+            },
+            status=200
+        )
+
+
+@responses.activate
+def test_fetch_entities_concurrent_pages_in_order():
+    """Test that concurrently fetched pages are yielded in page order"""
+    _add_pages("items", last_page=6)
+
+    client = DndApiClient(base_url="http://localhost:8080/api/v1", max_concurrency=3)
+    entities = list(client.fetch_entities("items", per_page=2))
+
+    assert [e["id"] for e in entities] == list(range(1, 13))
+
+
+@responses.activate
+def test_fetch_entities_concurrent_respects_limit():
+    """Test that only the pages needed for the limit are requested"""
+    _add_pages("monsters", last_page=10)
+
+    client = DndApiClient(base_url="http://localhost:8080/api/v1", max_concurrency=8)
+    entities = list(client.fetch_entities("monsters", limit=5, per_page=2))
+
+    assert [e["id"] for e in entities] == [1, 2, 3, 4, 5]
+    assert len(responses.calls) == 3
+
+
+@responses.activate
+def test_get_entity_uses_slug_endpoint():
+    """Test single-entity lookup via the per-slug endpoint costs one request"""
+    responses.add(
+        responses.GET,
+        "http://localhost:8080/api/v1/spells/phb:fireball",
+        json={"data": {"id": 1, "slug": "phb:fireball", "name": "Fireball"}},
+        status=200
+    )
+
+    client = DndApiClient(base_url="http://localhost:8080/api/v1")
+    entity = client.get_entity("spells", "phb:fireball")
+
+    assert entity["name"] == "Fireball"
+    assert len(responses.calls) == 1
+
+
+@responses.activate
+def test_get_entity_slug_endpoint_404_is_final():
+    """Test that a 404 from the per-slug endpoint returns None without scanning the collection"""
+    responses.add(responses.GET, "http://localhost:8080/api/v1/spells/phb:missing", status=404)
+
+    client = DndApiClient(base_url="http://localhost:8080/api/v1")
+
+    assert client.get_entity("spells", "phb:missing") is None
+    assert len(responses.calls) == 1
+
+
+@responses.activate
+def test_get_entity_scans_when_slug_endpoint_fails():
+    """Test that a failed per-slug lookup (not a 404) still falls back to the collection"""
+    responses.add(responses.GET, "http://localhost:8080/api/v1/spells/phb:fireball", body="not json")
+    responses.add(
+        responses.GET,
+        "http://localhost:8080/api/v1/spells",
+        json={"data": [{"id": 1, "slug": "phb:fireball", "name": "Fireball"}], "meta": {"current_page": 1, "last_page": 1}},
+        status=200
+    )
+
+    client = DndApiClient(base_url="http://localhost:8080/api/v1")
+
+    assert client.get_entity("spells", "phb:fireball")["name"] == "Fireball"
+    assert len(responses.calls) == 2
+
+
+@responses.activate
+def test_get_entity_falls_back_to_slug_index(tmp_path):
+    """Test lookups without a slug endpoint scan once, then hit the indexed page"""
+    index_path = tmp_path / "slug_index.json"
+    client = DndApiClient(base_url="http://localhost:8080/api/v1", slug_index=SlugIndex(index_path))
+
+    for page in range(1, 4):
+        responses.add(
+            responses.GET,
+            "http://localhost:8080/api/v1/lookups/conditions",
+            match=[matchers.query_param_matcher({"page": str(page), "per_page": "2"})],
+            json={
+                "data": [{"id": page, "code": f"C{page}", "name": f"Condition {page}"}],
+                "meta": {"current_page": page, "last_page": 3}
+            },
+            status=200
+        )
+
+    assert client.get_entity("conditions", "C3", per_page=2)["name"] == "Condition 3"
+    assert len(responses.calls) == 3
+
+    fresh_client = DndApiClient(base_url="http://localhost:8080/api/v1", slug_index=SlugIndex(index_path))
+    assert fresh_client.get_entity("conditions", "C3", per_page=2)["id"] == 3
+    assert len(responses.calls) == 4
+    assert fresh_client.get_entity("conditions", "missing", per_page=2) is None
+
+
+@responses.activate
+def test_fetch_page_retries_transient_errors():
+    """Test that a 502 is retried and the run still gets the page"""
+    responses.add(responses.GET, "http://localhost:8080/api/v1/spells", status=502)
+    responses.add(
+        responses.GET,
+        "http://localhost:8080/api/v1/spells",
+        json={"data": [{"id": 1, "slug": "fireball"}], "meta": {"current_page": 1, "last_page": 1}},
+        status=200
+    )
+
+    client = DndApiClient(
+        base_url="http://localhost:8080/api/v1",
+        backoff_factor=0,
+        circuit_breaker=CircuitBreaker()
+    )
+    entities = list(client.fetch_entities("spells"))
+
+    assert [e["slug"] for e in entities] == ["fireball"]
+    assert len(responses.calls) == 2
+
+
+@responses.activate
+def test_fetch_entities_raises_on_truncated_fetch():
+    """Test that a page failing after retries raises instead of silently truncating"""
+    responses.add(
+        responses.GET,
+        "http://localhost:8080/api/v1/items",
+        match=[matchers.query_param_matcher({"page": "1", "per_page": "2"})],
+        json={"data": [{"id": 1}, {"id": 2}], "meta": {"current_page": 1, "last_page": 3}},
+        status=200
+    )
+    responses.add(
+        responses.GET,
+        "http://localhost:8080/api/v1/items",
+        match=[matchers.query_param_matcher({"page": "2", "per_page": "2"})],
+        status=503
+    )
+
+    client = DndApiClient(
+        base_url="http://localhost:8080/api/v1",
+        max_retries=1,
+        backoff_factor=0,
+        max_concurrency=1,
+        circuit_breaker=CircuitBreaker()
+    )
+    seen = []
+    with pytest.raises(IncompleteFetchError) as excinfo:
+        for entity in client.fetch_entities("items", per_page=2):
+            seen.append(entity["id"])
+
+    assert seen == [1, 2]
+    assert excinfo.value.page == 2
+    assert excinfo.value.fetched == 2
+
+
+@responses.activate
+def test_circuit_breaker_fails_fast():
+    """Test that once the circuit opens no further requests are sent"""
+    responses.add(responses.GET, "http://localhost:8080/api/v1/spells", status=500)
+
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+    client = DndApiClient(
+        base_url="http://localhost:8080/api/v1",
+        max_retries=5,
+        backoff_factor=0,
+        circuit_breaker=breaker
+    )
+
+    with pytest.raises(ApiUnavailableError):
+        list(client.fetch_entities("spells"))
+    assert len(responses.calls) == 2
+    assert breaker.state == "open"
+
+    other = DndApiClient(base_url="http://localhost:8080/api/v1", circuit_breaker=breaker)
+    with pytest.raises(ApiFetchError):
+        list(other.fetch_entities("spells"))
+    assert len(responses.calls) == 2
+
+
+@responses.activate
+def test_circuit_breaker_trial_failing_with_other_request_error_reopens():
+    """Test that a half-open trial failing with a non-retried error still reports its outcome"""
+    responses.add(responses.GET, "http://localhost:8080/api/v1/spells", status=500)
+    responses.add(
+        responses.GET, "http://localhost:8080/api/v1/spells", body=requests.exceptions.ChunkedEncodingError("cut off")
+    )
+
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60)
+    client = DndApiClient(base_url="http://localhost:8080/api/v1", max_retries=0, circuit_breaker=breaker)
+
+    with pytest.raises(ApiFetchError):
+        list(client.fetch_entities("spells"))
+    assert breaker.state == "open"
+
+    breaker._opened_at -= 60
+    with pytest.raises(ApiFetchError):
+        list(client.fetch_entities("spells"))
+    assert breaker.state == "open"
+    assert len(responses.calls) == 2
+
+
+def test_circuit_breaker_replaces_unreported_trial():
+    """Test that a half-open trial with no outcome does not keep the circuit shut"""
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60)
+    breaker.record_failure()
+    breaker._opened_at -= 60
+
+    assert breaker.allow() is True
+    assert breaker.state == "half-open"
+    assert breaker.allow() is False
+
+    breaker._trial_at -= 60
+    assert breaker.allow() is True
+
+
+@responses.activate
+def test_fetch_entities_projects_fields():
+    """Test that unused subtrees are dropped from streamed pages"""
+    responses.add(
+        responses.GET,
+        "http://localhost:8080/api/v1/monsters",
+        match=[matchers.query_param_matcher({"page": "1", "per_page": "100"})],
+        json={
+            "data": [{
+                "id": 1, "slug": "mm:goblin", "name": "Goblin", "description": "Small and mean",
+                "type": {"name": "Humanoid"}, "actions": [{"name": "Scimitar"}]
+            }],
+            "meta": {"current_page": 1, "last_page": 1}
+        },
+        status=200
+    )
+
+    client = DndApiClient(base_url="http://localhost:8080/api/v1")
+    entities = list(client.fetch_entities("monsters", fields=["description", "type.name"]))
+
+    assert entities == [{
+        "id": 1, "slug": "mm:goblin", "name": "Goblin", "description": "Small and mean",
+        "type": {"name": "Humanoid"}
+    }]
+
+
+@responses.activate
+def test_fetch_entities_requests_sparse_fieldset():
+    """Test that the configured fields parameter is sent with top-level names"""
+    responses.add(
+        responses.GET,
+        "http://localhost:8080/api/v1/items",
+        match=[matchers.query_param_matcher({
+            "page": "1", "per_page": "100",
+            "fields": "code,description,id,item_type,name,slug"
+        })],
+        json={"data": [{"id": 1, "slug": "longsword", "name": "Longsword"}], "meta": {"last_page": 1}},
+        status=200
+    )
+
+    client = DndApiClient(base_url="http://localhost:8080/api/v1", fields_param="fields")
+    entities = list(client.fetch_entities("items", fields=["description", "item_type.name"]))
+
+    assert entities[0]["slug"] == "longsword"
@@ -0,0 +1,111 @@
+import threading
+import time
+import tempfile
+import urllib.request
+from pathlib import Path
+
+from PIL import Image
+
+from src.conversion_server import create_server
+from src.generator.conversion_cache import ConversionCache
+
+
+def test_cache_hit_after_miss():
+    """Test that a rendered conversion is served from cache afterwards"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        cache = ConversionCache(tmpdir, max_bytes=1000)
+        calls = []
+
+        def render():
+            calls.append(1)
+            return b"webp-bytes"
+
+        path = cache.get_or_render((128, "spells", "fireball"), render)
+        again = cache.get_or_render((128, "spells", "fireball"), render)
+
+        assert path == again
+        assert path.read_bytes() == b"webp-bytes"
+        assert len(calls) == 1
+        assert cache.stats()["hits"] == 1
+
+
+def test_cache_evicts_least_recently_used():
+    """Test that the byte budget is enforced with LRU eviction"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        cache = ConversionCache(tmpdir, max_bytes=25)
+
+        a = cache.get_or_render((128, "items", "a"), lambda: b"x" * 10)
+        cache.get_or_render((128, "items", "b"), lambda: b"x" * 10)
+        cache.get_or_render((128, "items", "a"), lambda: b"x" * 10)  # touch a
+        cache.get_or_render((128, "items", "c"), lambda: b"x" * 10)  # evicts b
+
+        assert a.exists()
+        assert not cache.path_for((128, "items", "b")).exists()
+        assert cache.stats()["bytes"] == 20
+        assert cache.stats()["evictions"] == 1
+
+        # Existing files are adopted on restart
+        assert ConversionCache(tmpdir, max_bytes=25).stats()["entries"] == 2
+
+
+def test_concurrent_misses_are_coalesced():
+    """Test that simultaneous requests for one key render once"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        cache = ConversionCache(tmpdir, max_bytes=1000)
+        calls = []
+
+        def render():
+            calls.append(1)
+            time.sleep(0.1)
+            return b"data"
+
+        threads = [
+            threading.Thread(target=cache.get_or_render, args=((256, "monsters", "goblin"), render))
+            for _ in range(5)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert len(calls) == 1
+
+
+def test_server_renders_and_revalidates():
+    """Test the HTTP service end to end with ETag revalidation"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        original = Path(tmpdir) / "spells" / "stability-ai" / "phb--fireball.png"
+        original.parent.mkdir(parents=True)
+        Image.new("RGB", (64, 64), (200, 50, 10)).save(original)
+
+        config = {"output": {
+            "base_path": tmpdir,
+            "conversions": {"sizes": [32], "path": f"{tmpdir}/conversions", "server": {"max_bytes": 10000}}
+        }}
+        server = create_server(config, "127.0.0.1", 0)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        base = f"http://127.0.0.1:{server.server_address[1]}"
+
+        try:
+            with urllib.request.urlopen(f"{base}/32/spells/phb:fireball.webp") as response:
+                etag = response.headers["ETag"]
+                assert response.headers["Content-Type"] == "image/webp"
+                assert "max-age" in response.headers["Cache-Control"]
+                assert response.read()[:4] == b"RIFF"
+
+            request = urllib.request.Request(f"{base}/32/spells/phb--fireball.webp", headers={"If-None-Match": etag})
+            try:
+                urllib.request.urlopen(request)
+                assert False, "expected 304"
+            except urllib.error.HTTPError as e:
+                assert e.code == 304
+
+            try:
+                urllib.request.urlopen(f"{base}/999/spells/phb--fireball.webp")
+                assert False, "expected 404"
+            except urllib.error.HTTPError as e:
+                assert e.code == 404
+        finally:
+            server.shutdown()
+            server.server_close()
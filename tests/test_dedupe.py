@@ -0,0 +1,50 @@
+import pytest
+
+from src.generator.dedupe import NearDuplicateDetector, normalize_text, shingles
+
+WEAPON = "You have a {} bonus to attack and damage rolls made with this magic weapon."
+FIREBALL = "A bright streak flashes from your pointing finger to a point you choose within range."
+
+
+def test_normalize_text_drops_digits_and_punctuation():
+    """Test that numeric variants normalize to the same text"""
+    assert normalize_text("Longsword, +1") == normalize_text("LONGSWORD +3") == "longsword"
+    assert shingles("abc", 5) == ["abc"]
+    assert shingles("abcdef", 5) == ["abcde", "bcdef"]
+
+
+def test_groups_near_duplicates_only():
+    """Test that variants and reprints group together while distinct entities do not"""
+    detector = NearDuplicateDetector()
+    texts = {
+        "dmg:longsword-1": "Longsword, +1 " + WEAPON.format("+1"),
+        "dmg:longsword-2": "Longsword, +2 " + WEAPON.format("+2"),
+        "phb:fireball": "Fireball " + FIREBALL,
+        "xge:fireball": "Fireball " + FIREBALL,
+        "phb:fire-bolt": "Fire Bolt You hurl a mote of fire at a creature or object within range.",
+        "dmg:dagger-1": "Dagger, +1 You can use an action to cause thick black poison to coat the blade.",
+    }
+
+    assert detector.groups(texts) == [
+        ["dmg:longsword-1", "dmg:longsword-2"],
+        ["phb:fireball", "xge:fireball"],
+    ]
+    assert detector.aliases(texts) == {
+        "dmg:longsword-2": "dmg:longsword-1",
+        "xge:fireball": "phb:fireball",
+    }
+
+
+def test_canonical_prefers_configured_sources():
+    """Test canonical selection: preferred source, then shortest slug"""
+    detector = NearDuplicateDetector({"prefer_sources": ["phb", "xge"]})
+
+    assert detector.canonical(["tce:fireball", "xge:fireball", "phb:fireball"]) == "phb:fireball"
+    assert detector.canonical(["tce:fireball", "xge:fireball"]) == "xge:fireball"
+    assert detector.canonical(["longsword-12", "longsword-1"]) == "longsword-1"
+
+
+def test_num_perm_must_divide_into_bands():
+    """Test that an inconsistent LSH configuration is rejected"""
+    with pytest.raises(ValueError):
+        NearDuplicateDetector({"num_perm": 100, "bands": 32})
@@ -0,0 +1,30 @@
+import threading
+
+from benchmarks.fake_compendium import FakeCompendium, base_url, create_server
+from src.generator.api_client import DndApiClient
+from src.generator.circuit_breaker import CircuitBreaker
+
+
+def test_client_against_fake_compendium():
+    """Test pagination, lookups, slug lookups and 502 retries against the fake API"""
+    compendium = FakeCompendium(count=25, entity_bytes=512, bad_gateway_rate=0.3, seed=1)
+    server = create_server(compendium)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    try:
+        client = DndApiClient(
+            base_url(server), max_retries=10, backoff_factor=0, circuit_breaker=CircuitBreaker(failure_threshold=100)
+        )
+
+        monsters = list(client.fetch_entities("monsters", per_page=10))
+        assert [m["id"] for m in monsters] == list(range(1, 26))
+        assert all(m["slug"].startswith("phb:") for m in monsters)
+
+        conditions = list(client.fetch_entities("conditions", per_page=10))
+        assert len(conditions) == 25 and "code" in conditions[0]
+
+        assert client.get_entity("monsters", monsters[7]["slug"]) == monsters[7]
+        assert compendium.counters["bad_gateway"] > 0
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -1,10 +1,13 @@
 import pytest
+import base64
 import json
+import os
 import tempfile
 import shutil
 from pathlib import Path
 from unittest.mock import Mock, patch
 from src.generator.file_manager import FileManager
+from src.generator.metrics import StageTimings
 
 
 def test_save_image_creates_directory():
@@ -82,6 +85,32 @@ def test_update_manifest():
         assert manifest["spells"]["fireball"]["success"] is True
 
 
+def test_update_manifest_records_attempts():
+    """Test that retried or failed generations keep their attempts and error class"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        manager = FileManager({"base_path": tmpdir, "post_resize": None})
+
+        manager.update_manifest("spells", "fireball", "out.png", True, attempts=[{"outcome": "ok"}])
+        manager.update_manifest("spells", "shield", "out.png", True, attempts=[
+            {"outcome": "throttled", "error": "429", "wait": 1.0}, {"outcome": "ok"}
+        ])
+        manager.update_manifest("spells", "wish", "", False, "400 content policy", attempts=[
+            {"outcome": "permanent", "error": "400 content policy"}
+        ])
+        manager.update_manifest("spells", "light", "", False, "503", attempts=[
+            {"outcome": "retryable", "error": "503", "gave_up": "budget"}
+        ])
+
+        with open(Path(tmpdir) / ".manifest.json") as f:
+            manifest = json.load(f)["spells"]
+
+        assert "attempts" not in manifest["fireball"]
+        assert len(manifest["shield"]["attempts"]) == 2
+        assert "error_class" not in manifest["shield"]
+        assert manifest["wish"]["error_class"] == "permanent"
+        assert manifest["light"]["error_class"] == "budget"
+
+
 def test_is_already_generated():
     """Test checking if image already exists"""
     with tempfile.TemporaryDirectory() as tmpdir:
@@ -151,3 +180,157 @@ def test_save_image_rejects_path_traversal():
             # Test path traversal attempt
             with pytest.raises(ValueError, match="must not contain path components"):
                 manager.save_image("https://example.com/img.png", "spells", "../../../etc/passwd")
+
+
+def test_is_already_generated_uses_output_index():
+    """Test that saved images are found through the output index"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        config = {"base_path": tmpdir}
+        manager = FileManager(config)
+
+        with patch('src.generator.file_manager.requests.get') as mock_get:
+            mock_response = Mock()
+            mock_response.content = b"fake_image_data"
+            mock_get.return_value = mock_response
+
+            manager.save_image("https://example.com/img.png", "spells", "phb:fireball", "stability-ai")
+
+        # No manifest entry, but the index knows the file
+        assert manager.is_already_generated("spells", "phb:fireball") is True
+        manager.flush_index()
+        assert FileManager(config).is_already_generated("spells", "phb:fireball") is True
+        assert manager.is_already_generated("spells", "phb:fireball", "dall-e") is False
+
+
+def test_index_saved_once_per_batch():
+    """Test that saving images only marks the index dirty, and flush_index writes it once"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        config = {"base_path": tmpdir}
+        manager = FileManager(config)
+        index_path = Path(tmpdir) / ".index.json"
+
+        manager.index  # builds and saves the empty index
+        saved = index_path.read_text()
+        with patch.object(manager.index, "save", wraps=manager.index.save) as save:
+            for slug in ("fireball", "shield", "light"):
+                manager.save_image("", "spells", slug, "mock", image_data=b"png")
+            assert save.call_count == 0
+            assert index_path.read_text() == saved
+
+            manager.flush_index()
+            manager.flush_index()
+            assert save.call_count == 1
+
+        assert FileManager(config).is_already_generated("spells", "light", "mock") is True
+
+
+def test_is_already_generated_ignores_deleted_indexed_files():
+    """Test that an index hit whose file was deleted by hand counts as not generated"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        manager = FileManager({"base_path": tmpdir})
+        path = manager.save_image("", "spells", "phb:fireball", "mock", image_data=b"png")
+        manager.flush_index()
+
+        Path(path).unlink()
+        manager = FileManager({"base_path": tmpdir})
+
+        assert manager.is_already_generated("spells", "phb:fireball", "mock") is False
+        assert manager.index.get("spells", "mock", "phb--fireball") is None
+
+
+def test_rename_manifest_entries():
+    """Test batch re-keying of manifest entries to prefixed slugs"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        manager = FileManager({"base_path": tmpdir})
+
+        manager.update_manifest("spells", "acid-splash", "output/spells/stability-ai/acid-splash.png", True)
+        manager.update_manifest("spells", "fireball", "output/spells/stability-ai/fireball.png", True)
+
+        renamed = manager.rename_manifest_entries({"spells": {"acid-splash": "phb:acid-splash"}})
+
+        manifest = manager._load_manifest()
+        assert renamed == 1
+        assert "acid-splash" not in manifest["spells"]
+        assert manifest["spells"]["phb:acid-splash"]["path"] == "output/spells/stability-ai/phb--acid-splash.png"
+        assert "fireball" in manifest["spells"]
+
+
+def test_prompt_hash_tracking():
+    """Test storing, reading and baselining prompt hashes in the manifest"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        manager = FileManager({"base_path": tmpdir, "post_resize": None})
+
+        manager.update_manifest("spells", "fireball", "output/spells/fireball.png", True, prompt_hash="abc")
+        manager.update_manifest("spells", "shield", "output/spells/shield.png", True)
+        manager.update_manifest("spells", "sleep", "", False, "boom", prompt_hash="ignored")
+
+        assert manager.get_prompt_hash("spells", "fireball") == "abc"
+        assert manager.get_prompt_hash("spells", "shield") is None
+        assert manager.get_prompt_hash("spells", "sleep") is None
+
+        assert manager.set_prompt_hashes("spells", {"shield": "def", "sleep": "x", "missing": "y"}) == 1
+        assert manager.get_prompt_hash("spells", "shield") == "def"
+
+
+def test_alias_image_links_canonical_files():
+    """Test that an alias links the canonical image without copying, and regenerating it detaches the link"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        manager = FileManager({"base_path": tmpdir})
+
+        with patch('src.generator.file_manager.requests.get') as mock_get:
+            mock_get.return_value = Mock(content=b"canonical_image")
+            path = manager.save_image("https://example.com/img.png", "spells", "phb:fireball", "test-provider")
+            manager.update_manifest("spells", "phb:fireball", path, True)
+
+            assert manager.alias_image("spells", "xge:fireball", "phb:missing") is None
+            alias_path = manager.alias_image("spells", "xge:fireball", "phb:fireball", prompt_hash="abc")
+
+            assert Path(alias_path).name == "xge--fireball.png"
+            assert Path(alias_path).is_symlink()
+            assert Path(alias_path).read_bytes() == b"canonical_image"
+            entry = json.loads(manager.manifest_path.read_text())["spells"]["xge:fireball"]
+            assert entry["alias_of"] == "phb:fireball"
+            assert entry["prompt_hash"] == "abc"
+            assert manager.is_already_generated("spells", "xge:fireball", "test-provider")
+
+            mock_get.return_value = Mock(content=b"own_image")
+            manager.save_image("https://example.com/img.png", "spells", "xge:fireball", "test-provider")
+
+            assert not Path(alias_path).is_symlink()
+            assert Path(path).read_bytes() == b"canonical_image"
+
+
+def test_hardlink_aliases_follow_regenerated_canonical():
+    """Test that hard-linked aliases (no symlink support) are re-linked when the canonical image is regenerated"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        manager = FileManager({"base_path": tmpdir})
+        path = manager.save_image("", "spells", "phb:fireball", "mock", image_data=b"old")
+        manager.update_manifest("spells", "phb:fireball", path, True)
+
+        with patch("src.generator.file_manager.os.symlink", side_effect=OSError("not supported")):
+            alias_path = manager.alias_image("spells", "xge:fireball", "phb:fireball")
+
+        assert not Path(alias_path).is_symlink()
+        assert json.loads(manager.manifest_path.read_text())["spells"]["xge:fireball"]["link"] == "hardlink"
+
+        path = manager.save_image("", "spells", "phb:fireball", "mock", image_data=b"new")
+        manager.update_manifest("spells", "phb:fireball", path, True)
+
+        assert Path(alias_path).read_bytes() == b"new"
+        assert os.path.samefile(alias_path, path)
+
+
+def test_download_stage_only_for_http_urls():
+    """Test that data URLs are saved without a "download" stage and HTTP URLs are timed as one"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        timings = StageTimings()
+        manager = FileManager({"base_path": tmpdir, "post_resize": None}, timings=timings)
+        data_url = "data:image/png;base64," + base64.b64encode(b"png").decode()
+
+        manager.save_image(data_url, "spells", "fireball", "dall-e")
+        assert "download" not in timings.summary()
+
+        response = Mock(content=b"png")
+        with patch("src.generator.file_manager.requests.get", return_value=response):
+            manager.save_image("https://images.example/shield.png", "spells", "shield", "dall-e")
+        assert timings.summary()["download"]["count"] == 1
@@ -0,0 +1,123 @@
+import threading
+import time
+
+import pytest
+
+from src.generator.providers.base import ImageProvider
+from src.generator.providers.factory import create_provider
+from src.generator.providers.hedged_provider import HedgedProvider
+from src.generator.providers.mock_provider import MockProvider
+
+
+class ScriptedProvider(ImageProvider):
+    """Returns its call number after the scripted delay; (delay, error) entries raise instead"""
+
+    def __init__(self, delays):
+        super().__init__({})
+        self.delays = list(delays)
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def generate(self, prompt: str) -> str:
+        with self._lock:
+            self.calls += 1
+            call, delay = self.calls, self.delays.pop(0)
+        error = None
+        if isinstance(delay, tuple):
+            delay, error = delay
+        time.sleep(delay)
+        if error:
+            raise error
+        return f"image-{call}"
+
+    def get_provider_name(self) -> str:
+        return "scripted"
+
+
+def hedged(delays, **config):
+    config.setdefault("initial_delay", 0.05)
+    config.setdefault("max_ratio", 1.0)
+    return HedgedProvider(ScriptedProvider(delays), config)
+
+
+def test_slow_request_is_hedged_and_hedge_wins():
+    """Test that a request slower than the hedge delay is raced by a second one"""
+    provider = hedged([1.0, 0.01])
+
+    start = time.monotonic()
+    assert provider.generate("A fireball") == "image-2"
+    assert time.monotonic() - start < 0.5
+
+    time.sleep(1.1)  # the discarded primary completes
+    stats = provider.stats()
+    assert stats["extra_requests"] == 1
+    assert stats["hedging"]["hedge_wins"] == 1
+    assert stats["hedging"]["saved_seconds"] > 0.5
+    provider.close()
+
+
+def test_fast_request_is_not_hedged():
+    """Test that requests finishing before the delay send nothing extra"""
+    provider = hedged([0.0, 0.0])
+
+    assert provider.generate("A fireball") == "image-1"
+    assert provider.generate("A shield") == "image-2"
+    assert provider.stats()["hedging"]["hedged"] == 0
+    provider.close()
+
+
+def test_spend_cap_limits_hedges():
+    """Test that hedges stay within max_ratio of requests"""
+    provider = hedged([0.2, 0.2, 0.0], max_ratio=0.5)
+
+    provider.generate("A fireball")   # 1 request: a hedge would exceed 0.5
+    provider.generate("A shield")     # 2 requests: one hedge allowed
+
+    assert provider.stats()["hedging"]["hedged"] == 1
+    provider.close()
+
+
+def test_failed_primary_falls_back_to_hedge():
+    """Test that the hedge result is used when the primary fails after the hedge started"""
+    provider = hedged([(0.1, RuntimeError("late failure")), 0.2])
+
+    assert provider.generate("A fireball") == "image-2"
+    assert provider.stats()["hedging"]["hedge_wins"] == 1
+    provider.close()
+
+
+def test_error_raised_when_every_request_fails():
+    """Test that the error is raised when both the primary and the hedge fail, or the primary fails fast"""
+    provider = hedged([(0.1, RuntimeError("boom")), (0.0, RuntimeError("boom")), (0.0, ValueError("fast"))])
+
+    with pytest.raises(RuntimeError):
+        provider.generate("A fireball")
+    with pytest.raises(ValueError):
+        provider.generate("A shield")
+    assert provider.stats()["hedging"]["hedged"] == 1
+    provider.close()
+
+
+def test_hedge_delay_follows_observed_percentile():
+    """Test that the delay switches from initial_delay to the observed percentile, floored at min_delay"""
+    provider = hedged([0.0] * 5, min_samples=5, min_delay=0.5, percentile=95)
+
+    assert provider.hedge_delay() == 0.05
+    for _ in range(5):
+        provider.generate("A fireball")
+    time.sleep(0.05)  # latencies are recorded by completion callbacks
+    assert provider.hedge_delay() == 0.5
+    provider.close()
+
+
+def test_factory_wraps_provider_when_hedging_enabled():
+    """Test that hedging is opt-in per provider config block"""
+    config = {"width": 16, "height": 16}
+
+    assert isinstance(create_provider("mock", config), MockProvider)
+    provider = create_provider("mock", dict(config, hedging={"enabled": True}))
+    assert isinstance(provider, HedgedProvider)
+    assert provider.get_provider_name() == "mock"
+    assert provider.generate("A fireball").startswith("data:image/png")
+    assert isinstance(provider.last_provider(), MockProvider)
+    provider.close()
@@ -0,0 +1,91 @@
+import io
+import json
+import base64
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from src.generator.file_manager import FileManager
+from src.generator.image_quality import ssim, psnr, find_webp_quality
+
+
+def _gradient_image(size: int = 64) -> Image.Image:
+    """Smooth RGB gradient with some texture"""
+    y, x = np.mgrid[0:size, 0:size]
+    r = (x * 255 / size).astype(np.uint8)
+    g = (y * 255 / size).astype(np.uint8)
+    b = ((x * y) % 256).astype(np.uint8)
+    return Image.fromarray(np.dstack([r, g, b]), "RGB")
+
+
+def test_metrics_identical_images():
+    """Identical images have perfect SSIM and infinite PSNR"""
+    img = _gradient_image()
+
+    assert ssim(img, img) == pytest.approx(1.0)
+    assert psnr(img, img) == float("inf")
+
+
+def test_metrics_degrade_with_noise():
+    """Noisier images score lower"""
+    img = _gradient_image()
+    rng = np.random.default_rng(0)
+    base = np.asarray(img, dtype=np.int16)
+
+    light = Image.fromarray(np.clip(base + rng.normal(0, 5, base.shape), 0, 255).astype(np.uint8))
+    heavy = Image.fromarray(np.clip(base + rng.normal(0, 40, base.shape), 0, 255).astype(np.uint8))
+
+    assert ssim(img, light) > ssim(img, heavy)
+    assert psnr(img, light) > psnr(img, heavy)
+
+
+def test_find_webp_quality_meets_target():
+    """Chosen quality meets the target and flat images need lower quality"""
+    detailed = _gradient_image()
+    flat = Image.new("RGB", (64, 64), (120, 80, 40))
+
+    quality, data, score = find_webp_quality(detailed, metric="ssim", target=0.95)
+    flat_quality, _, _ = find_webp_quality(flat, metric="ssim", target=0.95)
+
+    assert score >= 0.95
+    assert 40 <= quality <= 95
+    assert flat_quality <= quality
+    assert Image.open(io.BytesIO(data)).format == "WEBP"
+
+
+def test_find_webp_quality_rejects_unknown_metric():
+    """Unknown metrics raise ValueError"""
+    with pytest.raises(ValueError, match="Unknown quality metric"):
+        find_webp_quality(_gradient_image(), metric="mse")
+
+
+def test_quality_search_recorded_in_manifest():
+    """Chosen quality per size is stored with the manifest entry"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        config = {
+            "base_path": tmpdir,
+            "conversions": {
+                "enabled": True,
+                "sizes": [32],
+                "path": f"{tmpdir}/conversions",
+                "quality_search": {"enabled": True, "metric": "psnr", "target": 18}
+            }
+        }
+        manager = FileManager(config)
+
+        buffer = io.BytesIO()
+        _gradient_image().save(buffer, format="PNG")
+        data_url = "data:image/png;base64," + base64.b64encode(buffer.getvalue()).decode()
+
+        path = manager.save_image(data_url, "spells", "fireball", "test-provider")
+        manager.update_manifest("spells", "fireball", path, True)
+
+        manifest = json.loads((Path(tmpdir) / ".manifest.json").read_text())
+        conversion = manifest["spells"]["fireball"]["conversions"]["32"]
+
+        assert conversion["psnr"] >= 18
+        assert conversion["bytes"] == Path(conversion["path"]).stat().st_size
+        assert 40 <= conversion["quality"] <= 95
@@ -14,8 +14,9 @@ from src.generator.file_manager import FileManager
 
 
 @patch('src.generator.image_generator.OpenAI')
+@patch('requests.Session.get')
 @patch('requests.get')
-def test_end_to_end_spell_generation(mock_requests_get, mock_openai):
+def test_end_to_end_spell_generation(mock_requests_get, mock_session_get, mock_openai):
     """Test complete workflow: fetch entity -> build prompt -> generate -> save"""
 
     # Mock API response for entity fetch
@@ -43,6 +44,7 @@ def test_end_to_end_spell_generation(mock_requests_get, mock_openai):
             return mock_img_response
 
     mock_requests_get.side_effect = mock_get_side_effect
+    mock_session_get.side_effect = mock_get_side_effect
 
     # Mock DALL-E response
     mock_dalle_response = Mock()
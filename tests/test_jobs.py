@@ -0,0 +1,106 @@
+import asyncio
+import threading
+import time
+
+from src.generator.jobs import CANCELLED, COMPLETED, FAILED, QUEUED, RUNNING, JobManager
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+async def wait_for(job, *statuses):
+    while job.status not in statuses:
+        await asyncio.sleep(0.01)
+
+
+def test_job_runs_in_background_and_reports_progress():
+    """Test that submit returns at once, the event loop stays free and progress is counted"""
+    release = threading.Event()
+
+    def work(job):
+        job.set_total(4)
+        job.record("skipped")
+        job.record("done")
+        release.wait(5)
+        job.record("failed")
+        job.record("done")
+        return "finished"
+
+    async def scenario():
+        manager = JobManager()
+        job = manager.submit("batch_generate", {"entity_type": "spells"}, work)
+        assert job.status == QUEUED
+
+        await wait_for(job, RUNNING)
+        # The loop is not blocked by the running work
+        await asyncio.sleep(0.05)
+        progress = job.progress()
+        assert (progress["done"], progress["skipped"], progress["remaining"]) == (1, 1, 2)
+        assert progress["rate_per_minute"] > 0
+        assert progress["eta_seconds"] is not None
+
+        release.set()
+        await job.task
+        return job
+
+    job = run(scenario())
+    progress = job.progress()
+    assert job.status == COMPLETED
+    assert (progress["done"], progress["failed"], progress["remaining"]) == (2, 1, 0)
+    assert progress["eta_seconds"] is None
+    assert "finished" in job.describe()
+
+
+def test_cancel_stops_running_job():
+    """Test that cancellation is seen by the work function between entities"""
+    def work(job):
+        job.set_total(1000)
+        while not job.cancelled:
+            job.record("done")
+            time.sleep(0.001)
+        return "stopped"
+
+    async def scenario():
+        manager = JobManager()
+        job = manager.submit("batch_generate", {}, work)
+        await wait_for(job, RUNNING)
+        await asyncio.sleep(0.02)
+        assert manager.cancel(job.id) is job
+        await job.task
+        return job
+
+    job = run(scenario())
+    assert job.status == CANCELLED
+    assert 0 < job.progress()["done"] < 1000
+
+
+def test_jobs_queue_behind_running_one_and_failures_are_reported():
+    """Test max_running queueing, cancelling a queued job and a failing job"""
+    release = threading.Event()
+
+    def blocking(job):
+        release.wait(5)
+        return "ok"
+
+    def failing(job):
+        raise RuntimeError("API unreachable")
+
+    async def scenario():
+        manager = JobManager(max_running=1)
+        first = manager.submit("batch_generate", {}, blocking)
+        queued = manager.submit("batch_generate", {}, blocking)
+        broken = manager.submit("batch_generate", {}, failing)
+        await wait_for(first, RUNNING)
+        assert queued.status == QUEUED
+
+        manager.cancel(queued.id)
+        release.set()
+        await asyncio.gather(first.task, queued.task, broken.task)
+        return manager, first, queued, broken
+
+    manager, first, queued, broken = run(scenario())
+    assert (first.status, queued.status, broken.status) == (COMPLETED, CANCELLED, FAILED)
+    assert broken.progress()["error"] == "API unreachable"
+    assert manager.get("missing") is None
+    assert manager.cancel("missing") is None
@@ -0,0 +1,111 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+import requests
+
+from src.generator.providers.key_pool import KeyPool, configured_keys
+from src.generator.providers.mock_provider import MockProvider
+
+
+def http_error(status: int, headers=None) -> requests.HTTPError:
+    response = requests.Response()
+    response.status_code = status
+    response.headers.update(headers or {})
+    return requests.HTTPError(f"{status} error", response=response)
+
+
+def test_configured_keys():
+    """Test that api_keys takes precedence and unset environment variables are dropped"""
+    assert configured_keys({"api_key": "a"}) == ["a"]
+    assert configured_keys({"api_key": "a", "api_keys": ["b", "${UNSET_KEY}", "c"]}) == ["b", "c"]
+    with pytest.raises(ValueError):
+        configured_keys({"api_keys": ["${UNSET_KEY}"]})
+
+
+def test_requests_rotate_over_keys():
+    """Test that sequential requests take the least recently used key"""
+    pool = KeyPool(["key-a", "key-b", "key-c"])
+
+    used = [pool.call(lambda key: key) for _ in range(6)]
+
+    assert used == ["key-a", "key-b", "key-c"] * 2
+
+
+def test_throttled_key_is_benched_and_request_moves_on():
+    """Test that a 429 benches the key for Retry-After and the request uses another key"""
+    pool = KeyPool(["key-a", "key-b"])
+
+    def call(key):
+        if key == "key-a":
+            raise http_error(429, {"Retry-After": "30"})
+        return key
+
+    assert pool.call(call) == "key-b"
+    assert [s["benched"] for s in pool.stats()] == [True, False]
+    # key-a stays benched, so the next requests skip it without trying
+    assert pool.call(lambda key: key) == "key-b"
+    assert pool.stats()[0]["requests"] == 1
+
+
+def test_rejected_key_is_disabled():
+    """Test that a 401 disables the key when others remain, and propagates with a single key"""
+    pool = KeyPool(["key-a", "key-b"])
+
+    def call(key):
+        if key == "key-a":
+            raise http_error(401)
+        return key
+
+    assert pool.call(call) == "key-b"
+    assert pool.stats()[0]["disabled"] is True
+
+    with pytest.raises(requests.HTTPError):
+        KeyPool(["key-a"]).call(call)
+
+
+def test_all_keys_throttled_raises_last_error():
+    """Test that the 429 is raised once every key has been tried"""
+    pool = KeyPool(["key-a", "key-b"], {"key_bench_seconds": 0})
+
+    with pytest.raises(requests.HTTPError):
+        pool.call(lambda key: (_ for _ in ()).throw(http_error(429)))
+
+
+def test_key_concurrency_is_respected():
+    """Test that no key has more than key_concurrency requests in flight"""
+    pool = KeyPool(["key-a", "key-b"], {"key_concurrency": 1})
+    in_flight = {"key-a": 0, "key-b": 0}
+    peak = {"key-a": 0, "key-b": 0}
+    lock = threading.Lock()
+
+    def call(key):
+        with lock:
+            in_flight[key] += 1
+            peak[key] = max(peak[key], in_flight[key])
+        time.sleep(0.02)
+        with lock:
+            in_flight[key] -= 1
+        return key
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        used = list(executor.map(lambda _: pool.call(call), range(8)))
+
+    assert peak == {"key-a": 1, "key-b": 1}
+    assert used.count("key-a") == used.count("key-b") == 4
+
+
+def test_mock_provider_spreads_over_key_quotas():
+    """Test that more keys admit more concurrent mock requests without 429s"""
+    provider = MockProvider({
+        "width": 16, "height": 16, "latency": {"mean": 0.05},
+        "api_keys": ["k1", "k2", "k3"], "key_quota": 1, "key_concurrency": 1, "max_retries": 0
+    })
+
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        results = list(executor.map(provider.generate, [f"prompt {i}" for i in range(9)]))
+
+    assert all(r.startswith("data:image/png") for r in results)
+    assert [s["requests"] for s in provider.key_pool.stats()] == [3, 3, 3]
+    assert not any(s["throttled"] for s in provider.key_pool.stats())
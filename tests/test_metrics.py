@@ -0,0 +1,31 @@
+import pytest
+
+from src.generator.metrics import StageTimings, percentile
+
+
+def test_percentile_nearest_rank():
+    """Test nearest-rank percentiles, including empty and single-value lists"""
+    values = [float(v) for v in range(1, 101)]
+
+    assert percentile(values, 50) == 50.0
+    assert percentile(values, 95) == 95.0
+    assert percentile([3.0], 95) == 3.0
+    assert percentile([], 50) == 0.0
+
+
+def test_stage_timings_summary():
+    """Test that samples are grouped per stage and timed blocks record on error"""
+    timings = StageTimings()
+    for seconds in (0.3, 0.1, 0.2):
+        timings.record("generate", seconds)
+
+    with pytest.raises(RuntimeError):
+        with timings.time("save"):
+            raise RuntimeError("disk full")
+
+    summary = timings.summary()
+    assert summary["generate"]["count"] == 3
+    assert summary["generate"]["p50"] == 0.2
+    assert summary["generate"]["max"] == 0.3
+    assert summary["generate"]["total"] == pytest.approx(0.6)
+    assert summary["save"]["count"] == 1
@@ -0,0 +1,63 @@
+import json
+import tempfile
+from pathlib import Path
+
+from src.generator.output_index import OutputIndex
+
+
+def _touch(path: Path, data: bytes = b"x"):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(data)
+
+
+def test_build_indexes_originals_and_conversions():
+    """Test that a scan picks up originals and every conversion size/format"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        base = Path(tmpdir)
+        _touch(base / "spells" / "stability-ai" / "phb--fireball.png", b"12345")
+        _touch(base / "conversions" / "128" / "spells" / "stability-ai" / "phb--fireball.webp")
+        _touch(base / "conversions" / "512" / "spells" / "stability-ai" / "phb--fireball.png")
+        _touch(base / ".manifest.json", b"{}")
+
+        index = OutputIndex.load(base)
+
+        assert len(index) == 3
+        original = index.get("spells", "stability-ai", "phb--fireball")
+        assert original.bytes == 5
+        assert original.size is None
+        assert index.has("spells", "phb--fireball", size=128, fmt="webp")
+        assert not index.has("spells", "phb--fireball", size=256, fmt="webp")
+        assert [e.size for e in index.entries(originals=False)] == [128, 512]
+
+
+def test_index_is_persisted_and_reloaded():
+    """Test that the saved index is reused without rescanning"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        base = Path(tmpdir)
+        _touch(base / "items" / "dall-e" / "longsword.png")
+
+        OutputIndex.load(base)
+        assert json.loads((base / ".index.json").read_text())["entries"]
+
+        # Files added behind the index's back are only seen after a rebuild
+        _touch(base / "items" / "dall-e" / "shield.png")
+        assert not OutputIndex.load(base).has("items", "shield")
+        assert OutputIndex.load(base, rebuild=True).has("items", "shield")
+
+
+def test_record_and_remove():
+    """Test incremental updates"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        base = Path(tmpdir)
+        index = OutputIndex.load(base)
+
+        path = base / "feats" / "mock" / "alert.png"
+        _touch(path)
+        entry = index.record(path, "feats", "mock", "alert")
+
+        assert index.has("feats", "alert")
+        assert index.path_for(entry) == path
+
+        index.remove(entry)
+        assert not index.has("feats", "alert")
+        assert not index.has("feats", "alert", provider="mock")
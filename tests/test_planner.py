@@ -0,0 +1,96 @@
+import tempfile
+from argparse import Namespace
+
+import pytest
+
+from src.cli import GenerationRun, configured_output_providers
+from src.generator.file_manager import FileManager
+from src.generator.metrics import StageTimings
+from src.generator.planner import build_plan, load_plan, plan_entity_type, save_plan
+from src.generator.prompt_builder import PromptBuilder
+
+
+def _entities():
+    return [
+        ("phb:fireball", {"name": "Fireball", "description": "A bright streak flashes from your finger."}),
+        ("xge:fireball", {"name": "Fireball", "description": "A bright streak flashes from your finger."}),
+        ("phb:light", {"name": "Light", "description": "NO DESCRIPTION"}),
+        ("phb:shield", {"name": "Shield", "description": "An invisible barrier of magical force appears."}),
+        (None, {"id": 7, "name": ""}),
+    ]
+
+
+def test_plan_entity_type_counts_and_items():
+    """Test statuses from the manifest, empty descriptions, aliases and planned prompts"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        file_manager = FileManager({"base_path": tmpdir})
+        file_manager.update_manifest("spells", "phb:fireball", f"{tmpdir}/spells/mock/phb--fireball.png", True)
+        file_manager.update_manifest("spells", "phb:shield", "", False, "timeout")
+        builder = PromptBuilder({"entity_prefix": "a"}, "spells", "{entity_prefix} {entity}. {entityDescription}")
+
+        section = plan_entity_type(
+            "spells", _entities(), builder, file_manager, "mock", aliases={"xge:fireball": "phb:fireball"}
+        )
+
+    assert section["counts"] == {
+        "entities": 5, "done": 1, "pending": 3, "failed": 1, "invalid": 1, "aliased": 1
+    }
+    assert section["provider_calls"] == 2
+    assert section["empty_descriptions"] == ["phb:light"]
+    assert section["invalid"] == [7]
+    assert [item["slug"] for item in section["items"]] == ["xge:fireball", "phb:light", "phb:shield"]
+    assert section["items"][0]["alias_of"] == "phb:fireball"
+    assert section["items"][2]["prompt"] == "a Shield. An invisible barrier of magical force appears."
+    assert section["prompt_length"]["max"] == len(section["items"][2]["prompt"])
+
+
+def test_plan_round_trip_and_projection():
+    """Test totals, projections and that saved plans load back (and other JSON is rejected)"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        file_manager = FileManager({"base_path": tmpdir})
+        builder = PromptBuilder({}, "spells", "{entity}. {entityDescription}")
+        section = plan_entity_type("spells", _entities(), builder, file_manager, "mock", force_regenerate=True)
+
+        plan = build_plan(
+            [section], "snapshot.jsonl.gz", "mock", {"force_regenerate": True},
+            estimates={"seconds_per_image": 10, "cost_per_image": 0.5}, workers=2, batch_delay=2
+        )
+        save_plan(f"{tmpdir}/plans/plan.json", plan)
+
+        assert load_plan(f"{tmpdir}/plans/plan.json") == plan
+        assert plan["totals"]["provider_calls"] == 4
+        assert plan["totals"]["projected_seconds"] == 24.0
+        assert plan["totals"]["projected_cost"] == 2.0
+
+        with open(f"{tmpdir}/other.json", "w") as f:
+            f.write('{"spells": {}}')
+        with pytest.raises(ValueError):
+            load_plan(f"{tmpdir}/other.json")
+
+
+@pytest.mark.parametrize("image_generation", [
+    {"provider": "dall-e", "dall-e": {}},
+    {"provider": "router", "router": {"providers": [{"provider": "stability-ai"}, {"provider": "dall-e"}]}},
+])
+def test_plan_and_run_agree_on_pending_work(image_generation):
+    """Test that --plan and a run skip the same images for non-Stability providers"""
+    config = {"image_generation": image_generation}
+    with tempfile.TemporaryDirectory() as tmpdir:
+        file_manager = FileManager({"base_path": tmpdir})
+        # Saved under the dall-e directory, but never recorded in the manifest
+        file_manager.save_image("", "spells", "phb:fireball", "dall-e", image_data=b"png")
+        builder = PromptBuilder({}, "spells", "{entity}. {entityDescription}")
+        entities = [pair for pair in _entities() if pair[0]]
+
+        section = plan_entity_type("spells", entities, builder, file_manager, configured_output_providers(config))
+
+        args = Namespace(changed_only=False, force_regenerate=False, dry_run=True)
+        run = GenerationRun(
+            args, "spells", builder, file_manager, None, StageTimings(), 0, len(entities),
+            output_providers=configured_output_providers(config)
+        )
+        for idx, (slug, entity) in enumerate(entities, 1):
+            run.process(idx, dict(entity, slug=slug))
+
+    assert section["counts"]["done"] == run.counts["skipped"] == 1
+    assert section["provider_calls"] == run.counts["generated"] == 3
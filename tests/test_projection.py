@@ -0,0 +1,37 @@
+import json
+
+from src.generator.projection import normalize_fields, parse_page, project_entity
+
+MONSTER = {
+    "id": 7,
+    "slug": "mm:goblin",
+    "name": "Goblin",
+    "description": "A small, black-hearted humanoid.",
+    "type": {"name": "Humanoid", "code": "HUM"},
+    "actions": [{"name": "Scimitar", "damage": [{"dice": "1d6"}]}],
+    "stats": {"str": {"score": 8}},
+}
+FIELDS = normalize_fields(["description", "type.name"])
+
+
+def test_project_entity_keeps_requested_paths():
+    """Test that projection keeps identifiers, requested fields and nested leaves"""
+    assert project_entity(MONSTER, FIELDS) == {
+        "id": 7,
+        "slug": "mm:goblin",
+        "name": "Goblin",
+        "description": "A small, black-hearted humanoid.",
+        "type": {"name": "Humanoid"},
+    }
+
+
+def test_parse_page_matches_in_memory_projection():
+    """Test that streaming parse drops the same subtrees and keeps meta"""
+    page = {"data": [MONSTER, dict(MONSTER, id=8, slug="mm:hobgoblin")], "meta": {"last_page": 3}}
+    body = json.dumps(page).encode()
+    chunks = [body[i:i + 16] for i in range(0, len(body), 16)]
+
+    parsed = parse_page(chunks, FIELDS)
+
+    assert parsed["meta"] == {"last_page": 3}
+    assert parsed["data"] == [project_entity(e, FIELDS) for e in page["data"]]
@@ -165,3 +165,26 @@ def test_build_prompt_with_template():
     prompt = builder.build(entity)
 
     assert prompt == "A whimsical illustration of a Elf. Graceful forest dweller Storybook art style."
+
+
+def test_build_many_matches_build():
+    """Test that build_many streams the same prompts as build, in order"""
+    config = {"entity_prefix": "a", "include_category": False, "max_length": 1000}
+    template = "{entity_prefix} {entity}. {entityDescription} Literal {braces} stay."
+    entities = [
+        {"name": "Goblin", "description": "A small, cunning creature of the dark"},
+        {"name": "Owlbear", "description": "NO DESCRIPTION"},
+    ]
+
+    builder = PromptBuilder(config, "monsters", template)
+
+    assert list(builder.build_many(iter(entities))) == [builder.build(e) for e in entities]
+    assert builder.build(entities[1]) == "a Owlbear.  Literal {braces} stay."
+
+
+def test_truncate_uses_last_sentence_end():
+    """Test that truncation keeps text up to the last sentence ending within max_length"""
+    builder = PromptBuilder({"max_length": 30}, "items")
+
+    assert builder._truncate_at_sentence("One. Two! Three? Four five six seven", 30) == "One. Two! Three?"
+    assert builder._truncate_at_sentence("no sentence ending anywhere in this text", 20) == "no sentence ending..."
@@ -0,0 +1,107 @@
+import base64
+import io
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+import requests
+import responses
+from PIL import Image
+
+from src.generator.providers.dalle_provider import DalleProvider
+from src.generator.providers.factory import create_provider
+from src.generator.providers.mock_provider import MockProvider
+from src.generator.providers.stability_provider import StabilityProvider
+
+
+def test_prompt_hash_tracks_prompt_and_generation_params():
+    """Test that the hash changes with the prompt or image parameters, not credentials"""
+    base = {"api_key": "key-1", "steps": 30}
+    provider = StabilityProvider(base)
+    prompt_hash = provider.prompt_hash("A fireball")
+
+    assert StabilityProvider(dict(base, api_key="key-2", max_retries=9)).prompt_hash("A fireball") == prompt_hash
+    assert provider.prompt_hash("A fireball.") != prompt_hash
+    assert StabilityProvider(dict(base, steps=40)).prompt_hash("A fireball") != prompt_hash
+
+
+def test_mock_provider_returns_png_of_configured_size():
+    """Test that the factory's mock provider returns a decodable PNG data URL"""
+    provider = create_provider("mock", {"width": 64, "height": 32})
+
+    data_url = provider.generate("A fireball")
+
+    assert data_url.startswith("data:image/png;base64,")
+    image = Image.open(io.BytesIO(base64.b64decode(data_url.split(",", 1)[1])))
+    assert image.size == (64, 32)
+    assert provider.generate("A fireball") == data_url
+    assert provider.get_provider_name() == "mock"
+
+
+def test_mock_provider_rate_limits_with_retry_after():
+    """Test that simulated 429s carry Retry-After and are retried, then raised"""
+    provider = MockProvider({"width": 16, "height": 16, "rate_limit_rate": 1.0, "retry_after": 0, "max_retries": 1})
+
+    with pytest.raises(requests.HTTPError) as exc_info:
+        provider.generate("A fireball")
+
+    assert exc_info.value.response.status_code == 429
+    assert exc_info.value.response.headers["Retry-After"] == "0"
+
+
+def test_mock_provider_failures_are_retried():
+    """Test that a failure rate below 1 eventually succeeds within the retries"""
+    provider = MockProvider({
+        "width": 16, "height": 16, "failure_rate": 0.5, "max_retries": 20, "retry_delay": 0, "seed": 1
+    })
+
+    assert provider.generate("A fireball").startswith("data:image/png")
+
+
+@responses.activate
+def test_stability_provider_uses_pooled_session_with_split_timeouts():
+    """Test that requests go through the keep-alive session with auth headers and (connect, read) timeouts"""
+    url = "https://api.stability.ai/v1/generation/sdxl/text-to-image"
+    responses.add(responses.POST, url, json={"artifacts": [{"base64": "aGk="}]}, status=200)
+
+    provider = StabilityProvider({
+        "api_key": "key-1", "model": "sdxl", "connect_timeout": 3, "read_timeout": 90, "pool_size": 4
+    })
+
+    assert provider.generate("A fireball") == "data:image/png;base64,aGk="
+    request = responses.calls[0].request
+    assert request.headers["Authorization"] == "Bearer key-1"
+    assert request.req_kwargs["timeout"] == (3, 90)
+    assert provider.session.get_adapter(url)._pool_maxsize == 4
+
+
+@responses.activate
+def test_stability_provider_warm_up_never_raises():
+    """Test that warm-up touches the API host once per pooled connection and tolerates errors"""
+    engines = "https://api.stability.ai/v1/engines/list"
+    responses.add(responses.GET, engines, status=401)
+    responses.add(responses.GET, engines, body=requests.ConnectionError("refused"))
+
+    provider = StabilityProvider({"api_key": "key-1", "pool_size": 2})
+    provider.warm_up()
+
+    assert len(responses.calls) == 2
+    StabilityProvider({"api_key": "key-1", "warm_up": False}).warm_up()
+    assert len(responses.calls) == 2
+
+
+@pytest.mark.parametrize("response_format, expected", [
+    ("b64_json", "data:image/png;base64,aGk="),
+    ("url", "https://images.example/fireball.png"),
+])
+def test_dalle_provider_response_format(response_format, expected):
+    """Test that b64_json mode returns the image bytes as a data URL instead of a URL to download"""
+    with patch("src.generator.providers.dalle_provider.OpenAI") as openai_class:
+        client = openai_class.return_value
+        client.images.generate.return_value = SimpleNamespace(
+            data=[SimpleNamespace(b64_json="aGk=", url="https://images.example/fireball.png")]
+        )
+        provider = DalleProvider({"api_key": "key-1", "response_format": response_format})
+
+        assert provider.generate("A fireball") == expected
+        assert client.images.generate.call_args.kwargs["response_format"] == response_format
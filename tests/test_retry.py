@@ -0,0 +1,124 @@
+import email.utils
+import time
+
+import pytest
+import requests
+
+from src.generator.providers.retry import (
+    PERMANENT, RETRYABLE, THROTTLED, RetryPolicy, classify, retry_after
+)
+
+
+def http_error(status: int, headers=None) -> requests.HTTPError:
+    response = requests.Response()
+    response.status_code = status
+    response.headers.update(headers or {})
+    return requests.HTTPError(f"{status} error", response=response)
+
+
+class FakeClock:
+    """Clock advanced only by the policy's sleeps"""
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def sleep(self, seconds: float):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def make_policy(clock: FakeClock, **kwargs) -> RetryPolicy:
+    kwargs.setdefault("jitter", False)
+    return RetryPolicy(sleep=clock.sleep, clock=clock, **kwargs)
+
+
+def failing(*errors):
+    """Callable raising the given errors in turn, then returning "ok" """
+    remaining = list(errors)
+
+    def call():
+        if remaining:
+            raise remaining.pop(0)
+        return "ok"
+    return call
+
+
+def test_classify():
+    """Test classification of transient, throttled and permanent errors"""
+    assert classify(requests.ConnectionError("reset")) == (RETRYABLE, None)
+    assert classify(http_error(503)) == (RETRYABLE, None)
+    assert classify(http_error(408)) == (RETRYABLE, None)
+    assert classify(RuntimeError("unknown")) == (RETRYABLE, None)
+    assert classify(http_error(400)) == (PERMANENT, None)
+    assert classify(http_error(401)) == (PERMANENT, None)
+    assert classify(http_error(429, {"Retry-After": "7"})) == (THROTTLED, 7.0)
+    assert classify(http_error(429)) == (THROTTLED, None)
+
+
+def test_retry_after_http_date():
+    """Test that an HTTP-date Retry-After is converted to seconds from now"""
+    when = email.utils.formatdate(time.time() + 30, usegmt=True)
+
+    assert 25 <= retry_after(http_error(429, {"Retry-After": when})) <= 31
+
+
+def test_permanent_errors_are_not_retried():
+    """Test that a 400 is raised after one attempt without sleeping"""
+    clock = FakeClock()
+    policy = make_policy(clock)
+
+    with pytest.raises(requests.HTTPError):
+        policy.call(failing(http_error(400), http_error(400)))
+
+    assert clock.sleeps == []
+    assert [a["outcome"] for a in policy.attempts()] == [PERMANENT]
+
+
+def test_retryable_errors_back_off_and_throttling_honours_retry_after():
+    """Test exponential backoff for retryable errors and the server's delay for 429s"""
+    clock = FakeClock()
+    policy = make_policy(clock, retry_delay=2, max_retries=3)
+
+    assert policy.call(failing(http_error(502), http_error(429, {"Retry-After": "11"}), http_error(503))) == "ok"
+
+    assert clock.sleeps == [2, 11, 8]
+    assert [a["outcome"] for a in policy.attempts()] == [RETRYABLE, THROTTLED, RETRYABLE, "ok"]
+
+
+def test_retries_exhausted():
+    """Test that the last error is raised once max_retries is used up"""
+    clock = FakeClock()
+    policy = make_policy(clock, retry_delay=0, max_retries=2)
+
+    with pytest.raises(requests.HTTPError):
+        policy.call(failing(*[http_error(500) for _ in range(3)]))
+
+    assert len(policy.attempts()) == 3
+    assert policy.attempts()[-1]["gave_up"] == "retries"
+
+
+def test_budget_stops_retrying():
+    """Test that no retry starts once its wait would exceed the time budget"""
+    clock = FakeClock()
+    policy = make_policy(clock, retry_delay=10, max_retries=10, budget=35)
+
+    with pytest.raises(requests.HTTPError):
+        policy.call(failing(*[http_error(503) for _ in range(10)]))
+
+    # Waits of 10 and 20 fit in 35s; the next (40) would not
+    assert clock.sleeps == [10, 20]
+    assert policy.attempts()[-1]["gave_up"] == "budget"
+
+
+def test_jitter_stays_within_half_and_full_delay():
+    """Test equal jitter bounds and the max_delay cap"""
+    policy = RetryPolicy(retry_delay=4, max_delay=20)
+
+    for attempt in range(6):
+        full = min(20, 4 * 2 ** attempt)
+        assert full / 2 <= policy.delay(attempt) <= full
+    assert policy.delay(0, server_delay=120) == 20
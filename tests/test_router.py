@@ -0,0 +1,135 @@
+import tempfile
+from argparse import Namespace
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+import pytest
+import requests
+
+from src.cli import GenerationRun
+from src.generator.file_manager import FileManager
+from src.generator.metrics import StageTimings
+from src.generator.prompt_builder import PromptBuilder
+from src.generator.providers.factory import create_provider
+
+PROVIDER_CONFIGS = {"mock": {"width": 16, "height": 16}}
+
+
+def make_router(*members, **config):
+    config.setdefault("retry_delay", 0)
+    config.setdefault("max_retries", 0)
+    return create_provider("router", dict(config, providers=list(members)), PROVIDER_CONFIGS)
+
+
+def mock_member(weight=1, concurrency=4, **options):
+    return {"provider": "mock", "weight": weight, "concurrency": concurrency, "options": options}
+
+
+def test_weighted_routing():
+    """Test that images are spread over members in proportion to their weights"""
+    router = make_router(mock_member(weight=3), mock_member(weight=1))
+    primary, secondary = (m.provider for m in router.members)
+
+    producers = []
+    for i in range(8):
+        router.generate(f"prompt {i}")
+        producers.append(router.last_provider())
+
+    assert producers.count(primary) == 6
+    assert producers.count(secondary) == 2
+
+
+def test_failover_to_next_provider():
+    """Test that a failing member's images are produced by the next one and it is benched after repeated failures"""
+    router = make_router(mock_member(weight=10, failure_rate=1.0), mock_member(), failure_threshold=2, cooldown=60)
+    failing, healthy = router.members
+
+    assert router.generate("A fireball").startswith("data:image/png")
+    assert router.last_provider() is healthy.provider
+    assert [a["outcome"] for a in router.last_attempts()] == ["retryable", "ok"]
+    assert all(a["provider"] == "mock" for a in router.last_attempts())
+
+    router.generate("A shield")
+    assert failing.cooldown_until > 0
+
+    # Benched: the next image goes straight to the healthy member
+    router.generate("A wish")
+    assert [a["outcome"] for a in router.last_attempts()] == ["ok"]
+
+
+def test_throttled_member_is_avoided_for_retry_after():
+    """Test that a 429 benches a member for its Retry-After"""
+    router = make_router(mock_member(weight=10, rate_limit_rate=1.0, retry_after=30), mock_member())
+    throttled, _ = router.members
+
+    router.generate("A fireball")
+    assert [a["outcome"] for a in router.last_attempts()] == ["throttled", "ok"]
+    assert throttled.cooldown_until - router._clock() > 25
+
+    router.generate("A shield")
+    assert [a["outcome"] for a in router.last_attempts()] == ["ok"]
+
+
+def test_all_members_failing_raises_last_error():
+    """Test that the error is raised once every member failed"""
+    router = make_router(mock_member(rate_limit_rate=1.0, retry_after=0), mock_member(rate_limit_rate=1.0, retry_after=0))
+
+    with pytest.raises(requests.HTTPError):
+        router.generate("A fireball")
+
+    assert len(router.last_attempts()) == 2
+    assert router.last_attempts()[-1]["gave_up"] == "retries"
+
+
+def test_work_spills_over_when_preferred_member_is_busy():
+    """Test that concurrent images use the second member once the first one's slots are taken"""
+    slow = {"latency": {"distribution": "fixed", "mean": 0.2}}
+    router = make_router(mock_member(weight=10, concurrency=1, **slow), mock_member(concurrency=1, **slow))
+
+    def produce(i):
+        router.generate(f"prompt {i}")
+        return router.last_provider()
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        producers = set(executor.map(produce, range(2)))
+
+    assert producers == {m.provider for m in router.members}
+
+
+def test_router_rejects_nested_router():
+    """Test that a router cannot route to itself"""
+    with pytest.raises(ValueError):
+        make_router({"provider": "router"})
+
+
+def test_changed_only_skips_images_from_secondary_member():
+    """Test that --changed-only compares with the producing member's hash, so failed-over images are not regenerated"""
+    provider_configs = dict(PROVIDER_CONFIGS, **{"stability-ai": {"api_key": "test"}})
+    router = create_provider("router", {
+        "retry_delay": 0,
+        "max_retries": 0,
+        "providers": [{"provider": "stability-ai", "weight": 10}, mock_member()],
+    }, provider_configs)
+    primary, secondary = (m.provider for m in router.members)
+    entity = {"slug": "fireball", "name": "Fireball", "description": "A bright streak."}
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        file_manager = FileManager({"base_path": tmpdir})
+        builder = PromptBuilder({}, "spells", "{entity}. {entityDescription}")
+
+        def run(changed_only):
+            args = Namespace(changed_only=changed_only, force_regenerate=False, dry_run=False)
+            generation = GenerationRun(args, "spells", builder, file_manager, router, StageTimings(), 0, 1)
+            generation.process(1, entity)
+            return generation.counts
+
+        with patch.object(primary, "generate", side_effect=requests.ConnectionError("down")):
+            assert run(changed_only=False)["generated"] == 1
+        assert file_manager.get_provider("spells", "fireball") == "mock"
+
+        with patch.object(primary, "generate") as primary_generate, \
+                patch.object(secondary, "generate") as secondary_generate:
+            counts = run(changed_only=True)
+
+        assert counts["skipped"] == 1
+        assert primary_generate.call_count == secondary_generate.call_count == 0
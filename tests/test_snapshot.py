@@ -0,0 +1,51 @@
+import gzip
+import json
+
+import pytest
+
+from src.generator.snapshot import EntitySnapshot, write_snapshot
+
+SPELLS = [
+    {"id": 1, "slug": "phb:fireball", "name": "Fireball", "school": {"name": "Evocation", "code": "EVO"}},
+    {"id": 2, "slug": "phb:shield", "name": "Shield", "school": {"name": "Abjuration", "code": "ABJ"}},
+]
+SCHOOLS = [{"id": 1, "code": "EVO", "name": "Evocation"}]
+
+
+def test_snapshot_round_trip(tmp_path):
+    """Test that a snapshot header and per-type entities read back as written"""
+    path = tmp_path / "entities.jsonl.gz"
+    header = write_snapshot(path, "http://localhost:8080/api/v1", [("spells", iter(SPELLS)), ("spell_schools", SCHOOLS)])
+
+    with gzip.open(path, "rt") as f:
+        assert json.loads(f.readline()) == header
+
+    snapshot = EntitySnapshot(path)
+    assert snapshot.base_url == "http://localhost:8080/api/v1"
+    assert snapshot.counts == {"spells": 2, "spell_schools": 1}
+    assert list(snapshot.fetch_entities("spells")) == SPELLS
+    assert list(snapshot.fetch_entities("spell-schools")) == SCHOOLS
+    assert [e["id"] for e in snapshot.fetch_entities("spells", limit=1)] == [1]
+    assert list(snapshot.fetch_entities("monsters")) == []
+
+
+def test_snapshot_projection_and_lookup(tmp_path):
+    """Test field projection and slug lookup against a snapshot"""
+    path = tmp_path / "entities.jsonl.gz"
+    write_snapshot(path, "http://localhost:8080/api/v1", [("spells", SPELLS)])
+    snapshot = EntitySnapshot(path)
+
+    projected = next(snapshot.fetch_entities("spells", fields=["school.name"]))
+    assert projected == {"id": 1, "slug": "phb:fireball", "name": "Fireball", "school": {"name": "Evocation"}}
+    assert snapshot.get_entity("spells", "phb:shield")["id"] == 2
+    assert snapshot.get_entity("spells", "phb:missing") is None
+
+
+def test_snapshot_rejects_other_files(tmp_path):
+    """Test that a gzip file without a snapshot header is refused"""
+    path = tmp_path / "other.jsonl.gz"
+    with gzip.open(path, "wt") as f:
+        f.write('{"hello": "world"}\n')
+
+    with pytest.raises(ValueError):
+        EntitySnapshot(path)
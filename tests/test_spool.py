@@ -0,0 +1,113 @@
+import base64
+import io
+import json
+import tempfile
+from argparse import Namespace
+from pathlib import Path
+from unittest.mock import patch
+
+import responses
+from PIL import Image
+
+from src.cli import GenerationRun, complete_spooled
+from src.generator.file_manager import FileManager
+from src.generator.metrics import StageTimings
+from src.generator.prompt_builder import PromptBuilder
+from src.generator.providers.factory import create_provider
+from src.generator.spool import ResultSpool
+
+
+def png_data_url() -> str:
+    output = io.BytesIO()
+    Image.new("RGB", (8, 8), "red").save(output, format="PNG")
+    return f"data:image/png;base64,{base64.b64encode(output.getvalue()).decode('ascii')}"
+
+
+def test_spool_round_trip():
+    """Test that a data URL result is stored, listed, read back and removed"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        spool = ResultSpool(Path(tmpdir))
+        data_url = png_data_url()
+
+        entry = spool.put("spells", "phb:fireball", "mock", data_url, prompt_hash="ab" * 32)
+
+        assert entry.data_path.name == f"phb--fireball--{'ab' * 6}.png"
+        [pending] = spool.pending()
+        assert (pending.entity_type, pending.slug, pending.provider) == ("spells", "phb:fireball", "mock")
+        assert spool.read(pending) == base64.b64decode(data_url.split(",", 1)[1])
+        assert spool.pending("items") == []
+
+        spool.remove(pending)
+        assert spool.pending() == []
+
+
+@responses.activate
+def test_spool_downloads_urls_and_keeps_url_on_failure():
+    """Test that URL results are downloaded at once, or kept as URLs if the download fails"""
+    responses.add(responses.GET, "https://images.example/ok.png", body=b"png-bytes")
+    responses.add(responses.GET, "https://images.example/later.png", status=503)
+    responses.add(responses.GET, "https://images.example/later.png", body=b"late-bytes")
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        spool = ResultSpool(Path(tmpdir))
+
+        ok = spool.put("items", "longsword", "dall-e", "https://images.example/ok.png")
+        later = spool.put("items", "shield", "dall-e", "https://images.example/later.png")
+
+        assert ok.data_path.read_bytes() == b"png-bytes"
+        assert not later.data_path.exists()
+        assert json.loads(later.meta_path.read_text())["url"] == "https://images.example/later.png"
+        assert spool.read(later) == b"late-bytes"
+
+
+def test_failed_save_is_completed_from_spool():
+    """Test that a result whose save failed is saved by the next run without a provider call"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        output_config = {"base_path": tmpdir, "post_resize": None}
+        spool = ResultSpool.from_config(output_config)
+        spool.put("spells", "phb:fireball", "mock", png_data_url(), prompt_hash="cd" * 32)
+
+        file_manager = FileManager(output_config)
+        assert complete_spooled(spool, file_manager) == 1
+
+        assert (Path(tmpdir) / "spells" / "mock" / "phb--fireball.png").exists()
+        assert file_manager.get_prompt_hash("spells", "phb:fireball") == "cd" * 32
+        assert spool.pending() == []
+        assert complete_spooled(spool, file_manager) == 0
+
+
+def test_unsaveable_entry_stays_spooled():
+    """Test that an entry is kept when saving fails again"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        output_config = {"base_path": tmpdir, "post_resize": None}
+        spool = ResultSpool.from_config(output_config)
+        spool.put("spells", "null", "mock", png_data_url())
+
+        assert complete_spooled(spool, FileManager(output_config)) == 0
+        assert len(spool.pending()) == 1
+
+
+def test_spool_can_be_disabled():
+    """Test that output.spool.enabled: false turns the spool off"""
+    assert ResultSpool.from_config({"base_path": "/tmp", "spool": {"enabled": False}}) is None
+
+
+def test_spool_failure_saves_result_directly():
+    """Test that a provider result is still saved when it cannot be spooled"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        output_config = {"base_path": tmpdir, "post_resize": None}
+        spool = ResultSpool.from_config(output_config)
+        file_manager = FileManager(output_config)
+        provider = create_provider("mock", {"width": 8, "height": 8})
+        args = Namespace(changed_only=False, force_regenerate=False, dry_run=False)
+        run = GenerationRun(
+            args, "spells", PromptBuilder({}, "spells", "{entity}"), file_manager, provider,
+            StageTimings(), 0, 1, spool=spool
+        )
+
+        with patch.object(spool, "put", side_effect=OSError(28, "No space left on device")):
+            run.process(1, {"slug": "phb:fireball", "name": "Fireball"})
+
+        assert run.counts["generated"] == 1
+        assert (Path(tmpdir) / "spells" / "mock" / "phb--fireball.png").exists()
+        assert file_manager.get_provider("spells", "phb:fireball") == "mock"